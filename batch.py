@@ -0,0 +1,139 @@
+"""Run many duels between the same two heroes at once with NumPy.
+
+batch_fight plays out N copies of Hero.fight side by side. Damage for a
+block of rounds is drawn for every duel in one call per ability and armor,
+so there is no Python work per duel or per round.
+"""
+import numpy as np
+
+from superheroes import DRAW, HERO_WINS, MAX_ROUNDS, OPPONENT_WINS, TIMEOUT
+
+
+class BatchResult:
+    """Outcome of every duel in a batch"""
+
+    def __init__(self, winners, rounds):
+        """winners: array of DRAW, HERO_WINS, OPPONENT_WINS or TIMEOUT
+        per duel
+        rounds: array of rounds fought per duel
+        """
+        self.winners = winners
+        self.rounds = rounds
+
+    @property
+    def wins(self):
+        """Number of duels won by the hero"""
+        return int(np.count_nonzero(self.winners == HERO_WINS))
+
+    @property
+    def losses(self):
+        """Number of duels won by the opponent"""
+        return int(np.count_nonzero(self.winners == OPPONENT_WINS))
+
+    @property
+    def draws(self):
+        """Number of drawn duels"""
+        return int(np.count_nonzero(self.winners == DRAW))
+
+    @property
+    def timeouts(self):
+        """Number of duels called off after max_rounds"""
+        return int(np.count_nonzero(self.winners == TIMEOUT))
+
+    def win_rate(self):
+        """Fraction of duels won by the hero, 0.0 for an empty batch"""
+        if not len(self.winners):
+            return 0.0
+        return self.wins / len(self.winners)
+
+
+def attack_ranges(hero):
+    """Return the inclusive (low, high) damage range of every ability"""
+    return [ability.damage_range() for ability in hero.abilities
+            if hasattr(ability, "damage_range")]
+
+
+def block_ranges(hero):
+    """Return the inclusive (low, high) block range of every armor"""
+    return [armor.block_range() for armor in hero.armors]
+
+
+def _draw(rng, ranges, shape):
+    """Sum one draw from every range for each cell of shape"""
+    total = np.zeros(shape, dtype=np.int64)
+    for low, high in ranges:
+        total += rng.integers(low, high + 1, size=shape)
+
+    return total
+
+
+def batch_fight(hero, opponent, duels, rng=None, chunk=32,
+                max_rounds=MAX_ROUNDS):
+    """Fight hero against opponent duels times and return a BatchResult.
+
+    Each duel starts from the heroes' current health and follows the rules
+    of Hero.fight: hero strikes first, both take damage every round and
+    the opponent wins if the hero is dead when the round ends. Duels are
+    a DRAW when neither hero can hurt the other, and a TIMEOUT when they
+    last more than max_rounds rounds, None for no limit. The heroes
+    themselves are not modified. rng may be a numpy Generator or a seed.
+    chunk is the number of rounds drawn at a time for unfinished duels.
+    """
+    rng = np.random.default_rng(rng)
+    winners = np.full(duels, DRAW, dtype=np.int8)
+    rounds = np.zeros(duels, dtype=np.int64)
+
+    if not (hero.can_hurt(opponent) or opponent.can_hurt(hero)):
+        return BatchResult(winners, rounds)
+    hero_attack = attack_ranges(hero)
+    opponent_attack = attack_ranges(opponent)
+
+    hero_block = block_ranges(hero)
+    opponent_block = block_ranges(opponent)
+
+    hero_health = np.full(duels, hero.current_health, dtype=np.int64)
+    opponent_health = np.full(duels, opponent.current_health,
+                              dtype=np.int64)
+    active = np.flatnonzero((hero_health > 0) & (opponent_health > 0))
+    winners[hero_health > 0] = HERO_WINS
+    winners[hero_health <= 0] = OPPONENT_WINS
+
+    while active.size:
+        shape = (active.size, chunk)
+        to_opponent = (_draw(rng, hero_attack, shape)
+                       - _draw(rng, opponent_block, shape))
+        to_hero = (_draw(rng, opponent_attack, shape)
+                   - _draw(rng, hero_block, shape))
+        np.maximum(to_opponent, 0, out=to_opponent)
+        np.maximum(to_hero, 0, out=to_hero)
+
+        hero_left = hero_health[active, None] - np.cumsum(to_hero, axis=1)
+        opponent_left = (opponent_health[active, None]
+                         - np.cumsum(to_opponent, axis=1))
+        over = (hero_left <= 0) | (opponent_left <= 0)
+        done = over.any(axis=1)
+        last = np.argmax(over, axis=1)
+
+        finished = active[done]
+        hero_final = hero_left[done, last[done]]
+        winners[finished] = np.where(hero_final > 0, HERO_WINS,
+                                     OPPONENT_WINS)
+        rounds[finished] += last[done] + 1
+
+        ongoing = ~done
+        still = active[ongoing]
+        hero_health[still] = hero_left[ongoing, -1]
+        opponent_health[still] = opponent_left[ongoing, -1]
+        rounds[still] += chunk
+        active = still
+
+        if max_rounds is not None:
+            # Hero.fight finishes round max_rounds but never starts
+            # another, so anything still going after it timed out.
+            late = finished[rounds[finished] > max_rounds]
+            late = np.concatenate((late, active[rounds[active] >= max_rounds]))
+            winners[late] = TIMEOUT
+            rounds[late] = max_rounds
+            active = active[rounds[active] < max_rounds]
+
+    return BatchResult(winners, rounds)
@@ -0,0 +1,108 @@
+import pytest
+import io
+import sys
+import random
+import superheroes
+
+np = pytest.importorskip("numpy")
+import batch
+
+
+# Helper Function
+
+
+def capture_console_output(function_body):
+    # _io.StringIO object
+    string_io = io.StringIO()
+    sys.stdout = string_io
+    function_body()
+    sys.stdout = sys.__stdout__
+    return string_io.getvalue()
+
+
+def build_pair():
+    hero = superheroes.Hero("Athena", 120)
+    hero.add_ability(superheroes.Ability("Science", 40))
+    hero.add_weapon(superheroes.Weapon("Spear", 30))
+    hero.add_armor(superheroes.Armor("Shield", 15))
+    opponent = superheroes.Hero("Gamora", 150)
+    opponent.add_ability(superheroes.Ability("Speed", 60))
+    opponent.add_armor(superheroes.Armor("Plate", 20))
+    return hero, opponent
+
+
+def test_batch_fight_counts():
+    hero, opponent = build_pair()
+    result = batch.batch_fight(hero, opponent, 500, rng=1)
+    assert len(result.winners) == 500
+    assert result.wins + result.losses == 500
+    assert result.draws == 0
+    assert (result.rounds >= 1).all()
+
+
+def test_batch_fight_leaves_heroes_untouched():
+    hero, opponent = build_pair()
+    batch.batch_fight(hero, opponent, 100, rng=2)
+    assert hero.current_health == 120
+    assert opponent.current_health == 150
+    assert hero.kills == 0 and opponent.deaths == 0
+
+
+def test_batch_fight_draw_without_abilities():
+    hero = superheroes.Hero("Athena")
+    opponent = superheroes.Hero("Gamora")
+    result = batch.batch_fight(hero, opponent, 50)
+    assert result.draws == 50
+    assert (result.rounds == 0).all()
+
+
+def test_batch_fight_one_round_kill():
+    hero = superheroes.Hero("Athena")
+    hero.add_weapon(superheroes.Weapon("Antimatter Gun", 10000))
+    opponent = superheroes.Hero("Gamora")
+    result = batch.batch_fight(hero, opponent, 200, rng=3)
+    assert result.wins == 200
+    assert (result.rounds == 1).all()
+
+
+def test_batch_fight_mutual_kill_goes_to_opponent():
+    hero = superheroes.Hero("Athena", 10)
+    hero.add_weapon(superheroes.Weapon("Antimatter Gun", 10000))
+    opponent = superheroes.Hero("Gamora", 10)
+    opponent.add_weapon(superheroes.Weapon("Star Cannon", 10000))
+    result = batch.batch_fight(hero, opponent, 100, rng=4)
+    assert result.losses == 100
+
+
+def test_batch_fight_matches_hero_fight():
+    random.seed(5)
+    trials = 3000
+    wins = 0
+
+    def play():
+        nonlocal wins
+        for _ in range(trials):
+            hero, opponent = build_pair()
+            hero.fight(opponent)
+            wins += hero.kills
+
+    capture_console_output(play)
+    result = batch.batch_fight(*build_pair(), 20000, rng=5)
+    assert abs(wins / trials - result.win_rate()) < 0.05
+
+
+def test_batch_fight_times_out_like_hero_fight():
+    hero, opponent = build_pair()
+    result = batch.batch_fight(hero, opponent, 200, rng=1, max_rounds=2)
+    assert result.timeouts == 200
+    assert (result.rounds == 2).all()
+    assert hero.fight(opponent, superheroes.NULL_SINK, max_rounds=2) == \
+        superheroes.TIMEOUT
+    result = batch.batch_fight(*build_pair(), 200, rng=1, chunk=7,
+                               max_rounds=5)
+    assert result.timeouts + result.wins + result.losses == 200
+    assert result.timeouts > 0 and result.rounds.max() == 5
+
+
+def test_empty_batch_win_rate():
+    assert batch.batch_fight(*build_pair(), 0, rng=1).win_rate() == 0.0
@@ -0,0 +1,306 @@
+"""Measure how fast the combat code runs and catch slowdowns.
+
+Rosters are built with the random item builders from team_test.py, so the
+benchmarks fight the same kind of heroes the tests do. Each benchmark is
+timed several times and the best run is kept, then run once more under
+tracemalloc for its peak memory. Results are saved as JSON; compare()
+checks a new run against a saved one and lists everything that got slower
+by more than the tolerance.
+
+    python benchmark.py --heroes 500 --output new.json --compare old.json
+"""
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from superheroes import Arena, BufferedSink, NULL_SINK
+from team_test import build_hero, create_team
+
+
+class Roster:
+    """Parameters for the heroes a benchmark fights with"""
+
+    def __init__(self, heroes=200, abilities=2, armors=2, health_scale=1,
+                 seed=0):
+        """heroes: heroes on each team
+        abilities: abilities and weapons per hero, about half of each
+        armors: armors per hero
+        health_scale: starting health as a multiple of the default 100
+        seed: seed for the random module while building
+        """
+        self.heroes = heroes
+        self.abilities = abilities
+        self.armors = armors
+        self.health_scale = health_scale
+        self.seed = seed
+
+    def config(self):
+        return {"heroes": self.heroes, "abilities": self.abilities,
+                "armors": self.armors, "health_scale": self.health_scale,
+                "seed": self.seed}
+
+    def hero(self):
+        """Build one hero"""
+        weapons = self.abilities // 2
+        hero = build_hero(weapons, self.armors, self.abilities - weapons)
+        hero.starting_health = 100 * self.health_scale
+        hero.current_health = hero.starting_health
+        return hero
+
+    def team(self):
+        """Build one team of heroes"""
+        return create_team([self.hero() for _ in range(self.heroes)])
+
+    def teams(self):
+        """Build two teams from self.seed"""
+        state = random.getstate()
+        random.seed(self.seed)
+        try:
+            return self.team(), self.team()
+        finally:
+            random.setstate(state)
+
+
+class Result:
+    """Speed and memory of one benchmark"""
+
+    def __init__(self, name, ops, seconds, duels=0, peak_bytes=0):
+        """ops: operations done in the best run
+        seconds: time the best run took
+        duels: Hero.fight calls in the best run
+        peak_bytes: most memory tracemalloc saw allocated during a run
+        """
+        self.name = name
+        self.ops = ops
+        self.seconds = seconds
+        self.duels = duels
+        self.peak_bytes = peak_bytes
+
+    @property
+    def ops_per_sec(self):
+        return self.ops / self.seconds if self.seconds else 0.0
+
+    @property
+    def duels_per_sec(self):
+        return self.duels / self.seconds if self.seconds else 0.0
+
+    def to_dict(self):
+        return {"ops": self.ops, "seconds": self.seconds,
+                "ops_per_sec": self.ops_per_sec,
+                "duels": self.duels, "duels_per_sec": self.duels_per_sec,
+                "peak_bytes": self.peak_bytes}
+
+
+def time_best(run, repeat):
+    """Call run() repeat times.
+    run: returns (ops, duels) and does its own setup outside the timing
+    return: (ops, duels, seconds) of the fastest call
+    """
+    best = None
+    for _ in range(repeat):
+        ops, duels, seconds = run()
+        if best is None or seconds < best[2]:
+            best = (ops, duels, seconds)
+    return best
+
+
+def peak_memory(run):
+    """Peak bytes allocated by one more call of run()"""
+    tracemalloc.start()
+    try:
+        run()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_hero_method(method, count):
+    """Time count calls of method on a hero that stays alive"""
+    def run(hero):
+        call = getattr(hero, method)
+        if method == "take_damage":
+            saved = hero.starting_health, hero.current_health
+            hero.starting_health = hero.current_health = 1 << 62
+            try:
+                start = time.perf_counter()
+                for _ in range(count):
+                    call(1)
+                seconds = time.perf_counter() - start
+            finally:
+                hero.starting_health, hero.current_health = saved
+            return count, 0, seconds
+        start = time.perf_counter()
+        for _ in range(count):
+            call()
+        return count, 0, time.perf_counter() - start
+    return run
+
+
+def bench_fight(team_one, team_two):
+    """Fight every hero of team_one against the same place on team_two"""
+    pairs = list(zip(team_one.heroes, team_two.heroes))
+
+    def run():
+        for hero, opponent in pairs:
+            hero.current_health = hero.starting_health
+            opponent.current_health = opponent.starting_health
+        start = time.perf_counter()
+        for hero, opponent in pairs:
+            hero.fight(opponent, NULL_SINK)
+        return len(pairs), len(pairs), time.perf_counter() - start
+    return run
+
+
+def bench_team_attack(team_one, team_two):
+    """Play one Team.attack between the teams, counting the duels"""
+    start_one = team_one.snapshot()
+    start_two = team_two.snapshot()
+
+    def run():
+        team_one.restore(start_one)
+        team_two.restore(start_two)
+        start = time.perf_counter()
+        team_one.attack(team_two, NULL_SINK)
+        seconds = time.perf_counter() - start
+        duels = sum(hero.kills for hero in team_one.heroes + team_two.heroes)
+        team_one.restore(start_one)
+        team_two.restore(start_two)
+        return 1, duels, seconds
+    return run
+
+
+def bench_living(team, count):
+    """Time count calls of get_living_heroes on a team"""
+    def run():
+        start = time.perf_counter()
+        for _ in range(count):
+            team.get_living_heroes(team)
+        return count, 0, time.perf_counter() - start
+    return run
+
+
+def bench_show_stats(team_one, team_two, count):
+    """Time count calls of Arena.show_stats, written to a string"""
+    def run():
+        stream = io.StringIO()
+        arena = Arena(BufferedSink(stream))
+        arena.team_one = team_one
+        arena.team_two = team_two
+        start = time.perf_counter()
+        for _ in range(count):
+            arena.show_stats()
+        return count, 0, time.perf_counter() - start
+    return run
+
+
+def run_benchmarks(roster=None, count=10000, repeat=5):
+    """Run every benchmark on teams built from roster.
+    count: calls per run for the benchmarks of single methods
+    return: List of Result
+    """
+    if roster is None:
+        roster = Roster()
+    team_one, team_two = roster.teams()
+    hero = team_one.heroes[0]
+    random.seed(roster.seed)
+
+    benchmarks = [
+        ("hero_attack", lambda: bench_hero_method("attack", count)(hero)),
+        ("hero_defend", lambda: bench_hero_method("defend", count)(hero)),
+        ("hero_take_damage",
+         lambda: bench_hero_method("take_damage", count)(hero)),
+        ("hero_fight", bench_fight(team_one, team_two)),
+        ("team_attack", bench_team_attack(team_one, team_two)),
+        ("team_get_living_heroes", bench_living(team_one, count // 10 or 1)),
+        ("arena_show_stats",
+         bench_show_stats(team_one, team_two, count // 100 or 1)),
+    ]
+    start_one = team_one.snapshot()
+    results = []
+    for name, run in benchmarks:
+        ops, duels, seconds = time_best(run, repeat)
+        peak = peak_memory(run)
+        team_one.restore(start_one)
+        results.append(Result(name, ops, seconds, duels, peak))
+    return results
+
+
+def report(results, roster):
+    """Return results as a dictionary ready for json"""
+    return {"config": roster.config(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {result.name: result.to_dict()
+                        for result in results}}
+
+
+def compare(baseline, current, tolerance=0.1):
+    """Find benchmarks that got slower.
+    baseline, current: dictionaries made by report
+    tolerance: fraction of ops/sec a benchmark may lose before it counts
+    return: List of (name, baseline ops/sec, current ops/sec)
+    Raises ValueError if the runs were made with different rosters.
+    """
+    if baseline.get("config") != current.get("config"):
+        raise ValueError("cannot compare runs with different configs: "
+                         f"{baseline.get('config')} and "
+                         f"{current.get('config')}")
+    slower = []
+    for name, old in baseline["results"].items():
+        new = current["results"].get(name)
+        if new is None:
+            continue
+        if new["ops_per_sec"] < old["ops_per_sec"] * (1 - tolerance):
+            slower.append((name, old["ops_per_sec"], new["ops_per_sec"]))
+    return slower
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--heroes", type=int, default=200)
+    parser.add_argument("--abilities", type=int, default=2)
+    parser.add_argument("--armors", type=int, default=2)
+    parser.add_argument("--health-scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="save the results to this file")
+    parser.add_argument("--compare", help="fail if slower than this file")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    roster = Roster(args.heroes, args.abilities, args.armors,
+                    args.health_scale, args.seed)
+    results = run_benchmarks(roster, args.count, args.repeat)
+    for result in results:
+        line = f"{result.name:24} {result.ops_per_sec:14,.0f} ops/s"
+        if result.duels:
+            line += f" {result.duels_per_sec:12,.0f} duels/s"
+        print(f"{line} {result.peak_bytes / 1024:10,.1f} KiB peak")
+
+    data = report(results, roster)
+    if args.output:
+        with open(args.output, "w") as stream:
+            json.dump(data, stream, indent=2)
+    if args.compare:
+        with open(args.compare) as stream:
+            baseline = json.load(stream)
+        try:
+            slower = compare(baseline, data, args.tolerance)
+        except ValueError as error:
+            print(error)
+            return 2
+        for name, old, new in slower:
+            print(f"{name} slowed from {old:,.0f} to {new:,.0f} ops/s")
+        if slower:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+import json
+import pytest
+import benchmark
+
+
+def test_roster_is_reproducible():
+    roster = benchmark.Roster(heroes=5, abilities=3, armors=1,
+                              health_scale=2, seed=4)
+    one, _ = roster.teams()
+    again, _ = roster.teams()
+    assert [hero.name for hero in one.heroes] == \
+        [hero.name for hero in again.heroes]
+    assert len(one.heroes[0].abilities) == 3
+    assert len(one.heroes[0].armors) == 1
+    assert one.heroes[0].current_health == 200
+
+
+def test_run_benchmarks(tmp_path):
+    roster = benchmark.Roster(heroes=10)
+    results = benchmark.run_benchmarks(roster, count=50, repeat=1)
+    names = [result.name for result in results]
+    assert "hero_fight" in names and "arena_show_stats" in names
+    for result in results:
+        assert result.ops_per_sec > 0
+        assert result.peak_bytes > 0
+    fight = results[names.index("hero_fight")]
+    assert fight.duels_per_sec > 0
+
+    data = benchmark.report(results, roster)
+    path = tmp_path / "run.json"
+    path.write_text(json.dumps(data))
+    assert json.loads(path.read_text())["config"]["heroes"] == 10
+
+
+def test_compare_flags_slowdowns():
+    baseline = {"results": {"fast": {"ops_per_sec": 100.0},
+                            "slow": {"ops_per_sec": 100.0}}}
+    current = {"results": {"fast": {"ops_per_sec": 95.0},
+                           "slow": {"ops_per_sec": 50.0}}}
+    assert benchmark.compare(baseline, current, 0.1) == \
+        [("slow", 100.0, 50.0)]
+    assert benchmark.compare(baseline, baseline) == []
+
+
+def test_main_fails_on_slowdown(tmp_path, capsys):
+    baseline = tmp_path / "base.json"
+    baseline.write_text(json.dumps(
+        {"config": benchmark.Roster(heroes=4).config(),
+         "results": {"hero_attack": {"ops_per_sec": 1e12}}}))
+    argv = ["--heroes", "4", "--count", "20", "--repeat", "1"]
+    assert benchmark.main(argv) == 0
+    assert benchmark.main(argv + ["--compare", str(baseline)]) == 1
+    assert "hero_attack slowed" in capsys.readouterr().out
+
+
+def test_compare_refuses_different_configs(tmp_path, capsys):
+    baseline = {"config": {"heroes": 10}, "results": {}}
+    with pytest.raises(ValueError):
+        benchmark.compare(baseline, {"config": {"heroes": 20},
+                                     "results": {}})
+    path = tmp_path / "base.json"
+    path.write_text(json.dumps(baseline))
+    argv = ["--heroes", "4", "--count", "20", "--repeat", "1",
+            "--compare", str(path)]
+    assert benchmark.main(argv) == 2
+    assert "different configs" in capsys.readouterr().out
+
+
+def test_take_damage_leaves_the_hero_as_it_was():
+    team, _ = benchmark.Roster(heroes=2).teams()
+    hero = team.heroes[0]
+    benchmark.bench_hero_method("take_damage", 10)(hero)
+    assert hero.starting_health == hero.current_health == 100
@@ -0,0 +1,196 @@
+"""Remember matchup odds between hero loadouts, in memory and on disk.
+
+A hero's fingerprint depends only on what decides a fight at full
+health: starting_health and the kind and strength of every ability,
+weapon and armor, in any order. Names are left out, so two heroes with
+the same gear share cached odds.
+
+MatchupCache keeps recent results in a least recently used dictionary
+limited to max_bytes, and every result in a SQLite file limited to
+max_rows. The file survives restarts; the least recently used rows are
+deleted first when it is full.
+"""
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+
+from streams import RandomStream
+from superheroes import (HERO_WINS, NULL_SINK, OPPONENT_WINS, Hero,
+                         Weapon)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matchups (
+    hero TEXT NOT NULL,
+    opponent TEXT NOT NULL,
+    win REAL NOT NULL,
+    loss REAL NOT NULL,
+    draw REAL NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (hero, opponent)
+)
+"""
+
+
+def fingerprint(hero):
+    """Return a short string that is the same for equal loadouts"""
+    items = []
+    for ability in hero.abilities:
+        kind = "weapon" if isinstance(ability, Weapon) else "ability"
+        items.append((kind, ability.max_damage))
+    for armor in hero.armors:
+        items.append(("armor", armor.max_block))
+    canonical = repr((hero.starting_health, sorted(items)))
+    return blake2b(canonical.encode(), digest_size=16).hexdigest()
+
+
+def fresh_copy(hero):
+    """Return a new Hero with hero's gear at full health"""
+    copy = Hero(hero.name, hero.starting_health)
+    copy.abilities = list(hero.abilities)
+    copy.armors = list(hero.armors)
+    return copy
+
+
+def duel_odds(hero, opponent, trials=4000):
+    """Chances that hero beats, loses to or draws with opponent when both
+    start at full health. Exact when NumPy is installed, simulated with
+    trials battles otherwise.
+    return: (win, loss, draw)
+    """
+    hero = fresh_copy(hero)
+    opponent = fresh_copy(opponent)
+    try:
+        from exact import duel_odds as exact_odds
+    except ImportError:
+        hero.rng = opponent.rng = RandomStream(0)
+        counts = [0, 0, 0, 0]
+        for _ in range(trials):
+            hero.current_health = hero.starting_health
+            opponent.current_health = opponent.starting_health
+            counts[hero.fight(opponent, NULL_SINK)] += 1
+        wins = counts[HERO_WINS]
+        losses = counts[OPPONENT_WINS]
+        return wins / trials, losses / trials, 1 - (wins + losses) / trials
+    odds = exact_odds(hero, opponent)
+    return float(odds.win), float(odds.loss), float(odds.draw)
+
+
+def entry_size(key, value):
+    """Bytes an in-memory entry takes, roughly"""
+    return (sys.getsizeof(key) + sum(map(sys.getsizeof, key)) +
+            sys.getsizeof(value) + sum(map(sys.getsizeof, value)))
+
+
+class MatchupCache:
+    """Least recently used matchup odds backed by a SQLite file"""
+
+    def __init__(self, path=None, max_bytes=1 << 20, max_rows=100000,
+                 compute=duel_odds):
+        """path: SQLite file to keep results in, memory only when None
+        max_bytes: size the in-memory entries may grow to
+        max_rows: rows the file may hold
+        compute: function(hero, opponent) returning (win, loss, draw)
+        """
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.compute = compute
+        self.entries = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.db = None
+        if path is not None:
+            self.db = sqlite3.connect(path)
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("PRAGMA synchronous=NORMAL")
+            self.db.execute(SCHEMA)
+            self.db.commit()
+
+    def odds(self, hero, opponent):
+        """Return (win, loss, draw) of hero against opponent"""
+        key = (fingerprint(hero), fingerprint(opponent))
+        value = self.get(key)
+        if value is None:
+            self.misses += 1
+            value = tuple(self.compute(hero, opponent))
+            self.put(key, value)
+        return value
+
+    def get(self, key):
+        """Return the cached value for key, or None"""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+        if self.db is None:
+            return None
+
+        row = self.db.execute(
+            "SELECT win, loss, draw FROM matchups "
+            "WHERE hero = ? AND opponent = ?", key).fetchone()
+        if row is None:
+            return None
+        self.db.execute("UPDATE matchups SET used = ? "
+                        "WHERE hero = ? AND opponent = ?",
+                        (time.time(), *key))
+        self.db.commit()
+        self.disk_hits += 1
+        self._remember(key, row)
+        return row
+
+    def put(self, key, value):
+        """Cache value for key in memory and on disk"""
+        self._remember(key, value)
+        if self.db is None:
+            return
+        self.db.execute("INSERT OR REPLACE INTO matchups "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (*key, *value, time.time()))
+        rows = self.db.execute("SELECT COUNT(*) FROM matchups").fetchone()[0]
+        if rows > self.max_rows:
+            self.db.execute(
+                "DELETE FROM matchups WHERE rowid IN (SELECT rowid FROM "
+                "matchups ORDER BY used LIMIT ?)", (rows - self.max_rows,))
+        self.db.commit()
+
+    def _remember(self, key, value):
+        """Keep an entry in memory, dropping the oldest ones to fit"""
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= entry_size(key, old)
+        self.entries[key] = value
+        self.nbytes += entry_size(key, value)
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            oldest, dropped = self.entries.popitem(last=False)
+            self.nbytes -= entry_size(oldest, dropped)
+            self.evictions += 1
+
+    def stats(self):
+        """Return hit counts and sizes as a dictionary"""
+        lookups = self.hits + self.disk_hits + self.misses
+        rows = 0
+        if self.db is not None:
+            rows = self.db.execute(
+                "SELECT COUNT(*) FROM matchups").fetchone()[0]
+        return {"hits": self.hits, "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups
+                if lookups else 0.0,
+                "entries": len(self.entries), "bytes": self.nbytes,
+                "evictions": self.evictions, "rows": rows}
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
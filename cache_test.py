@@ -0,0 +1,90 @@
+import pytest
+import superheroes
+import cache
+
+
+def build_hero(name, damage=40, block=10, health=100):
+    hero = superheroes.Hero(name, health)
+    hero.add_ability(superheroes.Ability("Science", damage))
+    hero.add_weapon(superheroes.Weapon("Spear", 30))
+    hero.add_armor(superheroes.Armor("Shield", block))
+    return hero
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, hero, opponent):
+        self.calls += 1
+        return (0.5, 0.25, 0.25)
+
+
+def test_fingerprint_ignores_names_and_order():
+    athena = build_hero("Athena")
+    gamora = superheroes.Hero("Gamora", 100)
+    gamora.add_armor(superheroes.Armor("Socks", 10))
+    gamora.add_weapon(superheroes.Weapon("Sword", 30))
+    gamora.add_ability(superheroes.Ability("Luck", 40))
+    assert cache.fingerprint(athena) == cache.fingerprint(gamora)
+    assert cache.fingerprint(athena) != \
+        cache.fingerprint(build_hero("Athena", health=101))
+    okoye = superheroes.Hero("Okoye", 100)
+    okoye.add_ability(superheroes.Ability("Spear", 30))
+    okoye.add_ability(superheroes.Ability("Science", 40))
+    okoye.add_armor(superheroes.Armor("Shield", 10))
+    # A weapon is not the same as an ability of the same strength
+    assert cache.fingerprint(athena) != cache.fingerprint(okoye)
+
+
+def test_memory_hits():
+    compute = Counter()
+    matchups = cache.MatchupCache(compute=compute)
+    for _ in range(5):
+        assert matchups.odds(build_hero("Athena"),
+                             build_hero("Gamora", 20)) == (0.5, 0.25, 0.25)
+    matchups.odds(build_hero("Gamora", 20), build_hero("Athena"))
+    assert compute.calls == 2
+    stats = matchups.stats()
+    assert stats["hits"] == 4 and stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(4 / 6)
+
+
+def test_evicts_by_size():
+    matchups = cache.MatchupCache(compute=Counter(), max_bytes=2000)
+    for damage in range(50):
+        matchups.odds(build_hero("Athena", damage), build_hero("Gamora"))
+    stats = matchups.stats()
+    assert stats["bytes"] <= 2000
+    assert stats["evictions"] == 50 - stats["entries"]
+    assert stats["entries"] > 1
+
+
+def test_disk_survives_restart(tmp_path):
+    path = str(tmp_path / "matchups.sqlite")
+    compute = Counter()
+    with cache.MatchupCache(path, compute=compute) as matchups:
+        matchups.odds(build_hero("Athena"), build_hero("Gamora", 20))
+    with cache.MatchupCache(path, compute=compute) as matchups:
+        matchups.odds(build_hero("Okoye"), build_hero("Nakia", 20))
+        assert matchups.stats()["disk_hits"] == 1
+    assert compute.calls == 1
+
+
+def test_disk_row_limit(tmp_path):
+    path = str(tmp_path / "matchups.sqlite")
+    with cache.MatchupCache(path, compute=Counter(), max_rows=10) as m:
+        for damage in range(30):
+            m.odds(build_hero("Athena", damage), build_hero("Gamora"))
+        assert m.stats()["rows"] == 10
+
+
+def test_default_compute_is_sensible():
+    strong = build_hero("Athena", damage=400)
+    weak = superheroes.Hero("Gamora", 50)
+    weak.add_ability(superheroes.Ability("Poke", 1))
+    weak.take_damage(10)
+    win, loss, draw = cache.duel_odds(strong, weak, trials=200)
+    assert win > 0.95
+    assert win + loss + draw == pytest.approx(1)
+    assert weak.current_health == 40
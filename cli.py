@@ -0,0 +1,177 @@
+"""Play many matches between two teams without any prompts.
+
+    python cli.py red.jsonl blue.jsonl --matches 1000 --seed 7 --workers 4
+
+Teams come from roster files: JSON Lines or CSV as read by loader.py, or
+.roster files saved by roster.Roster. The first two teams found play
+every match. Nothing is printed while a battle runs; instead one JSON
+record per match is streamed to stdout, or to --output, in match order.
+The last line holds the totals: wins, draws, win rates and kill/death
+ratios for both teams.
+
+Match k always uses the same random stream, so a seed reproduces a run
+exactly whatever the number of workers.
+"""
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from loader import load_teams
+from roster import Roster
+from simulation import TEAM_ONE_WINS, TEAM_TWO_WINS, outcome
+from streams import RandomStream
+from superheroes import Arena, NULL_SINK
+
+# Teams and seed held by this process, set once per worker.
+_match = None
+
+
+def _load_match(team_one, team_two, seed):
+    """Pool initializer: keep the teams and seed in this process"""
+    global _match
+    _match = (team_one, team_two, seed)
+
+
+def play_match(number):
+    """Play match number and put the teams back afterwards.
+    return: Dictionary describing the match
+    """
+    team_one, team_two, seed = _match
+    start_one = team_one.snapshot()
+    start_two = team_two.snapshot()
+    sources = [(owner, owner.rng) for team in (team_one, team_two)
+               for owner in [team] + team.heroes]
+    arena = Arena(NULL_SINK)
+    arena.team_one = team_one
+    arena.team_two = team_two
+    arena.set_rng(RandomStream(seed, (number,)))
+    arena.team_battle()
+    result = outcome(team_one, team_two)
+    # Sides are counted by position, names are only for reading.
+    if result == TEAM_ONE_WINS:
+        side, winner = 0, team_one.name
+    elif result == TEAM_TWO_WINS:
+        side, winner = 1, team_two.name
+    else:
+        side = winner = None
+    record = {"match": number, "winner": winner, "side": side,
+              "survivors": [len(team_one.living), len(team_two.living)],
+              "kills": [team_one.kill_stats.total,
+                        team_two.kill_stats.total],
+              "deaths": [team_one.death_stats.total,
+                         team_two.death_stats.total]}
+    team_one.restore(start_one)
+    team_two.restore(start_two)
+    for owner, rng in sources:
+        owner.rng = rng
+    return record
+
+
+class Totals:
+    """Adds up match records"""
+
+    def __init__(self, team_one, team_two):
+        """team_one, team_two: names of the teams"""
+        self.names = [team_one, team_two]
+        self.matches = 0
+        self.wins = [0, 0]
+        self.draws = 0
+        self.kills = [0, 0]
+        self.deaths = [0, 0]
+
+    def add(self, record):
+        """Count one match record"""
+        self.matches += 1
+        if record["side"] is None:
+            self.draws += 1
+        else:
+            self.wins[record["side"]] += 1
+        for side in (0, 1):
+            self.kills[side] += record["kills"][side]
+            self.deaths[side] += record["deaths"][side]
+
+    def summary(self):
+        """Return the totals as a dictionary"""
+        teams = []
+        for side in (0, 1):
+            kills = self.kills[side]
+            deaths = self.deaths[side]
+            teams.append({
+                "name": self.names[side],
+                "wins": self.wins[side],
+                "win_rate": self.wins[side] / self.matches
+                if self.matches else 0.0,
+                "kills": kills,
+                "deaths": deaths,
+                "kill_death_ratio": kills / deaths if deaths else None})
+        return {"matches": self.matches, "draws": self.draws,
+                "teams": teams}
+
+
+def read_teams(paths):
+    """Load every team in the roster files, in order"""
+    teams = []
+    for path in paths:
+        if str(path).endswith(".roster"):
+            teams.append(Roster.load(path).team())
+        else:
+            teams.extend(load_teams(path))
+    return teams
+
+
+def run_matches(team_one, team_two, matches, seed=None, workers=1):
+    """Yield a record for each match, in match order"""
+    seed = RandomStream(seed).entropy
+    if workers == 1:
+        _load_match(team_one, team_two, seed)
+        yield from map(play_match, range(matches))
+        return
+
+    chunk = max(1, matches // (workers * 8))
+    with ProcessPoolExecutor(workers, initializer=_load_match,
+                             initargs=(team_one, team_two, seed)) as pool:
+        yield from pool.map(play_match, range(matches), chunksize=chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Play matches between two teams from roster files")
+    parser.add_argument("rosters", nargs="+",
+                        help="JSON Lines, CSV or .roster files")
+    parser.add_argument("--matches", type=int, default=1)
+    parser.add_argument("--seed", type=int,
+                        help="fresh and reported in the totals when left out")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--output", help="write records here, not stdout")
+    args = parser.parse_args(argv)
+
+    try:
+        teams = read_teams(args.rosters)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if len(teams) < 2:
+        parser.error("the roster files must hold at least two teams")
+    if args.matches < 1 or args.workers < 1:
+        parser.error("--matches and --workers must be at least 1")
+
+    team_one, team_two = teams[:2]
+    seed = RandomStream(args.seed).entropy
+    totals = Totals(team_one.name, team_two.name)
+    stream = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for record in run_matches(team_one, team_two, args.matches, seed,
+                                  args.workers):
+            totals.add(record)
+            stream.write(json.dumps(record) + "\n")
+        summary = totals.summary()
+        summary["seed"] = seed
+        stream.write(json.dumps({"summary": summary}) + "\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
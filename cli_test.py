@@ -0,0 +1,91 @@
+import json
+import subprocess
+import sys
+import superheroes
+import loader
+import roster
+import cli
+from team_test import build_squad
+
+
+def build_team(name):
+    return build_squad(name, ["Athena", "Gamora"], health=80, science=35)
+
+
+def write_rosters(tmp_path):
+    path = str(tmp_path / "teams.jsonl")
+    loader.write_jsonl([build_team("Red"), build_team("Blue")], path)
+    return path
+
+
+def read_records(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_matches_stream_records(tmp_path, capsys):
+    path = write_rosters(tmp_path)
+    assert cli.main([path, "--matches", "20", "--seed", "3"]) == 0
+    records = read_records(capsys.readouterr().out)
+    assert [record["match"] for record in records[:-1]] == list(range(20))
+    summary = records[-1]["summary"]
+    assert summary["matches"] == 20
+    assert summary["seed"] == 3
+    red, blue = summary["teams"]
+    assert red["name"] == "Red" and blue["name"] == "Blue"
+    assert red["wins"] + blue["wins"] + summary["draws"] == 20
+    assert red["kills"] == blue["deaths"]
+
+
+def test_workers_give_the_same_records(tmp_path):
+    path = write_rosters(tmp_path)
+    serial = str(tmp_path / "serial.jsonl")
+    pooled = str(tmp_path / "pooled.jsonl")
+    cli.main([path, "--matches", "30", "--seed", "9", "--output", serial])
+    cli.main([path, "--matches", "30", "--seed", "9", "--workers", "2",
+              "--output", pooled])
+    with open(serial) as one, open(pooled) as two:
+        assert one.read() == two.read()
+
+
+def test_teams_with_the_same_name(tmp_path, capsys):
+    red = str(tmp_path / "red.roster")
+    other = str(tmp_path / "other.roster")
+    strong = build_team("Red")
+    for hero in strong.heroes:
+        hero.add_weapon(superheroes.Weapon("Spear", 200))
+    roster.Roster.from_team(build_team("Red")).save(red)
+    roster.Roster.from_team(strong).save(other)
+    cli.main([red, other, "--matches", "10", "--seed", "1"])
+    records = read_records(capsys.readouterr().out)
+    assert all(record["side"] == 1 for record in records[:-1])
+    weak, strong = records[-1]["summary"]["teams"]
+    assert (weak["wins"], strong["wins"]) == (0, 10)
+    assert strong["kills"] == weak["deaths"] == 20
+
+
+def test_play_match_puts_random_streams_back():
+    team_one, team_two = build_team("Red"), build_team("Blue")
+    sources = [owner.rng for team in (team_one, team_two)
+               for owner in [team] + team.heroes]
+    cli._load_match(team_one, team_two, 5)
+    cli.play_match(0)
+    assert [owner.rng for team in (team_one, team_two)
+            for owner in [team] + team.heroes] == sources
+
+
+def test_roster_files(tmp_path, capsys):
+    red = str(tmp_path / "red.roster")
+    blue = str(tmp_path / "blue.roster")
+    roster.Roster.from_team(build_team("Red")).save(red)
+    roster.Roster.from_team(build_team("Blue")).save(blue)
+    cli.main([red, blue, "--matches", "5"])
+    assert read_records(capsys.readouterr().out)[-1]["summary"]["matches"] \
+        == 5
+
+
+def test_superheroes_main_runs_headless(tmp_path):
+    path = write_rosters(tmp_path)
+    output = subprocess.run(
+        [sys.executable, "superheroes.py", path, "--matches", "3"],
+        capture_output=True, text=True, check=True).stdout
+    assert len(read_records(output)) == 4
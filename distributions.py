@@ -0,0 +1,91 @@
+"""Exact distributions of summed damage and block, sampled in one draw.
+
+A hero's attack is the sum of one uniform draw per ability, so its
+distribution is the convolution of those uniform ranges. Counting the ways
+to reach every total gives exact integer weights, and a Walker alias table
+built from them returns a whole round's total from a single random number.
+"""
+from functools import lru_cache
+from random import random
+
+# Loadouts whose totals span more values than this keep drawing per item.
+MAX_TABLE_SIZE = 4096
+
+
+def uniform_sum_counts(ranges):
+    """Count the ways each total can come from one draw per range.
+    ranges: inclusive (low, high) integer ranges
+    return: List where index i counts the ways to reach sum(lows) + i
+    """
+    counts = [1]
+    for low, high in ranges:
+        width = high - low + 1
+        summed = [0]
+        for count in counts:
+            summed.append(summed[-1] + count)
+        size = len(counts) + width - 1
+        counts = [summed[min(k + 1, len(counts))]
+                  - summed[max(0, k - width + 1)]
+                  for k in range(size)]
+    return counts
+
+
+class AliasTable:
+    """Walker alias table for sampling a fixed discrete distribution"""
+
+    __slots__ = ("offset", "probability", "alias")
+
+    def __init__(self, weights, offset=0):
+        """weights: List of non-negative weights, one per outcome
+        offset: value of the first outcome
+        """
+        size = len(weights)
+        total = sum(weights)
+        scaled = [weight * size / total for weight in weights]
+        self.offset = offset
+        self.probability = [1.0] * size
+        self.alias = list(range(size))
+
+        small = [i for i, weight in enumerate(scaled) if weight < 1.0]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1.0 - scaled[less]
+            if scaled[more] < 1.0:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def __len__(self):
+        return len(self.alias)
+
+    def sample(self, draw=random):
+        """Return one outcome using a single call to draw"""
+        u = draw() * len(self.alias)
+        index = int(u)
+        if u - index >= self.probability[index]:
+            index = self.alias[index]
+        return self.offset + index
+
+
+@lru_cache(maxsize=1024)
+def _table(ranges):
+    """Build and share the alias table for a sorted tuple of ranges"""
+    return AliasTable(uniform_sum_counts(ranges),
+                      sum(low for low, _ in ranges))
+
+
+def sum_table(ranges):
+    """Return an AliasTable for the sum of one draw per range.
+    Even a single range pays off, as one sample is cheaper than randint.
+    Returns None when there are no ranges, or more than MAX_TABLE_SIZE
+    possible totals.
+    """
+    if not ranges:
+        return None
+    if sum(high - low for low, high in ranges) + 1 > MAX_TABLE_SIZE:
+        return None
+    return _table(tuple(sorted(ranges)))
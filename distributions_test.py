@@ -0,0 +1,39 @@
+import pytest
+import random
+import distributions
+
+
+def test_uniform_sum_counts():
+    # One draw from 0..2 plus one from 1..3
+    assert distributions.uniform_sum_counts([(0, 2), (1, 3)]) == \
+        [1, 2, 3, 2, 1]
+    assert distributions.uniform_sum_counts([(5, 5)]) == [1]
+    assert sum(distributions.uniform_sum_counts([(0, 9)] * 3)) == 1000
+
+
+def test_alias_table_frequencies():
+    random.seed(3)
+    table = distributions.AliasTable([1, 2, 3, 4], offset=10)
+    counts = {value: 0 for value in range(10, 14)}
+    draws = 40000
+    for _ in range(draws):
+        counts[table.sample()] += 1
+    for value, weight in zip(range(10, 14), [1, 2, 3, 4]):
+        assert abs(counts[value] / draws - weight / 10) < 0.01
+
+
+def test_alias_table_skips_impossible_values():
+    table = distributions.AliasTable([0, 5, 0, 5])
+    for _ in range(1000):
+        assert table.sample() in (1, 3)
+
+
+def test_sum_table_limits():
+    assert distributions.sum_table([]) is None
+    assert len(distributions.sum_table([(0, 100)])) == 101
+    assert distributions.sum_table([(0, 700000), (0, 5)]) is None
+    table = distributions.sum_table([(50, 100), (0, 30)])
+    assert table.offset == 50
+    assert len(table) == 81
+    # Identical loadouts share one table
+    assert distributions.sum_table([(0, 30), (50, 100)]) is table
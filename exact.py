@@ -0,0 +1,149 @@
+"""Work out the exact odds of Hero.fight instead of sampling it.
+
+A round of Hero.fight sums uniform draws from every ability and armor, so
+the damage each hero deals in a round has a distribution that can be built
+once by convolution. The fight is then a walk over (hero health, opponent
+health) states, which is pushed forward one round at a time until the
+probability of the fight still going on is negligible.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from batch import attack_ranges, block_ranges
+
+
+def uniform_sum_pmf(ranges):
+    """Return the distribution of the sum of one uniform draw per range.
+    ranges: inclusive (low, high) integer ranges
+    return: array where index i is the probability that the sum is i
+    """
+    pmf = np.ones(1)
+    for low, high in ranges:
+        # Entry k of the new pmf is the mass of pmf over k - high .. k - low.
+        summed = np.concatenate(([0.0], np.cumsum(pmf)))
+        k = np.arange(len(pmf) + high)
+        upper = summed[np.clip(k - low + 1, 0, len(pmf))]
+        lower = summed[np.clip(k - high, 0, len(pmf))]
+        pmf = (upper - lower) / (high - low + 1)
+    return pmf
+
+
+def net_damage_pmf(attack, block, cap):
+    """Return the distribution of max(0, attack - block).
+    Damage of cap or more is gathered into the last entry.
+    """
+    difference = np.convolve(attack, block[::-1])
+    zero = len(block) - 1
+    pmf = difference[zero:].copy()
+    pmf[0] += difference[:zero].sum()
+    if len(pmf) > cap + 1:
+        pmf[cap] = pmf[cap:].sum()
+        pmf = pmf[:cap + 1]
+    return pmf
+
+
+@lru_cache(maxsize=None)
+def _pmf(ranges):
+    """Cached uniform_sum_pmf keyed by a tuple of ranges"""
+    return uniform_sum_pmf(ranges)
+
+
+def loadout(hero):
+    """Return a hashable summary of everything that decides a fight"""
+    return (hero.current_health, bool(hero.abilities),
+            tuple(sorted(attack_ranges(hero))),
+            tuple(sorted(block_ranges(hero))))
+
+
+class DuelOdds:
+    """Exact outcome probabilities for one hero against another"""
+
+    def __init__(self, win, loss, draw, rounds):
+        """win: chance the hero wins
+        loss: chance the opponent wins
+        draw: chance the fight never ends, or ends in a draw
+        rounds: array where index r is the chance the fight ends in round r
+        """
+        self.win = win
+        self.loss = loss
+        self.draw = draw
+        self.rounds = rounds
+
+    def expected_rounds(self):
+        """Average length of the fights that finish"""
+        finished = self.rounds.sum()
+        if finished == 0:
+            return 0.0
+        return float(np.arange(len(self.rounds)) @ self.rounds / finished)
+
+
+def duel_odds(hero, opponent, tolerance=1e-12, max_rounds=100000):
+    """Return the DuelOdds of hero.fight(opponent) from current health.
+    Results are memoized on the loadouts of both heroes.
+    """
+    return _solve(loadout(hero), loadout(opponent), tolerance, max_rounds)
+
+
+@lru_cache(maxsize=4096)
+def _solve(hero, opponent, tolerance, max_rounds):
+    """Push the fight forward round by round from the starting state"""
+    health_a, armed_a, attack_a, block_a = hero
+    health_b, armed_b, attack_b, block_b = opponent
+
+    if not armed_a and not armed_b:
+        return DuelOdds(0.0, 0.0, 1.0, np.zeros(1))
+    if health_a <= 0:
+        return DuelOdds(0.0, 1.0, 0.0, np.ones(1))
+    if health_b <= 0:
+        return DuelOdds(1.0, 0.0, 0.0, np.ones(1))
+
+    # to_b[d] is the chance the opponent loses d health in a round.
+    to_b = net_damage_pmf(_pmf(attack_a), _pmf(block_b), health_b)
+    to_a = net_damage_pmf(_pmf(attack_b), _pmf(block_a), health_a)
+    if to_b[0] == 1.0 and to_a[0] == 1.0:
+        return DuelOdds(0.0, 0.0, 1.0, np.zeros(1))
+
+    # state[i, j] is the chance the hero has i + 1 health and the
+    # opponent j + 1 health with the fight still going.
+    state = np.zeros((health_a, health_b))
+    state[-1, -1] = 1.0
+    win = loss = 0.0
+    rounds = [0.0]
+
+    while len(rounds) <= max_rounds:
+        # The hero strikes first.
+        struck = np.zeros_like(state)
+        opponent_dead = np.zeros(health_a)
+        below = np.cumsum(state, axis=1)
+        for damage in np.flatnonzero(to_b):
+            chance = to_b[damage]
+            if damage < health_b:
+                struck[:, :health_b - damage] += chance * state[:, damage:]
+            if damage:
+                opponent_dead += chance * below[:, min(damage, health_b) - 1]
+
+        # Then the opponent strikes back, even if already beaten.
+        after = np.zeros_like(state)
+        alive_below = np.cumsum(struck.sum(axis=1) + opponent_dead)
+        dead_above = np.cumsum(opponent_dead[::-1])[::-1]
+        ended = 0.0
+        for damage in np.flatnonzero(to_a):
+            chance = to_a[damage]
+            if damage < health_a:
+                after[:health_a - damage] += chance * struck[damage:]
+                won = chance * dead_above[damage]
+                win += won
+                ended += won
+            if damage:
+                lost = chance * alive_below[min(damage, health_a) - 1]
+                loss += lost
+                ended += lost
+
+        rounds.append(ended)
+        state = after
+        if state.sum() < tolerance:
+            break
+
+    rounds = np.array(rounds)
+    return DuelOdds(win, loss, max(0.0, 1.0 - win - loss), rounds)
@@ -0,0 +1,73 @@
+import pytest
+import superheroes
+
+np = pytest.importorskip("numpy")
+import batch
+import exact
+
+
+def build_pair():
+    hero = superheroes.Hero("Athena", 120)
+    hero.add_ability(superheroes.Ability("Science", 40))
+    hero.add_weapon(superheroes.Weapon("Spear", 30))
+    hero.add_armor(superheroes.Armor("Shield", 15))
+    opponent = superheroes.Hero("Gamora", 150)
+    opponent.add_ability(superheroes.Ability("Speed", 60))
+    opponent.add_armor(superheroes.Armor("Plate", 20))
+    return hero, opponent
+
+
+def test_uniform_sum_pmf():
+    pmf = exact.uniform_sum_pmf([(0, 2), (1, 3)])
+    assert len(pmf) == 6
+    assert pmf[0] == 0
+    assert pmf.sum() == pytest.approx(1.0)
+    assert pmf[3] == pytest.approx(3 / 9)
+
+
+def test_net_damage_pmf_clamps_and_caps():
+    attack = exact.uniform_sum_pmf([(0, 3)])
+    block = exact.uniform_sum_pmf([(0, 3)])
+    pmf = exact.net_damage_pmf(attack, block, 2)
+    assert len(pmf) == 3
+    assert pmf[0] == pytest.approx(10 / 16)
+    assert pmf[2] == pytest.approx(3 / 16)
+    assert pmf.sum() == pytest.approx(1.0)
+
+
+def test_duel_odds_certain_win():
+    hero = superheroes.Hero("Athena")
+    hero.add_weapon(superheroes.Weapon("Antimatter Gun", 10000))
+    opponent = superheroes.Hero("Gamora")
+    odds = exact.duel_odds(hero, opponent)
+    assert odds.win == pytest.approx(1.0)
+    assert odds.rounds[1] == pytest.approx(1.0)
+
+
+def test_duel_odds_mutual_kill_goes_to_opponent():
+    hero = superheroes.Hero("Athena", 10)
+    hero.add_weapon(superheroes.Weapon("Antimatter Gun", 10000))
+    opponent = superheroes.Hero("Gamora", 10)
+    opponent.add_weapon(superheroes.Weapon("Star Cannon", 10000))
+    assert exact.duel_odds(hero, opponent).loss == pytest.approx(1.0)
+
+
+def test_duel_odds_draw_without_abilities():
+    odds = exact.duel_odds(superheroes.Hero("Athena"),
+                           superheroes.Hero("Gamora"))
+    assert odds.draw == 1.0
+
+
+def test_duel_odds_matches_batch():
+    odds = exact.duel_odds(*build_pair())
+    assert odds.win + odds.loss == pytest.approx(1.0)
+    assert odds.rounds.sum() == pytest.approx(1.0)
+    result = batch.batch_fight(*build_pair(), 50000, rng=9)
+    assert abs(odds.win - result.win_rate()) < 0.01
+    assert abs(odds.expected_rounds() - result.rounds.mean()) < 0.05
+
+
+def test_duel_odds_is_memoized():
+    first = exact.duel_odds(*build_pair())
+    second = exact.duel_odds(*build_pair())
+    assert first is second
@@ -298,3 +298,150 @@ def test_print_heroes():
 
     assert "Jodie Foster" in output_string
     assert "Athena" in output_string
+
+
+# Test Event Sinks
+
+
+def test_fight_prints_by_default():
+    athena = superheroes.Hero("Athena")
+    athena.add_ability(superheroes.Ability("Lightning", 10000))
+    jodie = superheroes.Hero("Jodie Foster")
+    output_string = capture_console_output(lambda: athena.fight(jodie))
+    assert "Jodie Foster has" in output_string
+    assert "Athena wins!" in output_string
+
+
+def test_fight_null_sink_is_silent():
+    athena = superheroes.Hero("Athena")
+    athena.add_ability(superheroes.Ability("Lightning", 10000))
+    jodie = superheroes.Hero("Jodie Foster")
+    output_string = capture_console_output(
+        lambda: athena.fight(jodie, superheroes.NULL_SINK))
+    assert output_string == ""
+    assert athena.kills == 1 and jodie.deaths == 1
+
+
+def test_fight_collector_sink():
+    athena = superheroes.Hero("Athena")
+    athena.add_ability(superheroes.Ability("Lightning", 10000))
+    jodie = superheroes.Hero("Jodie Foster")
+    sink = superheroes.CollectorSink()
+    athena.fight(jodie, sink)
+    assert sink.events[0] == ("health", "Jodie Foster",
+                              jodie.current_health)
+    assert sink.events[-2] == ("win", "Athena")
+    assert sink.events[-1] == ("fight", athena, jodie,
+                               superheroes.HERO_WINS)
+
+
+def test_fight_draw_event():
+    sink = superheroes.CollectorSink()
+    athena = superheroes.Hero("Athena")
+    jodie = superheroes.Hero("Jodie Foster")
+    athena.fight(jodie, sink)
+    assert sink.events == [("draw",),
+                           ("fight", athena, jodie, superheroes.DRAW)]
+
+
+def test_buffered_sink_writes_in_chunks():
+    stream = io.StringIO()
+    sink = superheroes.BufferedSink(stream, buffer_size=40)
+    sink.emit("win", "Athena")
+    assert stream.getvalue() == ""
+    sink.emit("health", "Jodie Foster", 12)
+    sink.emit("health", "Jodie Foster", 0)
+    assert stream.getvalue().startswith("Athena wins!\n")
+    with sink:
+        sink.emit("draw")
+    assert stream.getvalue().endswith("Draw\n")
+
+
+# Test Damage Distributions
+
+
+def test_hero_attack_table_mean_value():
+    athena = superheroes.Hero("Athena")
+    athena.add_ability(superheroes.Ability("Quickness", 300))
+    athena.add_weapon(superheroes.Weapon("Sword of Truth", 200))
+    athena.add_ability(superheroes.Ability("Science", 100))
+    iterations = 6000
+    total_attack = 0
+    for _ in range(iterations):
+        attack = athena.attack()
+        assert 100 <= attack <= 600
+        total_attack += attack
+    # 150 + 150 + 50
+    assert abs(total_attack / iterations - 350) < 10
+
+
+def test_hero_attack_table_reset_on_new_ability():
+    athena = superheroes.Hero("Athena")
+    athena.add_weapon(superheroes.Weapon("Sword of Truth", 20))
+    athena.add_weapon(superheroes.Weapon("Spear", 20))
+    assert 20 <= athena.attack() <= 40
+    athena.add_weapon(superheroes.Weapon("Star Cannon", 2000))
+    for _ in range(100):
+        assert athena.attack() >= 1020
+
+
+def test_hero_block_table_reset_on_new_armor():
+    athena = superheroes.Hero("Athena")
+    athena.add_armor(superheroes.Armor("Socks", 5))
+    athena.add_armor(superheroes.Armor("Gloves", 5))
+    assert athena.defend() <= 10
+    athena.add_armor(superheroes.Armor("Wall of Walls", 1000))
+    blocks = [athena.defend() for _ in range(200)]
+    assert max(blocks) > 10
+
+
+# Test Stalemates and Fight Budgets
+
+
+def test_hero_fight_stalemate_is_draw():
+    athena = superheroes.Hero("Athena")
+    athena.add_ability(superheroes.Ability("Blinking", 0))
+    athena.add_armor(superheroes.Armor("Thick Fog", 50))
+    jodie = superheroes.Hero("Jodie Foster")
+    jodie.add_armor(superheroes.Armor("Wall of Will", 50))
+    sink = superheroes.CollectorSink()
+    assert athena.fight(jodie, sink) == superheroes.DRAW
+    assert sink.events == [("draw",),
+                           ("fight", athena, jodie, superheroes.DRAW)]
+    assert athena.kills == 0 and jodie.deaths == 0
+
+
+def test_hero_fight_round_cap():
+    athena = superheroes.Hero("Athena", 100000)
+    athena.add_ability(superheroes.Ability("Poke", 1))
+    athena.add_armor(superheroes.Armor("Wall of Walls", 1000))
+    jodie = superheroes.Hero("Jodie Foster", 100000)
+    jodie.add_ability(superheroes.Ability("Poke", 1))
+    jodie.add_armor(superheroes.Armor("Wall of Walls", 1000))
+    assert athena.can_hurt(jodie)
+    sink = superheroes.CollectorSink()
+    result = athena.fight(jodie, sink, max_rounds=50)
+    assert result == superheroes.TIMEOUT
+    assert sink.events[-2] == ("timeout", "Athena", "Jodie Foster", 50)
+    assert sum(1 for event in sink.events if event[0] == "round") == 50
+    assert athena.is_alive() and jodie.is_alive()
+    assert athena.kills == 0 and jodie.kills == 0
+
+
+def test_hero_fight_time_budget():
+    athena = superheroes.Hero("Athena", 100000)
+    athena.add_ability(superheroes.Ability("Poke", 1))
+    jodie = superheroes.Hero("Jodie Foster", 100000)
+    jodie.add_ability(superheroes.Ability("Poke", 1))
+    result = athena.fight(jodie, superheroes.NULL_SINK, max_rounds=None,
+                          max_seconds=0)
+    assert result == superheroes.TIMEOUT
+
+
+def test_hero_fight_returns_winner():
+    athena = superheroes.Hero("Athena", 10)
+    athena.add_weapon(superheroes.Weapon("Star Cannon", 1000))
+    jodie = superheroes.Hero("Jodie Foster", 10)
+    assert athena.fight(jodie, superheroes.NULL_SINK) == superheroes.HERO_WINS
+    assert athena.damage_range() == (500, 1000)
+    assert jodie.block_range() == (0, 0)
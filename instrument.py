@@ -0,0 +1,180 @@
+"""Count and time what the combat code does while a battle runs.
+
+A Probe installed with superheroes.set_probe counts duels, rounds,
+changes to the living heroes and scans of them, and times every
+Hero.fight, Team.attack and Arena.team_battle call. During a team battle
+it also counts every random draw and times the events sent to an active
+sink, which is where printing happens.
+
+    probe = Probe()
+    with probe.capture(profile=True, memory=True):
+        arena.team_battle()
+    probe.snapshot()
+
+With no probe installed the hooks are a single branch, so they stay in
+the code permanently.
+"""
+import cProfile
+import io
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+from time import perf_counter
+
+import superheroes
+from superheroes import NullProbe, NullSink, PRINT_SINK
+
+
+class CountingRandom:
+    """Passes draws through to a random source, counting them"""
+
+    def __init__(self, rng):
+        self.rng = rng
+        self.draws = 0
+
+    def random(self):
+        self.draws += 1
+        return self.rng.random()
+
+    def randint(self, a, b):
+        self.draws += 1
+        return self.rng.randint(a, b)
+
+    def choice(self, seq):
+        self.draws += 1
+        return self.rng.choice(seq)
+
+    def getrandbits(self, k):
+        self.draws += 1
+        return self.rng.getrandbits(k)
+
+    def __getattr__(self, name):
+        return getattr(self.rng, name)
+
+
+class TimedSink(NullSink):
+    """Passes events through to a sink, timing each one"""
+
+    active = True
+
+    def __init__(self, sink, probe):
+        self.sink = sink
+        self.probe = probe
+
+    def emit(self, event, *args):
+        started = perf_counter()
+        self.sink.emit(event, *args)
+        self.probe.timing("output", perf_counter() - started)
+
+    def flush(self):
+        started = perf_counter()
+        self.sink.flush()
+        self.probe.timing("output", perf_counter() - started)
+
+
+class Probe(NullProbe):
+    """Counters and timers for the combat code"""
+
+    active = True
+
+    def __init__(self):
+        """counters: Dictionary of counter name to total
+        timers: Dictionary of phase name to total seconds
+        calls: Dictionary of phase name to number of calls timed
+        """
+        self.counters = {}
+        self.timers = {}
+        self.calls = {}
+        self.profile = None
+        self.peak_bytes = None
+        self._replaced = []
+        self._wrappers = []
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def timing(self, phase, seconds):
+        self.timers[phase] = self.timers.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+
+    def watch_battle(self, arena, sink):
+        """Count the draws of every random source in the battle and time
+        the events of an active sink
+        """
+        wrappers = {}
+        owners = [arena, arena.team_one, arena.team_two]
+        owners += arena.team_one.heroes + arena.team_two.heroes
+        for owner in owners:
+            rng = owner.rng
+            wrapper = wrappers.get(id(rng))
+            if wrapper is None:
+                wrapper = wrappers[id(rng)] = CountingRandom(rng)
+            self._replaced.append((owner, rng))
+            owner.rng = wrapper
+        self._wrappers = list(wrappers.values())
+
+        if sink is None:
+            sink = PRINT_SINK
+        if sink.active:
+            return TimedSink(sink, self)
+        return sink
+
+    def end_battle(self, arena):
+        """Put the random sources back and add up their draws"""
+        for owner, rng in self._replaced:
+            owner.rng = rng
+        self._replaced = []
+        self.count("rng_draws",
+                   sum(wrapper.draws for wrapper in self._wrappers))
+        self._wrappers = []
+
+    def reset(self):
+        """Forget everything recorded so far"""
+        self.__init__()
+
+    @contextmanager
+    def capture(self, profile=False, memory=False):
+        """Install this probe for the length of a with block.
+        profile: also run cProfile and keep its report in self.profile
+        memory: also run tracemalloc and keep the peak in self.peak_bytes
+        """
+        previous = superheroes.set_probe(self)
+        profiler = cProfile.Profile() if profile else None
+        if memory:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield self
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                report = io.StringIO()
+                stats = pstats.Stats(profiler, stream=report)
+                stats.sort_stats("cumulative").print_stats(25)
+                self.profile = report.getvalue()
+            if memory:
+                self.peak_bytes = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            superheroes.set_probe(previous)
+
+    def snapshot(self):
+        """Return everything recorded as plain dictionaries"""
+        data = {"counters": dict(self.counters),
+                "timers": dict(self.timers),
+                "calls": dict(self.calls)}
+        if self.profile is not None:
+            data["profile"] = self.profile
+        if self.peak_bytes is not None:
+            data["peak_bytes"] = self.peak_bytes
+        return data
+
+
+def profile_battle(arena, profile=False, memory=False):
+    """Play arena.team_battle under a fresh Probe.
+    return: the probe's snapshot
+    """
+    probe = Probe()
+    with probe.capture(profile, memory):
+        arena.team_battle()
+    return probe.snapshot()
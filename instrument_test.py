@@ -0,0 +1,79 @@
+import io
+import superheroes
+import instrument
+from team_test import build_squad
+
+
+def build_team(name):
+    return build_squad(name, health=80, science=30, spear=20)
+
+
+def build_arena(sink=superheroes.NULL_SINK):
+    arena = superheroes.Arena(sink, rng=3)
+    arena.team_one = build_team("One")
+    arena.team_two = build_team("Two")
+    arena.set_rng(3)
+    return arena
+
+
+def test_probe_counts_battle():
+    arena = build_arena(superheroes.CollectorSink())
+    snapshot = instrument.profile_battle(arena)
+    counters = snapshot["counters"]
+    events = arena.sink.events
+    assert counters["battles"] == 1
+    assert counters["duels"] == sum(1 for e in events if e[0] == "duel")
+    assert counters["rounds"] == sum(1 for e in events if e[0] == "round")
+    assert counters["living_updates"] >= 3
+    # One draw for who goes first, two per duel, four per round
+    assert counters["rng_draws"] == \
+        1 + 2 * counters["duels"] + 4 * counters["rounds"]
+    assert snapshot["calls"]["fight"] == counters["duels"]
+    assert snapshot["calls"]["team_battle"] == 1
+    assert snapshot["timers"]["team_battle"] >= \
+        snapshot["timers"]["team_attack"]
+    assert "output" in snapshot["timers"]
+
+
+def test_probe_restores_random_sources():
+    arena = build_arena()
+    rng = arena.rng
+    instrument.profile_battle(arena)
+    assert arena.rng is rng
+    assert all(hero.rng is rng for hero in arena.team_one.heroes)
+
+
+def test_probe_does_not_change_battle():
+    plain = build_arena()
+    plain.team_battle()
+    watched = build_arena()
+    instrument.profile_battle(watched)
+    assert plain.team_one.snapshot() == watched.team_one.snapshot()
+    assert plain.team_two.snapshot() == watched.team_two.snapshot()
+
+
+def test_probe_is_removed_after_capture():
+    probe = instrument.Probe()
+    with probe.capture():
+        build_arena().team_battle()
+    duels = probe.counters["duels"]
+    build_arena().team_battle()
+    assert probe.counters["duels"] == duels
+    assert superheroes.set_probe() is superheroes.NULL_PROBE
+
+
+def test_capture_profile_and_memory():
+    snapshot = instrument.profile_battle(build_arena(), profile=True,
+                                         memory=True)
+    assert "team_battle" in snapshot["profile"]
+    assert snapshot["peak_bytes"] > 0
+
+
+def test_living_scans():
+    probe = instrument.Probe()
+    arena = build_arena(superheroes.BufferedSink(io.StringIO()))
+    with probe.capture():
+        arena.show_stats()
+        assert probe.snapshot()["counters"] == {}
+        arena.team_one.get_living_heroes(arena.team_one)
+    assert probe.snapshot()["counters"] == {"living_scans": 1}
@@ -0,0 +1,188 @@
+"""Load heroes and teams from JSON Lines or CSV files without prompting.
+
+Files are read one line at a time, so only the hero being built is held in
+memory. Names and numbers are checked with the same rules Arena uses for
+its prompts.
+
+JSON Lines holds one hero per line:
+
+    {"team": "Red", "name": "Athena", "health": 100,
+     "abilities": [{"name": "Science", "max_damage": 40}],
+     "weapons": [{"name": "Spear", "max_damage": 30}],
+     "armors": [{"name": "Shield", "max_block": 10}]}
+
+CSV has the header team,hero,health,kind,item,value and one row per item.
+Rows for the same hero must be next to each other, and a row with an empty
+kind declares a hero with nothing equipped:
+
+    team,hero,health,kind,item,value
+    Red,Athena,100,ability,Science,40
+    Red,Athena,100,armor,Shield,10
+"""
+import csv
+import json
+
+from superheroes import (Ability, Armor, Hero, Team, Weapon, valid_name,
+                         valid_number)
+
+CSV_FIELDS = ["team", "hero", "health", "kind", "item", "value"]
+
+
+def check_name(name, where):
+    """Return name if the prompts would accept it"""
+    if not isinstance(name, str) or not valid_name(name):
+        raise ValueError(f"{where}: invalid name {name!r}")
+    return name
+
+
+def check_number(value, where):
+    """Return value as an int if the prompts would accept it"""
+    if isinstance(value, bool) or not valid_number(str(value)):
+        raise ValueError(f"{where}: invalid number {value!r}")
+    return int(value)
+
+
+def hero_from_record(record, where="record", items=None):
+    """Build a Hero from a dictionary in the JSON Lines layout.
+    items: optional cache of checked items, shared between heroes since
+    abilities and armors hold no per-hero state
+    """
+    if items is None:
+        items = {}
+    try:
+        hero = Hero(check_name(record["name"], where),
+                    check_number(record.get("health", 100), where))
+        for item in record.get("abilities", ()):
+            hero.add_ability(make_item(Ability, item["name"],
+                                       item["max_damage"], where, items))
+        for item in record.get("weapons", ()):
+            hero.add_weapon(make_item(Weapon, item["name"],
+                                      item["max_damage"], where, items))
+        for item in record.get("armors", ()):
+            hero.add_armor(make_item(Armor, item["name"],
+                                     item["max_block"], where, items))
+    except (KeyError, TypeError, AttributeError) as error:
+        raise ValueError(f"{where}: malformed hero ({error})") from None
+    return hero
+
+
+def make_item(kind, name, value, where, items):
+    """Return a checked kind(name, value), reusing one from items"""
+    key = (kind, name, value)
+    item = items.get(key)
+    if item is None:
+        item = kind(check_name(name, where), check_number(value, where))
+        items[key] = item
+    return item
+
+
+def read_jsonl(lines, source="<jsonl>"):
+    """Yield (team name, Hero) for every non-blank line"""
+    decode = json.JSONDecoder().decode
+    items = {}
+    teams = set()
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        where = f"{source}:{number}"
+        try:
+            record = decode(line)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{where}: {error.msg}") from None
+        if not isinstance(record, dict):
+            raise ValueError(f"{where}: expected an object")
+        team = record.get("team")
+        if team not in teams:
+            teams.add(check_name(team, where))
+        yield team, hero_from_record(record, where, items)
+
+
+def read_csv(lines, source="<csv>"):
+    """Yield (team name, Hero) for every run of rows about one hero"""
+    rows = csv.DictReader(lines)
+    if rows.fieldnames != CSV_FIELDS:
+        raise ValueError(f"{source}: header must be {','.join(CSV_FIELDS)}")
+
+    items = {}
+    current = None
+    team = None
+    for number, row in enumerate(rows, 2):
+        where = f"{source}:{number}"
+        key = (row["team"], row["hero"])
+        if current is None or key != (team, current.name):
+            if current is not None:
+                yield team, current
+            team = check_name(row["team"], where)
+            current = Hero(check_name(row["hero"], where),
+                           check_number(row["health"], where))
+
+        kind = row["kind"]
+        if not kind:
+            continue
+        if kind == "ability":
+            current.add_ability(make_item(Ability, row["item"], row["value"],
+                                          where, items))
+        elif kind == "weapon":
+            current.add_weapon(make_item(Weapon, row["item"], row["value"],
+                                         where, items))
+        elif kind == "armor":
+            current.add_armor(make_item(Armor, row["item"], row["value"],
+                                        where, items))
+        else:
+            raise ValueError(f"{where}: unknown kind {kind!r}")
+
+    if current is not None:
+        yield team, current
+
+
+def read_heroes(path, format=None):
+    """Stream (team name, Hero) pairs from a roster file.
+    format: "jsonl" or "csv", guessed from the file name when None
+    """
+    if format is None:
+        format = "csv" if str(path).lower().endswith(".csv") else "jsonl"
+    if format == "csv":
+        with open(path, newline="") as lines:
+            yield from read_csv(lines, path)
+    elif format == "jsonl":
+        with open(path) as lines:
+            yield from read_jsonl(lines, path)
+    else:
+        raise ValueError(f"unknown roster format {format!r}")
+
+
+def load_teams(path, format=None):
+    """Build every team in a roster file.
+    return: List of Team in the order they first appear
+    """
+    teams = {}
+    for team_name, hero in read_heroes(path, format):
+        team = teams.get(team_name)
+        if team is None:
+            team = teams[team_name] = Team(team_name)
+        team.add_hero(hero)
+    return list(teams.values())
+
+
+def hero_to_record(hero, team_name):
+    """Return the JSON Lines dictionary for hero"""
+    record = {"team": team_name, "name": hero.name,
+              "health": hero.starting_health,
+              "abilities": [], "weapons": [], "armors": []}
+    for ability in hero.abilities:
+        kind = "weapons" if isinstance(ability, Weapon) else "abilities"
+        record[kind].append({"name": ability.name,
+                             "max_damage": ability.max_damage})
+    for armor in hero.armors:
+        record["armors"].append({"name": armor.name,
+                                 "max_block": armor.max_block})
+    return record
+
+
+def write_jsonl(teams, path):
+    """Save teams in the JSON Lines layout read_heroes understands"""
+    with open(path, "w") as stream:
+        for team in teams:
+            for hero in team.heroes:
+                stream.write(json.dumps(hero_to_record(hero, team.name)))
+                stream.write("\n")
@@ -0,0 +1,97 @@
+import pytest
+import json
+import superheroes
+import loader
+
+
+def write(tmp_path, name, text):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def test_load_jsonl(tmp_path):
+    lines = [
+        {"team": "Red", "name": "Athena", "health": 150,
+         "abilities": [{"name": "Science", "max_damage": 40}],
+         "weapons": [{"name": "Spear", "max_damage": "30"}],
+         "armors": [{"name": "Shield", "max_block": 10}]},
+        {"team": "Blue", "name": "Gamora"},
+        {"team": "Red", "name": "Okoye", "health": 90},
+    ]
+    path = write(tmp_path, "roster.jsonl",
+                 "\n".join(json.dumps(line) for line in lines) + "\n\n")
+    red, blue = loader.load_teams(path)
+    assert [hero.name for hero in red.heroes] == ["Athena", "Okoye"]
+    athena = red.heroes[0]
+    assert athena.starting_health == 150
+    assert isinstance(athena.abilities[1], superheroes.Weapon)
+    assert athena.abilities[1].max_damage == 30
+    assert athena.armors[0].max_block == 10
+    assert blue.heroes[0].current_health == 100
+
+
+def test_load_csv(tmp_path):
+    path = write(tmp_path, "roster.csv",
+                 "team,hero,health,kind,item,value\n"
+                 "Red,Athena,100,ability,Science,40\n"
+                 "Red,Athena,100,weapon,Spear,30\n"
+                 "Red,Athena,100,armor,Shield,10\n"
+                 "Blue,Gamora,80,,,\n")
+    red, blue = loader.load_teams(path)
+    athena = red.heroes[0]
+    assert [type(a).__name__ for a in athena.abilities] == ["Ability",
+                                                          "Weapon"]
+    assert len(athena.armors) == 1
+    assert blue.heroes[0].starting_health == 80
+    assert blue.heroes[0].abilities == []
+
+
+def test_rejects_what_the_prompts_reject(tmp_path):
+    # Same rules as Arena.create_hero: letters only, digits only
+    for record in [{"team": "Red", "name": "Athena2"},
+                   {"team": "Red", "name": "Athena", "health": -5},
+                   {"team": "Red", "name": "Athena", "health": 2.5},
+                   {"team": "Red", "name": "Athena", "health": True},
+                   {"team": "Red", "name": "Athena",
+                    "armors": [{"name": "Shield"}]}]:
+        path = write(tmp_path, "bad.jsonl", json.dumps(record))
+        with pytest.raises(ValueError) as error:
+            loader.load_teams(path)
+        assert "bad.jsonl:1" in str(error.value)
+
+
+def test_csv_errors(tmp_path):
+    path = write(tmp_path, "bad.csv", "team,hero\nRed,Athena\n")
+    with pytest.raises(ValueError):
+        loader.load_teams(path)
+    path = write(tmp_path, "bad.csv",
+                 "team,hero,health,kind,item,value\n"
+                 "Red,Athena,100,spell,Fire,4\n")
+    with pytest.raises(ValueError) as error:
+        loader.load_teams(path)
+    assert "bad.csv:2" in str(error.value)
+
+
+def test_write_jsonl_round_trip(tmp_path):
+    team = superheroes.Team("Red")
+    hero = superheroes.Hero("Athena", 120)
+    hero.add_ability(superheroes.Ability("Science", 40))
+    hero.add_weapon(superheroes.Weapon("Spear", 30))
+    hero.add_armor(superheroes.Armor("Shield", 10))
+    team.add_hero(hero)
+    path = str(tmp_path / "out.jsonl")
+    loader.write_jsonl([team], path)
+    (loaded,) = loader.load_teams(path)
+    assert loader.hero_to_record(loaded.heroes[0], "Red") == \
+        loader.hero_to_record(hero, "Red")
+
+
+def test_read_heroes_streams(tmp_path):
+    path = write(tmp_path, "roster.jsonl",
+                 '{"team": "Red", "name": "Athena"}\nnot json\n')
+    heroes = loader.read_heroes(path)
+    team, hero = next(heroes)
+    assert (team, hero.name) == ("Red", "Athena")
+    with pytest.raises(ValueError):
+        next(heroes)
@@ -0,0 +1,187 @@
+"""Army-scale battles between two teams with NumPy.
+
+Team.attack fights one duel at a time to the death. mass_battle instead
+moves in ticks: every tick each living hero of the smaller side is paired
+with a random living hero of the other side, and every pair trades one
+exchange at the same time. Each hero strikes with the sum of its
+abilities, less the sum of its partner's armor, as in Hero.take_damage,
+so both heroes of a pair can die in the same exchange.
+
+The damage and block rolls of all pairs come from one draw over the item
+ranges of the heroes in the fight, summed per hero with np.bincount, so a
+tick has no Python work per hero. Kills, deaths and health are credited
+to the Hero objects in bulk when the battle ends, through Team.restore.
+
+    result = mass_battle(red, blue, rng=7)
+    print(result.winner.name, result.exchanges_per_second())
+"""
+from time import perf_counter
+
+import numpy as np
+
+from batch import attack_ranges, block_ranges
+from superheroes import MAX_ROUNDS, PRINT_SINK
+
+
+class MassResult:
+    """Outcome of a mass battle"""
+
+    def __init__(self, winner, ticks, exchanges, seconds):
+        """winner: the winning Team, or None for a draw
+        ticks: number of ticks fought
+        exchanges: number of paired exchanges resolved
+        seconds: time spent resolving the ticks
+        """
+        self.winner = winner
+        self.ticks = ticks
+        self.exchanges = exchanges
+        self.seconds = seconds
+
+    def exchanges_per_second(self):
+        """Exchanges resolved per second of fighting"""
+        if self.seconds <= 0:
+            return float("inf") if self.exchanges else 0.0
+        return self.exchanges / self.seconds
+
+
+class _Army:
+    """The heroes of one team as arrays"""
+
+    def __init__(self, team):
+        """team: Team whose heroes fight"""
+        self.team = team
+        self.heroes = team.heroes
+        self.health = np.array([hero.current_health for hero in self.heroes],
+                               dtype=np.int64)
+        self.kills = np.zeros(len(self.heroes), dtype=np.int64)
+        self.deaths = np.zeros(len(self.heroes), dtype=np.int64)
+        self.attack = self._items(attack_ranges)
+        self.block = self._items(block_ranges)
+        # The hardest hit and the weakest block each hero can roll.
+        owner, _, top = self.attack
+        self.most = self._per_hero(owner, top - 1)
+        owner, low, _ = self.block
+        self.least = self._per_hero(owner, low)
+        # Where each hero sits in the current tick's pairs, -1 if idle.
+        self.slot = np.full(len(self.heroes), -1, dtype=np.int64)
+
+    def _items(self, ranges):
+        """Return the owner, low and high + 1 arrays of every item range"""
+        rows = [(number, low, high + 1)
+                for number, hero in enumerate(self.heroes)
+                for low, high in ranges(hero)]
+        table = np.array(rows, dtype=np.int64).reshape(-1, 3)
+        return table[:, 0], table[:, 1], table[:, 2]
+
+    def _per_hero(self, owner, values):
+        """Sum values by the hero that owns them"""
+        totals = np.bincount(owner, weights=values,
+                             minlength=len(self.heroes))
+        return totals.astype(np.int64)
+
+    def living(self):
+        """Indices of living heroes"""
+        return np.flatnonzero(self.health > 0)
+
+    def roll(self, rng, items, fighters):
+        """Return one total roll of items for each hero in fighters"""
+        owner, low, top = items
+        if not owner.size:
+            return np.zeros(len(fighters), dtype=np.int64)
+        slot = self.slot
+        slot[fighters] = np.arange(len(fighters))
+        place = slot[owner]
+        used = place >= 0
+        draws = rng.integers(low[used], top[used])
+        slot[fighters] = -1
+        totals = np.bincount(place[used], weights=draws,
+                             minlength=len(fighters))
+        return totals.astype(np.int64)
+
+    def credit(self):
+        """Write health, kills and deaths back to the heroes in one
+        Team.restore, which rebuilds the team's totals in a single pass
+        """
+        kills = [hero.kills for hero in self.heroes]
+        deaths = [hero.deaths for hero in self.heroes]
+        self.team.restore(zip(self.health.tolist(),
+                              (self.kills + kills).tolist(),
+                              (self.deaths + deaths).tolist()))
+
+
+def _can_hurt(attackers, alive_attackers, defenders, alive_defenders):
+    """Whether some living attacker could ever hurt some living defender"""
+    return (attackers.most[alive_attackers].max()
+            > defenders.least[alive_defenders].min())
+
+
+def mass_battle(team_one, team_two, rng=None, sink=None,
+                max_ticks=MAX_ROUNDS):
+    """Fight team_one against team_two in simultaneous ticks.
+    rng: numpy Generator or seed
+    sink: where events go, printed when None
+    max_ticks: ticks before the battle is called off
+    return: MassResult, with winner None when both sides are wiped out,
+    neither side can hurt the other, or max_ticks runs out
+    """
+    rng = np.random.default_rng(rng)
+    if sink is None:
+        sink = PRINT_SINK
+    one = _Army(team_one)
+    two = _Army(team_two)
+    ticks = exchanges = 0
+
+    started = perf_counter()
+    while ticks < max_ticks:
+        alive_one = one.living()
+        alive_two = two.living()
+        if not alive_one.size or not alive_two.size:
+            break
+        # Pair every hero of the smaller side with a random partner.
+        pairs = min(alive_one.size, alive_two.size)
+        if alive_one.size > pairs:
+            alive_one = rng.choice(alive_one, pairs, replace=False)
+        else:
+            alive_two = rng.permutation(alive_two)[:pairs]
+
+        to_two = (one.roll(rng, one.attack, alive_one)
+                  - two.roll(rng, two.block, alive_two))
+        to_one = (two.roll(rng, two.attack, alive_two)
+                  - one.roll(rng, one.block, alive_one))
+        np.maximum(to_two, 0, out=to_two)
+        np.maximum(to_one, 0, out=to_one)
+        ticks += 1
+        exchanges += pairs
+
+        if not to_two.any() and not to_one.any():
+            alive_one = one.living()
+            alive_two = two.living()
+            if not (_can_hurt(one, alive_one, two, alive_two)
+                    or _can_hurt(two, alive_two, one, alive_one)):
+                break
+            continue
+
+        two.health[alive_two] -= to_two
+        one.health[alive_one] -= to_one
+        two_died = two.health[alive_two] <= 0
+        one_died = one.health[alive_one] <= 0
+        one.kills[alive_one] += two_died
+        two.deaths[alive_two] += two_died
+        two.kills[alive_two] += one_died
+        one.deaths[alive_one] += one_died
+    seconds = perf_counter() - started
+
+    one.credit()
+    two.credit()
+    one_left = team_one.has_living()
+    two_left = team_two.has_living()
+    winner = None
+    if one_left != two_left:
+        winner = team_one if one_left else team_two
+    if sink.active:
+        if winner is not None:
+            sink.emit("melee_win", winner.name)
+        else:
+            sink.emit("melee_draw", int(one_left) + int(two_left))
+    sink.flush()
+    return MassResult(winner, ticks, exchanges, seconds)
@@ -0,0 +1,82 @@
+import pytest
+import superheroes
+
+np = pytest.importorskip("numpy")
+import mass
+import roster
+from team_test import build_squad
+
+
+def build_army(name, size, health=100, strength=40, block=10):
+    names = ["{} {}".format(name, number) for number in range(size)]
+    return build_squad(name, names, health=health,
+                       science=strength or None,
+                       spear=strength // 2 if strength else None,
+                       socks=block or None)
+
+
+def test_mass_battle_credits_kills_and_deaths():
+    strong = build_army("Strong", 300, strength=60)
+    weak = build_army("Weak", 300, strength=20)
+    result = mass.mass_battle(strong, weak, rng=1,
+                              sink=superheroes.NULL_SINK)
+    assert result.winner is strong
+    assert not weak.has_living()
+    assert strong.kill_stats.total == weak.death_stats.total == 300
+    assert weak.kill_stats.total == strong.death_stats.total == \
+        300 - len(strong.living)
+    assert sum(hero.kills for hero in strong.heroes) == 300
+    assert strong.health == sum(hero.current_health
+                                for hero in strong.living)
+    assert result.ticks > 1 and result.exchanges >= 300
+    assert result.exchanges_per_second() > 0
+
+
+def test_every_hero_of_the_smaller_side_fights_each_tick():
+    many = build_army("Many", 50, health=10 ** 6)
+    few = build_army("Few", 7, health=10 ** 6)
+    result = mass.mass_battle(many, few, rng=2, max_ticks=5,
+                              sink=superheroes.NULL_SINK)
+    assert result.winner is None
+    assert (result.ticks, result.exchanges) == (5, 35)
+    lost = [10 ** 6 - hero.current_health for hero in few.heroes]
+    assert all(damage > 0 for damage in lost)
+
+
+def test_mass_battle_is_repeatable():
+    def play():
+        one = build_army("One", 100)
+        two = build_army("Two", 120, strength=30)
+        result = mass.mass_battle(one, two, rng=5,
+                                  sink=superheroes.NULL_SINK)
+        return (result.winner.name, result.ticks,
+                [hero.current_health for hero in one.heroes + two.heroes])
+    assert play() == play()
+
+
+def test_mass_battle_stops_when_nobody_can_be_hurt():
+    one = build_army("One", 10, strength=0)
+    two = build_army("Two", 10, strength=0)
+    sink = superheroes.CollectorSink()
+    result = mass.mass_battle(one, two, rng=3, sink=sink)
+    assert result.winner is None and result.ticks == 1
+    assert sink.events[-1] == ("melee_draw", 2)
+    assert len(one.living) == len(two.living) == 10
+
+
+def test_mass_battle_reports_the_winner():
+    one = build_army("One", 20, strength=80)
+    two = build_army("Two", 20, strength=0)
+    sink = superheroes.CollectorSink()
+    assert mass.mass_battle(one, two, rng=4, sink=sink).winner is one
+    assert sink.events[-1] == ("melee_win", "One")
+
+
+def test_mass_battle_credits_roster_teams():
+    one = roster.Roster.from_team(build_army("One", 30, strength=60)).team()
+    two = roster.Roster.from_team(build_army("Two", 30, strength=0)).team()
+    result = mass.mass_battle(one, two, rng=6, sink=superheroes.NULL_SINK)
+    assert result.winner is one
+    assert not two.has_living()
+    assert all(hero.current_health <= 0 for hero in two.heroes)
+    assert one.kill_stats.total == two.death_stats.total == 30
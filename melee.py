@@ -0,0 +1,111 @@
+"""Free-for-all battles between any number of teams.
+
+Heroes take turns by initiative rather than in fixed pairs. Every hero
+waits in one heap keyed by the time of its next action: it strikes a
+random living hero of a random other team, then goes back into the heap
+1 / speed later, so a hero with speed 2 acts twice as often as one with
+speed 1. Speeds must be above zero, and the first turns are spread by a
+random initiative roll.
+
+Each action is a heap replace plus O(1) picks from the living HeroPool of
+a team and from a pool of teams that still stand, so a battle costs
+O(log n) per action however many heroes and teams there are. Dead heroes
+are dropped from the heap when their turn comes up.
+
+    melee = Melee([red, blue, green], rng=7)
+    winner = melee.run()
+"""
+from heapq import heapify, heappop, heapreplace
+from itertools import count
+
+from superheroes import HeroPool, MAX_ROUNDS, PRINT_SINK
+from streams import make_rng
+
+
+class Melee:
+    """A free-for-all between teams, played by initiative"""
+
+    def __init__(self, teams, sink=None, rng=None, max_actions=None,
+                 max_idle=MAX_ROUNDS):
+        """teams: List of Team
+        sink: where events go, printed when None
+        rng: random source for initiative, targets and every hero, a
+        seed, or None to leave the heroes on their own streams
+        max_actions: actions before the battle is called off, no limit
+        when None
+        max_idle: actions in a row that deal no damage before the battle
+        is called a draw, so heroes who cannot hurt each other stop
+        """
+        self.teams = teams
+        self.sink = PRINT_SINK if sink is None else sink
+        self.rng = make_rng(rng)
+        if rng is not None:
+            for team in teams:
+                team.set_rng(self.rng)
+        self.max_actions = max_actions
+        self.max_idle = max_idle
+        self.actions = 0
+        self.winner = None
+
+    def schedule(self):
+        """Return the heap of (next action time, tie breaker, hero) for
+        every living hero
+        """
+        order = count()
+        heap = []
+        for team in self.teams:
+            for hero in team.living:
+                speed = hero.speed
+                heap.append((self.rng.random() / speed, next(order), hero))
+        heapify(heap)
+        return heap, order
+
+    def run(self):
+        """Battle until one team is left standing.
+        return: the winning Team, or None for a draw
+        """
+        sink = self.sink
+        report = sink.active
+        rng = self.rng
+        standing = HeroPool(team for team in self.teams if team.living)
+        teams = standing.heroes
+        heap, order = self.schedule()
+        max_actions = self.max_actions
+        idle = 0
+
+        while len(teams) > 1 and heap:
+            if self.actions == max_actions or idle == self.max_idle:
+                break
+            time, _, hero = heap[0]
+            if not hero.is_alive():
+                heappop(heap)
+                continue
+            self.actions += 1
+
+            # Any team but the hero's own: pick among the others by
+            # swapping the hero's team for the last one.
+            own = hero.team
+            target_team = teams[rng.randint(0, len(teams) - 2)]
+            if target_team is own:
+                target_team = teams[-1]
+            target = target_team.living.choice(rng)
+
+            damage = target.take_damage(hero.attack())
+            idle = 0 if damage else idle + 1
+            if report:
+                sink.emit("health", target.name, target.current_health)
+            if not target.is_alive():
+                hero.add_kill(1)
+                target.add_deaths(1)
+                if not target_team.living:
+                    standing.discard(target_team)
+            heapreplace(heap, (time + 1 / hero.speed, next(order), hero))
+
+        if len(teams) == 1:
+            self.winner = teams[0]
+            if report:
+                sink.emit("melee_win", self.winner.name)
+        elif report:
+            sink.emit("melee_draw", len(teams))
+        sink.flush()
+        return self.winner
@@ -0,0 +1,92 @@
+import superheroes
+import melee
+import roster
+from team_test import build_squad
+
+
+def build_team(name, size=3, health=80, strength=30, speed=1):
+    names = ["{} {}".format(name, number) for number in range(size)]
+    return build_squad(name, names, health=health, science=strength,
+                       speed=speed)
+
+
+def build_teams(count=4, size=3):
+    return [build_team("Team {}".format(number), size)
+            for number in range(count)]
+
+
+def test_melee_has_one_winner():
+    teams = build_teams()
+    battle = melee.Melee(teams, superheroes.NULL_SINK, rng=3)
+    winner = battle.run()
+    assert winner in teams
+    assert [team for team in teams if team.has_living()] == [winner]
+    kills = sum(team.kill_stats.total for team in teams)
+    deaths = sum(team.death_stats.total for team in teams)
+    assert kills == deaths == 3 * 4 - len(winner.living)
+    assert battle.actions > 0
+
+
+def test_melee_is_repeatable():
+    def play():
+        teams = build_teams(5)
+        sink = superheroes.CollectorSink()
+        melee.Melee(teams, sink, rng=11).run()
+        return sink.events
+    assert play() == play()
+
+
+def test_melee_reports_the_winner():
+    teams = build_teams(3)
+    sink = superheroes.CollectorSink()
+    winner = melee.Melee(teams, sink, rng=1).run()
+    assert sink.events[-1] == ("melee_win", winner.name)
+
+
+def test_faster_heroes_act_more_often():
+    slow = build_team("Slow", 1, health=10 ** 9, strength=1, speed=1)
+    fast = build_team("Fast", 1, health=10 ** 9, strength=1, speed=3)
+    sink = superheroes.CollectorSink()
+    melee.Melee([slow, fast], sink, rng=2, max_actions=400).run()
+    hits = [event[1] for event in sink.events if event[0] == "health"]
+    assert len(hits) == 400
+    assert 280 <= hits.count("Slow 0") <= 320
+
+
+def test_melee_stops_when_nobody_can_be_hurt():
+    teams = [superheroes.Team(name) for name in ["One", "Two", "Three"]]
+    for team in teams:
+        team.add_hero(superheroes.Hero(team.name + " hero"))
+    sink = superheroes.CollectorSink()
+    battle = melee.Melee(teams, sink, rng=4, max_idle=50)
+    assert battle.run() is None
+    assert battle.actions == 50
+    assert sink.events[-1] == ("melee_draw", 3)
+
+
+def test_melee_stops_after_max_actions():
+    teams = build_teams(size=20)
+    battle = melee.Melee(teams, superheroes.NULL_SINK, rng=5,
+                         max_actions=30)
+    assert battle.run() is None
+    assert battle.actions == 30
+
+
+def test_melee_skips_teams_without_heroes():
+    empty = superheroes.Team("Empty")
+    full = build_team("Full")
+    assert melee.Melee([empty, full], superheroes.NULL_SINK).run() is full
+
+
+def test_large_melee():
+    teams = build_teams(20, 200)
+    winner = melee.Melee(teams, superheroes.NULL_SINK, rng=6).run()
+    assert winner is not None
+    assert sum(len(team.living) for team in teams) == len(winner.living)
+
+
+def test_melee_with_roster_teams():
+    teams = [roster.Roster.from_team(team).team() for team in build_teams()]
+    assert all(hero.speed == 1 for team in teams for hero in team.heroes)
+    winner = melee.Melee(teams, superheroes.NULL_SINK, rng=8).run()
+    assert [team for team in teams if team.has_living()] == [winner]
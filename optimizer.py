@@ -0,0 +1,389 @@
+"""Search an item pool for the team that does best against an opponent.
+
+    python optimizer.py items.jsonl opponent.jsonl --heroes 3 --seconds 60
+
+A loadout says which hero, if any, carries each item of the pool. The
+search is evolutionary: every generation breeds many children from the
+best loadouts so far by crossover and mutation, ranks them with a cheap
+surrogate built from average damage and block, and only the most
+promising few are confirmed by simulated battles on a process pool. Every
+confirmed score is cached under the loadout's canonical key, so a loadout
+bred again in a later generation is never simulated twice. The search
+stops when the wall-clock budget runs out and reports the best team.
+
+Confirmation uses the same seed for every loadout, so loadouts are
+compared on the same random battles.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import exp, log
+
+from cli import read_teams
+from loader import write_jsonl
+from simulation import run_trials
+from streams import RandomStream
+from superheroes import Armor, Hero, Team, Weapon
+
+# Problem held by this process, set once per worker.
+_problem = None
+
+
+def _load_problem(problem):
+    """Pool initializer: keep the problem in this process"""
+    global _problem
+    _problem = problem
+
+
+def _middle(bounds):
+    low, high = bounds
+    return (low + high) / 2
+
+
+class Problem:
+    """What is being optimized: the items, the heroes and the opponent"""
+
+    def __init__(self, items, opponent, heroes=3, health=100,
+                 max_items=None, trials=200, seed=None, name="Optimized"):
+        """items: List of Ability, Weapon and Armor to hand out
+        opponent: Team the loadouts are scored against
+        heroes: number of heroes on the team
+        health: starting health of every hero
+        max_items: most items one hero may carry, no limit when None
+        trials: battles simulated to confirm a loadout
+        seed: seed shared by every confirmation
+        name: name of the teams that are built
+        """
+        if heroes < 1:
+            raise ValueError("heroes must be at least 1")
+        self.items = list(items)
+        self.opponent = opponent
+        self.heroes = heroes
+        self.health = health
+        self.max_items = max_items
+        self.trials = trials
+        self.seed = RandomStream(seed).entropy
+        self.name = name
+
+    def key(self, loadout):
+        """Canonical key of a loadout: item indexes carried by each
+        hero, sorted, so the order of heroes does not matter
+        """
+        carried = [[] for _ in range(self.heroes)]
+        for item, owner in enumerate(loadout):
+            if owner is not None:
+                carried[owner].append(item)
+        return tuple(sorted(tuple(items) for items in carried))
+
+    def build(self, key):
+        """Return a fresh Team for a canonical key"""
+        team = Team(self.name)
+        for number, items in enumerate(key, 1):
+            hero = Hero(f"{self.name} {number}", self.health)
+            for item in items:
+                item = self.items[item]
+                if isinstance(item, Armor):
+                    hero.add_armor(item)
+                elif isinstance(item, Weapon):
+                    hero.add_weapon(item)
+                else:
+                    hero.add_ability(item)
+            team.add_hero(hero)
+        return team
+
+    def surrogate(self, key):
+        """Cheap guess at how well a loadout does, from 0 to 1.
+        Each hero is matched with each opponent using average attack and
+        block; whoever needs fewer rounds to win the exchange is likely to
+        win the fight.
+        """
+        theirs = [(hero.starting_health, _middle(hero.damage_range()),
+                   _middle(hero.block_range()))
+                  for hero in self.opponent.heroes]
+        if not theirs:
+            return 1.0
+        total = 0.0
+        for items in key:
+            attack = block = 0.0
+            for item in items:
+                item = self.items[item]
+                if isinstance(item, Armor):
+                    block += _middle(item.block_range())
+                else:
+                    attack += _middle(item.damage_range())
+            for health, other_attack, other_block in theirs:
+                to_win = health / max(attack - other_block, 0.01)
+                to_lose = self.health / max(other_attack - block, 0.01)
+                # Even odds when both need the same number of rounds.
+                total += 1 / (1 + exp(3 * log(to_win / to_lose)))
+        return total / (len(key) * len(theirs))
+
+    def random_loadout(self, rng):
+        """Hand every item to a random hero or leave it out"""
+        loadout = [rng.choice([None, *range(self.heroes)])
+                   for _ in self.items]
+        return self.repair(loadout, rng)
+
+    def repair(self, loadout, rng):
+        """Leave out random items until no hero carries too many"""
+        if self.max_items is None:
+            return loadout
+        carried = [[] for _ in range(self.heroes)]
+        for item, owner in enumerate(loadout):
+            if owner is not None:
+                carried[owner].append(item)
+        for items in carried:
+            if len(items) > self.max_items:
+                for item in rng.sample(items, len(items) - self.max_items):
+                    loadout[item] = None
+        return loadout
+
+    def mutate(self, loadout, rng):
+        """Move one item to another hero, or swap two items' owners"""
+        loadout = list(loadout)
+        if not loadout:
+            return loadout
+        item = rng.randrange(len(loadout))
+        if rng.random() < 0.5:
+            loadout[item] = rng.choice([None, *range(self.heroes)])
+        else:
+            other = rng.randrange(len(loadout))
+            loadout[item], loadout[other] = loadout[other], loadout[item]
+        return self.repair(loadout, rng)
+
+    def crossover(self, one, two, rng):
+        """Take each item's owner from either parent"""
+        child = [first if rng.random() < 0.5 else second
+                 for first, second in zip(one, two)]
+        return self.repair(child, rng)
+
+
+def confirm(key):
+    """Simulate a loadout of the worker's problem against its opponent.
+    return: (key, [draws, wins, losses])
+    """
+    problem = _problem
+    team = problem.build(key)
+    return key, run_trials(team, problem.opponent, 0, problem.trials,
+                           problem.seed)
+
+
+def fitness(counts):
+    """Share of battles won, with draws counting half"""
+    draws, wins, losses = counts
+    return (wins + draws / 2) / (draws + wins + losses)
+
+
+class Result:
+    """Best loadout found and how the search went"""
+
+    def __init__(self, problem, key, counts):
+        self.problem = problem
+        self.key = key
+        self.counts = counts
+        self.team = problem.build(key)
+        self.score = fitness(counts)
+        self.generations = 0
+        self.confirmed = 0
+        self.surrogates = 0
+        self.cache_hits = 0
+        self.elapsed = 0.0
+
+    def to_dict(self):
+        draws, wins, losses = self.counts
+        return {"score": self.score, "wins": wins, "losses": losses,
+                "draws": draws, "generations": self.generations,
+                "confirmed": self.confirmed, "surrogates": self.surrogates,
+                "cache_hits": self.cache_hits, "elapsed": self.elapsed,
+                "heroes": [[self.problem.items[item].name for item in items]
+                           for items in self.key]}
+
+
+class Optimizer:
+    """Evolutionary search over loadouts of a Problem"""
+
+    def __init__(self, problem, population=16, children=8, confirm=None,
+                 workers=None, seed=None):
+        """population: loadouts kept between generations
+        children: candidates bred per kept loadout each generation
+        confirm: candidates simulated per generation, one batch per
+        worker when None
+        workers: processes to use, the CPU count when None, 1 to stay
+        in this process
+        seed: seed for breeding
+        """
+        self.problem = problem
+        self.population = population
+        self.children = children
+        self.workers = workers or os.cpu_count() or 1
+        self.confirm = confirm or max(4, 2 * self.workers)
+        self.rng = random.Random(seed)
+        self.scores = {}
+
+    def run(self, seconds=60, generations=None):
+        """Search until seconds have passed or generations are done.
+        return: Result for the best loadout found
+        """
+        start = time.perf_counter()
+        deadline = start + seconds
+        if self.workers == 1:
+            _load_problem(self.problem)
+            pool = None
+        else:
+            pool = ProcessPoolExecutor(self.workers,
+                                       initializer=_load_problem,
+                                       initargs=(self.problem,))
+        stats = {"generations": 0, "confirmed": 0, "surrogates": 0,
+                 "cache_hits": 0}
+        try:
+            loadouts = [self.problem.random_loadout(self.rng)
+                        for _ in range(self.population)]
+            kept = self._evaluate(loadouts, pool, deadline, stats)
+            while time.perf_counter() < deadline and (
+                    generations is None or
+                    stats["generations"] < generations):
+                children = self._breed(kept, stats)
+                chosen = self._shortlist(children, stats)
+                kept = self._select(kept + self._evaluate(
+                    chosen, pool, deadline, stats))
+                stats["generations"] += 1
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        key = max(self.scores, key=lambda key: fitness(self.scores[key]))
+        result = Result(self.problem, key, self.scores[key])
+        for name, value in stats.items():
+            setattr(result, name, value)
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _breed(self, kept, stats):
+        """Children of the kept loadouts, none of them scored before"""
+        children = {}
+        for _ in range(self.children * len(kept)):
+            one = self._pick(kept)
+            if self.rng.random() < 0.5:
+                child = self.problem.crossover(one, self._pick(kept),
+                                               self.rng)
+                child = self.problem.mutate(child, self.rng)
+            else:
+                child = self.problem.mutate(one, self.rng)
+            key = self.problem.key(child)
+            if key in self.scores:
+                stats["cache_hits"] += 1
+            else:
+                children[key] = child
+        return children
+
+    def _pick(self, kept):
+        """Better of two random kept loadouts"""
+        one, two = self.rng.choice(kept), self.rng.choice(kept)
+        return max(one, two, key=self._score)
+
+    def _shortlist(self, children, stats):
+        """The children the surrogate likes best"""
+        stats["surrogates"] += len(children)
+        ranked = sorted(children, key=self.problem.surrogate, reverse=True)
+        return [children[key] for key in ranked[:self.confirm]]
+
+    def _evaluate(self, loadouts, pool, deadline, stats):
+        """Confirm loadouts by simulation, skipping any already scored.
+        Runs that have not finished by the deadline are dropped.
+        return: the loadouts that have a score
+        """
+        keys = {}
+        for loadout in loadouts:
+            keys.setdefault(self.problem.key(loadout), loadout)
+        missing = [key for key in keys if key not in self.scores]
+        stats["cache_hits"] += len(keys) - len(missing)
+        if pool is None:
+            for key in missing:
+                if self.scores and time.perf_counter() > deadline:
+                    break
+                self._store(*confirm(key), stats)
+        else:
+            pending = {pool.submit(confirm, key) for key in missing}
+            while pending:
+                timeout = deadline - time.perf_counter()
+                if self.scores and timeout <= 0:
+                    break
+                done, pending = wait(pending, max(timeout, 0) or None,
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._store(*future.result(), stats)
+            for future in pending:
+                future.cancel()
+        return [loadout for key, loadout in keys.items()
+                if key in self.scores]
+
+    def _store(self, key, counts, stats):
+        self.scores[key] = counts
+        stats["confirmed"] += 1
+
+    def _score(self, loadout):
+        return fitness(self.scores[self.problem.key(loadout)])
+
+    def _select(self, loadouts):
+        """The best population loadouts"""
+        loadouts.sort(key=self._score, reverse=True)
+        return loadouts[:self.population]
+
+
+def items_of(team):
+    """Every ability, weapon and armor carried by team's heroes"""
+    return [item for hero in team.heroes
+            for item in hero.abilities + hero.armors]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Find the team an item pool builds best against an "
+                    "opponent")
+    parser.add_argument("items", help="roster file whose first team's "
+                                      "items make up the pool")
+    parser.add_argument("opponent", help="roster file whose first team is "
+                                         "the opponent")
+    parser.add_argument("--heroes", type=int, default=3)
+    parser.add_argument("--health", type=int, default=100)
+    parser.add_argument("--max-items", type=int)
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="write the best team here as "
+                                         "JSON Lines")
+    args = parser.parse_args(argv)
+
+    try:
+        pool_teams = read_teams([args.items])
+        opponents = read_teams([args.opponent])
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    if not pool_teams or not opponents:
+        parser.error("both roster files must hold a team")
+
+    try:
+        problem = Problem(items_of(pool_teams[0]), opponents[0],
+                          args.heroes, args.health, args.max_items,
+                          args.trials, args.seed)
+    except ValueError as error:
+        parser.error(str(error))
+    result = Optimizer(problem, workers=args.workers,
+                       seed=args.seed).run(args.seconds)
+    for number, items in enumerate(result.to_dict()["heroes"], 1):
+        print(f"Hero {number}: {', '.join(items) or 'nothing'}")
+    print(f"Score {result.score:.3f} after {result.generations} "
+          f"generations, {result.confirmed} simulated, "
+          f"{result.surrogates} guessed, {result.cache_hits} cached, "
+          f"{result.elapsed:.1f}s")
+    if args.output:
+        write_jsonl([result.team], args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
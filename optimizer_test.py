@@ -0,0 +1,97 @@
+import superheroes
+import optimizer
+
+
+def build_opponent():
+    team = superheroes.Team("Rivals")
+    for hero_name in ["Athena", "Gamora"]:
+        hero = superheroes.Hero(hero_name, 60)
+        hero.add_ability(superheroes.Ability("Science", 20))
+        hero.add_armor(superheroes.Armor("Socks", 5))
+        team.add_hero(hero)
+    return team
+
+
+def build_items():
+    return [superheroes.Ability("Lightning", 40),
+            superheroes.Weapon("Spear", 30),
+            superheroes.Armor("Shield", 15),
+            superheroes.Ability("Whisper", 1),
+            superheroes.Armor("Paper", 1),
+            superheroes.Weapon("Stick", 2)]
+
+
+def build_problem(**options):
+    return optimizer.Problem(build_items(), build_opponent(), heroes=2,
+                             health=60, trials=40, seed=3, **options)
+
+
+def test_key_ignores_hero_order():
+    problem = build_problem()
+    assert problem.key([0, 1, None, 0, 1, None]) == \
+        problem.key([1, 0, None, 1, 0, None])
+    assert problem.key([0, 0, 0, None, None, None]) == \
+        ((), (0, 1, 2))
+
+
+def test_build_uses_every_item_once():
+    problem = build_problem()
+    team = problem.build(((0, 2), (1, 5)))
+    first, second = team.heroes
+    assert first.starting_health == 60
+    assert first.abilities == [problem.items[0]]
+    assert first.armors == [problem.items[2]]
+    assert second.abilities == [problem.items[1], problem.items[5]]
+
+
+def test_surrogate_prefers_strong_items():
+    problem = build_problem()
+    strong = problem.key([0, 1, 0, None, None, None])
+    weak = problem.key([None, None, None, 0, 1, 0])
+    assert problem.surrogate(strong) > problem.surrogate(weak)
+    assert 0 <= problem.surrogate(weak) <= 1
+
+
+def test_repair_limits_items():
+    problem = build_problem(max_items=1)
+    rng = superheroes.make_rng(1)
+    for _ in range(20):
+        loadout = problem.random_loadout(rng)
+        loadout = problem.crossover(loadout, [0] * 6, rng)
+        loadout = problem.mutate(loadout, rng)
+        assert all(len(items) <= 1 for items in problem.key(loadout))
+
+
+def test_optimizer_finds_a_winning_team():
+    problem = build_problem()
+    search = optimizer.Optimizer(problem, population=6, children=4,
+                                 confirm=4, workers=1, seed=2)
+    result = search.run(seconds=30, generations=5)
+    assert result.generations == 5
+    assert result.score > 0.8
+    assert result.confirmed == len(search.scores)
+    assert result.cache_hits > 0
+    carried = [item for items in result.key for item in items]
+    assert 0 in carried and 1 in carried
+    assert result.to_dict()["heroes"] == \
+        [[problem.items[item].name for item in items]
+         for items in result.key]
+
+
+def test_pool_scores_match_this_process():
+    problem = build_problem()
+    search = optimizer.Optimizer(problem, population=4, children=2,
+                                 workers=2, seed=2)
+    result = search.run(seconds=30, generations=1)
+    assert result.generations == 1
+    optimizer._load_problem(problem)
+    for key, counts in search.scores.items():
+        assert optimizer.confirm(key) == (key, counts)
+
+
+def test_optimizer_stops_at_the_deadline():
+    problem = build_problem()
+    result = optimizer.Optimizer(problem, population=4, workers=1,
+                                 seed=1).run(seconds=0)
+    assert result.generations == 0
+    assert result.confirmed >= 1
@@ -0,0 +1,238 @@
+"""Elo ratings for heroes, kept in a leaderboard sorted by rating.
+
+Ratings is an event sink: given to Hero.fight, Team.attack or an Arena it
+rates both heroes after every fight. Heroes are also kept in an indexable
+skip list ordered by rating, so a rating change, the top k, a hero's rank
+or percentile and the heroes rated closest to a hero all take O(log n)
+steps rather than a pass over the whole roster.
+"""
+import random
+from math import log
+
+from superheroes import HERO_WINS, NullSink, OPPONENT_WINS
+
+MAX_LEVELS = 24
+
+
+class _Last:
+    """Key of the node that ends every level: larger than any other key"""
+
+    def __lt__(self, other):
+        return False
+
+
+class _Node:
+    __slots__ = ("key", "value", "next", "width")
+
+    def __init__(self, key, value, levels):
+        self.key = key
+        self.value = value
+        self.next = [None] * levels
+        self.width = [1] * levels
+
+
+class SkipList:
+    """Unique sorted keys with O(log n) insert, remove and lookup by
+    position. Each link records how many places it skips, which is what
+    makes finding the rank of a key, or the key at a rank, fast.
+    """
+
+    def __init__(self, seed=0):
+        """seed: seed for the coin flips that choose node heights"""
+        self.end = _Node(_Last(), None, 0)
+        self.head = _Node(None, None, MAX_LEVELS)
+        self.head.next = [self.end] * MAX_LEVELS
+        self.size = 0
+        self.random = random.Random(seed).random
+
+    def __len__(self):
+        return self.size
+
+    def _path(self, key):
+        """Return the last node before key on every level, and how far
+        each one is from the head
+        """
+        chain = [None] * MAX_LEVELS
+        steps = [0] * MAX_LEVELS
+        node = self.head
+        position = 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+            steps[level] = position
+        return chain, steps
+
+    def insert(self, key, value=None):
+        """Add key, which must not be in the list already"""
+        chain, steps = self._path(key)
+        height = min(MAX_LEVELS, 1 - int(log(1.0 - self.random(), 2.0)))
+        node = _Node(key, value, height)
+        position = steps[0] + 1
+        for level in range(height):
+            before = chain[level]
+            node.next[level] = before.next[level]
+            before.next[level] = node
+            skipped = position - steps[level]
+            node.width[level] = before.width[level] - skipped + 1
+            before.width[level] = skipped
+        for level in range(height, MAX_LEVELS):
+            chain[level].width[level] += 1
+        self.size += 1
+
+    def remove(self, key):
+        """Take key out of the list"""
+        chain, _ = self._path(key)
+        node = chain[0].next[0]
+        if node.key != key:
+            raise KeyError(key)
+        for level in range(len(node.next)):
+            before = chain[level]
+            before.width[level] += node.width[level] - 1
+            before.next[level] = node.next[level]
+        for level in range(len(node.next), MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self.size -= 1
+
+    def rank(self, key):
+        """Number of keys smaller than key"""
+        node = self.head
+        position = 0
+        for level in reversed(range(MAX_LEVELS)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def _node_at(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        node = self.head
+        remaining = index + 1
+        for level in reversed(range(MAX_LEVELS)):
+            while node.width[level] <= remaining and \
+                    node.next[level] is not self.end:
+                remaining -= node.width[level]
+                node = node.next[level]
+                if remaining == 0:
+                    return node
+        return node
+
+    def __getitem__(self, index):
+        """Return (key, value) at position index"""
+        node = self._node_at(index)
+        return node.key, node.value
+
+    def slice(self, start, stop):
+        """Yield (key, value) for positions start .. stop - 1"""
+        start = max(0, start)
+        stop = min(self.size, stop)
+        if start >= stop:
+            return
+        node = self._node_at(start)
+        for _ in range(stop - start):
+            yield node.key, node.value
+            node = node.next[0]
+
+
+def expected_score(rating, opponent_rating):
+    """Chance that a player rated rating beats one rated opponent_rating"""
+    return 1 / (1 + 10 ** ((opponent_rating - rating) / 400))
+
+
+class Ratings(NullSink):
+    """Elo ratings of heroes, updated from fight events"""
+
+    active = True
+
+    def __init__(self, k=32, initial=1500):
+        """k: largest change one fight can make to a rating
+        initial: rating of a hero the first time it is seen
+        """
+        self.k = k
+        self.initial = initial
+        self.keys = {}
+        self.leaderboard = SkipList()
+        self.added = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, hero):
+        return hero in self.keys
+
+    def add(self, hero, rating=None):
+        """Start rating hero, at initial unless rating is given"""
+        if hero in self.keys:
+            return
+        if rating is None:
+            rating = self.initial
+        # Highest rating first; ties go to the hero added first.
+        key = (-rating, self.added)
+        self.added += 1
+        self.keys[hero] = key
+        self.leaderboard.insert(key, hero)
+
+    def rating(self, hero):
+        """Current rating of hero"""
+        self.add(hero)
+        return -self.keys[hero][0]
+
+    def set_rating(self, hero, rating):
+        """Move hero to a new rating"""
+        self.add(hero)
+        key = self.keys[hero]
+        self.leaderboard.remove(key)
+        key = (-rating, key[1])
+        self.keys[hero] = key
+        self.leaderboard.insert(key, hero)
+
+    def record(self, hero, opponent, result):
+        """Rate a fight between hero and opponent.
+        result: HERO_WINS, OPPONENT_WINS, or anything else for a draw
+        """
+        if result == HERO_WINS:
+            score = 1.0
+        elif result == OPPONENT_WINS:
+            score = 0.0
+        else:
+            score = 0.5
+        rating = self.rating(hero)
+        opponent_rating = self.rating(opponent)
+        change = self.k * (score - expected_score(rating, opponent_rating))
+        self.set_rating(hero, rating + change)
+        self.set_rating(opponent, opponent_rating - change)
+
+    def emit(self, event, *args):
+        """Rate the heroes of every finished fight"""
+        if event == "fight":
+            self.record(*args)
+
+    def top(self, count=10):
+        """The count best heroes as (hero, rating), best first"""
+        return [(hero, -key[0])
+                for key, hero in self.leaderboard.slice(0, count)]
+
+    def rank(self, hero):
+        """1 for the best rated hero, len(self) for the worst"""
+        return self.leaderboard.rank(self.keys[hero]) + 1
+
+    def percentile(self, hero):
+        """Share of the other heroes rated below hero, from 0 to 1"""
+        if len(self) < 2:
+            return 1.0
+        return (len(self) - self.rank(hero)) / (len(self) - 1)
+
+    def near(self, hero, count=1):
+        """Up to count other heroes with the closest ratings to hero,
+        closest first, found without scanning the leaderboard
+        """
+        position = self.rank(hero) - 1
+        rating = self.rating(hero)
+        nearby = [(abs(-key[0] - rating), other) for key, other
+                  in self.leaderboard.slice(position - count,
+                                            position + count + 1)
+                  if other is not hero]
+        nearby.sort(key=lambda pair: pair[0])
+        return [other for _, other in nearby[:count]]
@@ -0,0 +1,98 @@
+import random
+import pytest
+import superheroes
+import rating
+from team_test import build_squad
+
+
+def build_team(name, strength):
+    return build_squad(name, health=80, science=strength)
+
+
+def test_skip_list_matches_sorted_list():
+    rng = random.Random(4)
+    skip = rating.SkipList(seed=1)
+    expected = []
+    for _ in range(2000):
+        key = rng.random()
+        if expected and rng.random() < 0.3:
+            key = rng.choice(expected)
+            skip.remove(key)
+            expected.remove(key)
+        else:
+            skip.insert(key, str(key))
+            expected.append(key)
+    expected.sort()
+    assert len(skip) == len(expected)
+    assert [key for key, _ in skip.slice(0, len(skip))] == expected
+    for index in range(0, len(expected), 37):
+        key = expected[index]
+        assert skip[index] == (key, str(key))
+        assert skip.rank(key) == index
+    assert list(skip.slice(5, 8)) == [(key, str(key))
+                                      for key in expected[5:8]]
+
+
+def test_skip_list_errors():
+    skip = rating.SkipList()
+    skip.insert(1)
+    with pytest.raises(KeyError):
+        skip.remove(2)
+    with pytest.raises(IndexError):
+        skip[1]
+    assert list(skip.slice(1, 5)) == []
+
+
+def test_expected_score():
+    assert rating.expected_score(1500, 1500) == 0.5
+    assert rating.expected_score(1900, 1500) == pytest.approx(10 / 11)
+
+
+def test_record_moves_ratings_evenly():
+    ratings = rating.Ratings(k=32)
+    athena = superheroes.Hero("Athena")
+    jodie = superheroes.Hero("Jodie Foster")
+    ratings.record(athena, jodie, superheroes.HERO_WINS)
+    assert ratings.rating(athena) == 1516
+    assert ratings.rating(jodie) == 1484
+    ratings.record(athena, jodie, superheroes.DRAW)
+    assert ratings.rating(athena) + ratings.rating(jodie) == \
+        pytest.approx(3000)
+    assert ratings.rating(athena) < 1516
+
+
+def test_leaderboard_queries():
+    ratings = rating.Ratings()
+    heroes = [superheroes.Hero(str(number)) for number in range(100)]
+    for number, hero in enumerate(heroes):
+        ratings.add(hero, 1000 + number * 10)
+    assert len(ratings) == 100 and heroes[0] in ratings
+    assert ratings.top(3) == [(heroes[99], 1990), (heroes[98], 1980),
+                              (heroes[97], 1970)]
+    assert ratings.rank(heroes[99]) == 1
+    assert ratings.rank(heroes[0]) == 100
+    assert ratings.percentile(heroes[99]) == 1.0
+    assert ratings.percentile(heroes[0]) == 0.0
+    ratings.set_rating(heroes[0], 1503)
+    assert ratings.rank(heroes[0]) == 50
+    assert ratings.near(heroes[0], 2) == [heroes[50], heroes[51]]
+
+
+def test_ratings_follow_a_battle():
+    ratings = rating.Ratings()
+    arena = superheroes.Arena(ratings)
+    arena.team_one = build_team("Strong", 60)
+    arena.team_two = build_team("Weak", 5)
+    arena.set_rng(2)
+    arena.team_battle()
+    athena, gamora, okoye = arena.team_one.heroes
+    weak = arena.team_two.heroes
+    # Seed 2: Athena and Okoye win every fight, Gamora never steps in
+    assert gamora not in ratings
+    assert len(ratings) == 5
+    assert ratings.rating(athena) == pytest.approx(1531.2637, abs=1e-4)
+    assert ratings.rating(okoye) == 1516
+    assert [ratings.rating(hero) for hero in weak] == \
+        pytest.approx([1484, 1484.7363, 1484], abs=1e-4)
+    assert sum(map(ratings.rating, [athena, okoye] + weak)) == \
+        pytest.approx(7500)
@@ -0,0 +1,266 @@
+"""Record team battles to a compact binary log and replay them later.
+
+ReplayRecorder is an event sink. Given to Arena.team_battle it logs the
+random stream the battle used, which team attacked, every pairing that
+Team.attack chose and the damage dealt each round. Numbers are written as
+varints, so a typical round costs three to five bytes, and records go
+through a buffer that is written out in large appends.
+
+read_log streams the battles back. replay applies the logged damage
+straight to the heroes without drawing a single random number, and
+verify plays the battle again from its seed and checks that it matches.
+"""
+import mmap
+
+from simulation import outcome
+from streams import RandomStream
+from superheroes import Arena, CollectorSink, NullSink
+
+MAGIC = b"SHRP\x01"
+
+BATTLE = 1
+DUEL = 2
+ROUND = 3
+END = 4
+ATTACKER = 5
+
+
+def write_varint(buffer, value):
+    """Append a non-negative integer to buffer, seven bits per byte"""
+    while value > 0x7F:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, position):
+    """Return the integer at position and the position after it"""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def zigzag(value):
+    """Map signed integers onto non-negative ones: 0, -1, 1, -2 ..."""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value):
+    """Undo zigzag"""
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+class ReplayWriter:
+    """Appends encoded records to a file in large chunks"""
+
+    def __init__(self, path, buffer_size=1 << 16):
+        """path: log file, created with a header if it is new or empty
+        buffer_size: bytes to hold before writing
+        """
+        self.stream = open(path, "ab")
+        self.buffer = bytearray()
+        self.buffer_size = buffer_size
+        if self.stream.tell() == 0:
+            self.buffer += MAGIC
+
+    def record(self, tag, *values):
+        """Encode one record"""
+        buffer = self.buffer
+        buffer.append(tag)
+        for value in values:
+            write_varint(buffer, value)
+        if len(buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write out everything buffered"""
+        if self.buffer:
+            self.stream.write(self.buffer)
+            self.buffer.clear()
+        self.stream.flush()
+
+    def close(self):
+        """Flush and close the file"""
+        self.flush()
+        self.stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayRecorder(NullSink):
+    """Event sink that logs battles to a ReplayWriter"""
+
+    active = True
+
+    def __init__(self, writer):
+        """writer: ReplayWriter the records go to"""
+        self.writer = writer
+        self.team_one = None
+
+    def begin(self, arena, seed, key=()):
+        """Log the start of a battle driven by RandomStream(seed, key)"""
+        self.team_one = arena.team_one
+        self.writer.record(BATTLE, zigzag(seed), len(key),
+                           *(zigzag(part) for part in key))
+
+    def end(self, result):
+        """Log how the battle ended"""
+        self.writer.record(END, result)
+
+    def emit(self, event, *args):
+        """Log the events a replay needs and ignore the rest"""
+        if event == "round":
+            self.writer.record(ROUND, *args)
+        elif event == "duel":
+            self.writer.record(DUEL, *args)
+        elif event == "battle":
+            self.writer.record(ATTACKER,
+                               1 if args[0] is self.team_one else 2)
+
+    def flush(self):
+        """Flush the writer"""
+        self.writer.flush()
+
+
+def record_battle(arena, recorder, seed, key=()):
+    """Play arena.team_battle from RandomStream(seed, key) and log it.
+    return: outcome of the battle
+    """
+    sink = arena.sink
+    arena.sink = recorder
+    arena.set_rng(RandomStream(seed, key))
+    recorder.begin(arena, seed, key)
+    try:
+        arena.team_battle()
+    finally:
+        arena.sink = sink
+    result = outcome(arena.team_one, arena.team_two)
+    recorder.end(result)
+    return result
+
+
+class Battle:
+    """One battle read back from a log"""
+
+    def __init__(self, seed, key):
+        """seed, key: the RandomStream the battle was played with
+        first: 1 if team one attacked, 2 if team two did
+        duels: List of (attacker index, defender index, rounds) where
+        rounds is a List of (damage dealt, damage taken)
+        result: outcome recorded at the end
+        """
+        self.seed = seed
+        self.key = key
+        self.first = None
+        self.duels = []
+        self.result = None
+
+
+def read_log(path):
+    """Yield every Battle in a log file"""
+    with open(path, "rb") as stream:
+        data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+    with data:
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a replay log")
+        position = len(MAGIC)
+        battle = None
+        rounds = None
+        while position < len(data):
+            tag = data[position]
+            position += 1
+            if tag == ROUND:
+                dealt, position = read_varint(data, position)
+                taken, position = read_varint(data, position)
+                rounds.append((dealt, taken))
+            elif tag == DUEL:
+                one, position = read_varint(data, position)
+                two, position = read_varint(data, position)
+                rounds = []
+                battle.duels.append((one, two, rounds))
+            elif tag == ATTACKER:
+                battle.first, position = read_varint(data, position)
+            elif tag == BATTLE:
+                seed, position = read_varint(data, position)
+                length, position = read_varint(data, position)
+                key = []
+                for _ in range(length):
+                    part, position = read_varint(data, position)
+                    key.append(unzigzag(part))
+                battle = Battle(unzigzag(seed), tuple(key))
+            elif tag == END:
+                battle.result, position = read_varint(data, position)
+                yield battle
+                battle = None
+            else:
+                raise ValueError(f"{path}: bad record tag {tag}")
+
+
+def replay(battle, team_one, team_two):
+    """Apply a logged battle to the teams without drawing random numbers.
+    Health, kills and deaths end up as they did in the original battle.
+    return: outcome of the replayed battle
+    """
+    if battle.first == 1:
+        attackers, defenders = team_one.heroes, team_two.heroes
+    else:
+        attackers, defenders = team_two.heroes, team_one.heroes
+
+    for one, two, rounds in battle.duels:
+        hero = attackers[one]
+        opponent = defenders[two]
+        for dealt, taken in rounds:
+            opponent.current_health -= dealt
+            hero.current_health -= taken
+        if hero.is_alive() and opponent.is_alive():
+            # A draw or a fight that was called off
+            continue
+        if hero.is_alive():
+            hero.add_kill(1)
+            opponent.add_deaths(1)
+        else:
+            hero.add_deaths(1)
+            opponent.add_kill(1)
+
+    return outcome(team_one, team_two)
+
+
+def verify(battle, team_one, team_two):
+    """Play a logged battle again from its seed and compare.
+    The teams should be in the state the battle started from; they are
+    put back to it afterwards.
+    return: True if the new battle matches the log exactly
+    """
+    start_one = team_one.snapshot()
+    start_two = team_two.snapshot()
+    collector = CollectorSink()
+    arena = Arena(collector)
+    arena.team_one = team_one
+    arena.team_two = team_two
+    arena.set_rng(RandomStream(battle.seed, battle.key))
+    arena.team_battle()
+    result = outcome(team_one, team_two)
+    team_one.restore(start_one)
+    team_two.restore(start_two)
+
+    duels = []
+    first = None
+    for event in collector.events:
+        if event[0] == "battle":
+            first = 1 if event[1] is team_one else 2
+        elif event[0] == "duel":
+            duels.append((event[1], event[2], []))
+        elif event[0] == "round":
+            duels[-1][2].append((event[1], event[2]))
+    return (first, duels, result) == \
+        (battle.first, battle.duels, battle.result)
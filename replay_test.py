@@ -0,0 +1,96 @@
+import pytest
+import superheroes
+import replay
+from team_test import build_squad
+
+
+def build_team(name):
+    return build_squad(name, health=80, science=30, spear=20)
+
+
+def build_arena():
+    arena = superheroes.Arena()
+    arena.team_one = build_team("One")
+    arena.team_two = build_team("Two")
+    return arena
+
+
+def state(arena):
+    return arena.team_one.snapshot() + arena.team_two.snapshot()
+
+
+def test_varint_round_trip():
+    buffer = bytearray()
+    values = [0, 1, 127, 128, 300, 2 ** 70]
+    for value in values:
+        replay.write_varint(buffer, value)
+    assert len(buffer) < 8 * len(values)
+    position = 0
+    for value in values:
+        decoded, position = replay.read_varint(buffer, position)
+        assert decoded == value
+    assert [replay.unzigzag(replay.zigzag(v)) for v in [0, -1, 5, -9]] == \
+        [0, -1, 5, -9]
+
+
+def record(path, battles):
+    finals = []
+    with replay.ReplayWriter(path) as writer:
+        recorder = replay.ReplayRecorder(writer)
+        for number in range(battles):
+            arena = build_arena()
+            result = replay.record_battle(arena, recorder, 77, (number,))
+            finals.append((result, state(arena)))
+    return finals
+
+
+def test_record_and_read(tmp_path):
+    path = str(tmp_path / "battles.replay")
+    finals = record(path, 3)
+    battles = list(replay.read_log(path))
+    assert len(battles) == 3
+    assert [battle.key for battle in battles] == [(0,), (1,), (2,)]
+    for battle, (result, _) in zip(battles, finals):
+        assert battle.seed == 77
+        assert battle.first in (1, 2)
+        assert battle.result == result
+        assert all(rounds for _, _, rounds in battle.duels)
+
+
+def test_replay_reproduces_battle(tmp_path):
+    path = str(tmp_path / "battles.replay")
+    finals = record(path, 3)
+    for battle, (result, final_state) in zip(replay.read_log(path), finals):
+        arena = build_arena()
+        assert replay.replay(battle, arena.team_one,
+                             arena.team_two) == result
+        assert state(arena) == final_state
+
+
+def test_verify(tmp_path):
+    path = str(tmp_path / "battles.replay")
+    record(path, 2)
+    battle = next(replay.read_log(path))
+    arena = build_arena()
+    assert replay.verify(battle, arena.team_one, arena.team_two)
+    battle.duels[0][2][0] = (0, 0)
+    assert not replay.verify(battle, arena.team_one, arena.team_two)
+
+
+def test_log_appends(tmp_path):
+    path = str(tmp_path / "battles.replay")
+    record(path, 1)
+    record(path, 2)
+    assert len(list(replay.read_log(path))) == 3
+
+
+def test_recorder_is_silent(tmp_path, capsys):
+    record(str(tmp_path / "battles.replay"), 1)
+    assert capsys.readouterr().out == ""
+
+
+def test_read_log_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.replay"
+    path.write_bytes(b"hello")
+    with pytest.raises(ValueError):
+        list(replay.read_log(str(path)))
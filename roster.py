@@ -0,0 +1,347 @@
+"""Store large rosters of heroes as typed columns instead of objects.
+
+A Roster keeps one array per hero property and flattens every hero's
+abilities and armors into shared item columns. Hero i owns the items from
+ability_start[i] up to ability_start[i + 1], and the same for armors.
+Names are kept once each in a string table and referred to by index.
+
+HeroView gives a Hero-compatible window onto one row, so Team and Arena
+work on a roster without building full Hero objects.
+
+Roster.save writes the columns to a file that Roster.load maps straight
+into memory. A loaded roster reads every column and name from the mapping
+on demand, and fights write to private copy-on-write pages, so any number
+of worker processes can share one file without unpickling anything.
+Pickling a loaded roster only sends its path, so the receiving process
+sees the file's contents rather than changes made since it was loaded.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from streams import SHARED_RANDOM
+from superheroes import Ability, Armor, Hero, Team, Weapon
+
+ABILITY = 0
+WEAPON = 1
+
+# Every typed column, in the order they are stored in a roster file.
+COLUMNS = [("hero_name", "q"), ("starting_health", "q"),
+           ("current_health", "q"), ("kills", "q"), ("deaths", "q"),
+           ("ability_start", "q"), ("ability_kind", "b"),
+           ("ability_name", "q"), ("ability_damage", "q"),
+           ("armor_start", "q"), ("armor_name", "q"), ("armor_block", "q")]
+
+MAGIC = b"SHRO"
+VERSION = 1
+# Written in native byte order, so a file from another machine is caught.
+BYTE_ORDER_CHECK = 0x0102030405060708
+HEADER = struct.Struct(f"=4sIQq{len(COLUMNS)}qqq")
+
+
+def _padding(size):
+    """Bytes needed to bring size up to a multiple of eight"""
+    return -size % 8
+
+
+class MappedStrings:
+    """Read-only string table that decodes names from a mapping on use"""
+
+    def __init__(self, offsets, data):
+        """offsets: where each string starts, plus the end of the last
+        data: memoryview of the UTF-8 bytes
+        """
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start = self.offsets[index]
+        return str(self.data[start:self.offsets[index + 1]], "utf-8")
+
+
+class Roster:
+    """Heroes stored as typed columns"""
+
+    def __init__(self, name):
+        """Instance properties:
+        name: String, used as the team name
+        strings: List of every distinct name
+        hero_name, starting_health, current_health, kills, deaths:
+            one entry per hero
+        ability_start, armor_start: where each hero's items begin
+        ability_kind, ability_name, ability_damage: one entry per ability
+        armor_name, armor_block: one entry per armor
+        """
+        self.name = name
+        self.path = None
+        self.strings = []
+        self.string_index = {}
+        self.hero_name = array("q")
+        self.starting_health = array("q")
+        self.current_health = array("q")
+        self.kills = array("q")
+        self.deaths = array("q")
+        self.ability_start = array("q", [0])
+        self.ability_kind = array("b")
+        self.ability_name = array("q")
+        self.ability_damage = array("q")
+        self.armor_start = array("q", [0])
+        self.armor_name = array("q")
+        self.armor_block = array("q")
+
+    def __len__(self):
+        return len(self.hero_name)
+
+    def intern(self, string):
+        """Return the string table index of string, adding it if needed"""
+        index = self.string_index.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self.string_index[string] = index
+        return index
+
+    def add_hero(self, hero):
+        """Copy hero into the columns and return its index"""
+        self.hero_name.append(self.intern(hero.name))
+        self.starting_health.append(hero.starting_health)
+        self.current_health.append(hero.current_health)
+        self.kills.append(hero.kills)
+        self.deaths.append(hero.deaths)
+
+        for ability in hero.abilities:
+            kind = WEAPON if isinstance(ability, Weapon) else ABILITY
+            self.ability_kind.append(kind)
+            self.ability_name.append(self.intern(ability.name))
+            self.ability_damage.append(ability.max_damage)
+        self.ability_start.append(len(self.ability_damage))
+
+        for armor in hero.armors:
+            self.armor_name.append(self.intern(armor.name))
+            self.armor_block.append(armor.max_block)
+        self.armor_start.append(len(self.armor_block))
+
+        return len(self.hero_name) - 1
+
+    @classmethod
+    def from_team(cls, team):
+        """Build a Roster holding every hero on team"""
+        roster = cls(team.name)
+        for hero in team.heroes:
+            roster.add_hero(hero)
+        return roster
+
+    def hero(self, index):
+        """Return a HeroView of the hero at index"""
+        return HeroView(self, index)
+
+    def __getitem__(self, index):
+        return HeroView(self, index)
+
+    def team(self):
+        """Return a Team whose heroes are views onto this roster"""
+        team = Team(self.name)
+        for index in range(len(self)):
+            team.add_hero(HeroView(self, index))
+        return team
+
+    def columns(self):
+        """Return every typed column"""
+        return [getattr(self, name) for name, _ in COLUMNS]
+
+    def nbytes(self):
+        """Approximate memory used by the columns and the string table"""
+        total = sum(column.itemsize * len(column)
+                    for column in self.columns())
+        if self.path is None:
+            total += sum(sys.getsizeof(string) for string in self.strings)
+        else:
+            total += len(self.strings.data)
+        return total
+
+    def save(self, path):
+        """Write the roster to path in the format Roster.load maps"""
+        encoded = [string.encode("utf-8") for string in
+                   (self.strings[index] for index in range(len(self.strings)))]
+        offsets = array("q", [0])
+        for string in encoded:
+            offsets.append(offsets[-1] + len(string))
+        name = self.name.encode("utf-8")
+
+        with open(path, "wb") as stream:
+            stream.write(HEADER.pack(
+                MAGIC, VERSION, BYTE_ORDER_CHECK, len(name),
+                *(len(column) for column in self.columns()),
+                len(encoded), offsets[-1]))
+            chunks = [name] + [bytes(column) for column in self.columns()]
+            chunks += [bytes(offsets), b"".join(encoded)]
+            for chunk in chunks:
+                stream.write(chunk)
+                stream.write(bytes(_padding(len(chunk))))
+
+    @classmethod
+    def load(cls, path):
+        """Map a file written by save.
+        Nothing is copied: columns and names are read from the mapping as
+        they are used. Changes made by fights stay in this process.
+        """
+        with open(path, "rb") as stream:
+            mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_COPY)
+        view = memoryview(mapping)
+        if len(view) < HEADER.size:
+            raise ValueError(f"{path} is not a version {VERSION} roster file")
+        fields = HEADER.unpack_from(view)
+        magic, version, check, name_size = fields[:4]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} roster file")
+        if check != BYTE_ORDER_CHECK:
+            raise ValueError(f"{path} was written with another byte order")
+        lengths = fields[4:4 + len(COLUMNS)]
+        string_count, string_size = fields[4 + len(COLUMNS):]
+
+        position = HEADER.size + _padding(HEADER.size)
+
+        def take(size):
+            nonlocal position
+            chunk = view[position:position + size]
+            position += size + _padding(size)
+            return chunk
+
+        roster = cls(str(take(name_size), "utf-8"))
+        roster.path = path
+        for (name, code), length in zip(COLUMNS, lengths):
+            size = length * struct.calcsize(code)
+            setattr(roster, name, take(size).cast(code))
+        offsets = take(8 * (string_count + 1)).cast("q")
+        roster.strings = MappedStrings(offsets, take(string_size))
+        roster.string_index = None
+        return roster
+
+    def __reduce_ex__(self, protocol):
+        if self.path is not None:
+            return (Roster.load, (self.path,))
+        return super().__reduce_ex__(protocol)
+
+
+class HeroView(Hero):
+    """A Hero whose state lives in one row of a Roster.
+    Views copy nothing, so any number of them can point at the same row.
+    """
+
+    __slots__ = ("roster", "index")
+
+    def __init__(self, roster, index):
+        """roster: Roster holding the hero
+        index: row of the hero in roster
+        """
+        self.roster = roster
+        self.index = index
+        self.team = None
+        self.rng = SHARED_RANDOM
+        # Speed is not stored in the roster, so every view starts at 1.
+        self.speed = 1
+
+    def __reduce__(self):
+        return (HeroView, (self.roster, self.index),
+                (None, {"team": self.team, "rng": self.rng,
+                        "speed": self.speed}))
+
+    @property
+    def name(self):
+        return self.roster.strings[self.roster.hero_name[self.index]]
+
+    @property
+    def starting_health(self):
+        return self.roster.starting_health[self.index]
+
+    @property
+    def current_health(self):
+        return self.roster.current_health[self.index]
+
+    @current_health.setter
+    def current_health(self, value):
+        """Set health and keep the team's health total and living heroes
+        up to date
+        """
+        health = self.roster.current_health
+        old = health[self.index]
+        health[self.index] = value
+        if self.team is not None:
+            self.team.health_changed(self, old, value)
+
+    def store_health(self, value):
+        """Set health in the roster without updating the team"""
+        self.roster.current_health[self.index] = value
+
+    @property
+    def kills(self):
+        return self.roster.kills[self.index]
+
+    @kills.setter
+    def kills(self, value):
+        self.roster.kills[self.index] = value
+
+    @property
+    def deaths(self):
+        return self.roster.deaths[self.index]
+
+    @deaths.setter
+    def deaths(self, value):
+        self.roster.deaths[self.index] = value
+
+    @property
+    def abilities(self):
+        """Build the hero's Ability and Weapon objects"""
+        roster = self.roster
+        abilities = []
+        for item in range(roster.ability_start[self.index],
+                          roster.ability_start[self.index + 1]):
+            kind = Weapon if roster.ability_kind[item] == WEAPON else Ability
+            abilities.append(kind(roster.strings[roster.ability_name[item]],
+                                  roster.ability_damage[item]))
+        return abilities
+
+    @property
+    def armors(self):
+        """Build the hero's Armor objects"""
+        roster = self.roster
+        return [Armor(roster.strings[roster.armor_name[item]],
+                      roster.armor_block[item])
+                for item in range(roster.armor_start[self.index],
+                                  roster.armor_start[self.index + 1])]
+
+    def add_ability(self, ability):
+        """Roster heroes have a fixed loadout"""
+        raise TypeError("heroes stored in a Roster cannot gain abilities")
+
+    add_weapon = add_ability
+
+    def add_armor(self, armor):
+        """Roster heroes have a fixed loadout"""
+        raise TypeError("heroes stored in a Roster cannot gain armor")
+
+    def attack(self):
+        """Calculate total attack straight from the roster columns"""
+        roster = self.roster
+        total = 0
+        for item in range(roster.ability_start[self.index],
+                          roster.ability_start[self.index + 1]):
+            damage = roster.ability_damage[item]
+            if roster.ability_kind[item] == WEAPON:
+                total += self.rng.randint(damage // 2, damage)
+            else:
+                total += self.rng.randint(0, damage)
+        return total
+
+    def defend(self):
+        """Calculate total block straight from the roster columns"""
+        roster = self.roster
+        total = 0
+        for item in range(roster.armor_start[self.index],
+                          roster.armor_start[self.index + 1]):
+            total += self.rng.randint(0, roster.armor_block[item])
+        return total
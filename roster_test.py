@@ -0,0 +1,187 @@
+import pytest
+import io
+import pickle
+import sys
+import superheroes
+import roster
+import simulation
+from team_test import build_squad
+
+
+# Helper Function
+
+
+def capture_console_output(function_body):
+    # _io.StringIO object
+    string_io = io.StringIO()
+    sys.stdout = string_io
+    function_body()
+    sys.stdout = sys.__stdout__
+    return string_io.getvalue()
+
+
+def build_team(name):
+    # Heroes with different loadouts, so the item columns are uneven
+    team = build_squad(name, ["Athena"], health=150, spear=30, socks=15)
+    gamora = build_squad(name, ["Gamora"], science=60, socks=None).heroes[0]
+    team.add_hero(gamora)
+    return team
+
+
+def test_slots_reject_unknown_attributes():
+    hero = superheroes.Hero("Athena")
+    with pytest.raises(AttributeError):
+        hero.health = 10
+    with pytest.raises(AttributeError):
+        superheroes.Weapon("Spear", 30).power = 1
+
+
+def test_roster_columns():
+    heroes = roster.Roster.from_team(build_team("One"))
+    assert len(heroes) == 2
+    assert list(heroes.ability_start) == [0, 2, 3]
+    assert list(heroes.armor_start) == [0, 1, 1]
+    assert list(heroes.ability_kind) == [roster.ABILITY, roster.WEAPON,
+                                         roster.ABILITY]
+    # Shared names are stored once
+    assert heroes.strings.count("Science") == 1
+    assert heroes.nbytes() > 0
+
+
+def test_hero_view_matches_hero():
+    heroes = roster.Roster.from_team(build_team("One"))
+    athena = heroes.hero(0)
+    assert athena.name == "Athena"
+    assert athena.starting_health == 150
+    assert [a.name for a in athena.abilities] == ["Science", "Spear"]
+    assert isinstance(athena.abilities[1], superheroes.Weapon)
+    assert athena.armors[0].max_block == 15
+    for _ in range(100):
+        assert 15 <= athena.attack() <= 70
+        assert 0 <= athena.defend() <= 15
+
+
+def test_hero_view_writes_through():
+    heroes = roster.Roster.from_team(build_team("One"))
+    athena = heroes.hero(0)
+    athena.take_damage(1000)
+    athena.add_kill(2)
+    assert not athena.is_alive()
+    assert heroes.current_health[0] <= 0
+    assert heroes.hero(0).kills == 2
+
+
+def test_hero_view_loadout_is_fixed():
+    athena = roster.Roster.from_team(build_team("One")).hero(0)
+    with pytest.raises(TypeError):
+        athena.add_ability(superheroes.Ability("Luck", 10))
+    with pytest.raises(TypeError):
+        athena.add_armor(superheroes.Armor("Fog", 10))
+
+
+def test_roster_team_battle():
+    arena = superheroes.Arena()
+    arena.team_one = roster.Roster.from_team(build_team("One")).team()
+    arena.team_two = roster.Roster.from_team(build_team("Two")).team()
+    arena.team_one.revive_heroes()
+    output_string = capture_console_output(arena.team_battle)
+    assert "wins!" in output_string
+    capture_console_output(arena.show_stats)
+    kills = sum(hero.kills for hero in arena.team_one.heroes +
+                arena.team_two.heroes)
+    assert kills > 0
+
+
+def test_roster_team_summary():
+    team_one = roster.Roster.from_team(build_team("One")).team()
+    team_two = roster.Roster.from_team(build_team("Two")).team()
+    assert team_one.summary()["health"] == 250
+    team_one.set_rng(4)
+    team_two.set_rng(4)
+    team_one.attack(team_two, superheroes.NULL_SINK)
+    for team in (team_one, team_two):
+        summary = team.summary()
+        assert summary["health"] == sum(hero.current_health
+                                        for hero in team.living)
+        assert summary["living"] == len(team.living)
+
+
+def test_roster_team_restore():
+    team = roster.Roster.from_team(build_team("One")).team()
+    start = team.snapshot()
+    for hero in team.heroes:
+        hero.take_damage(1000)
+        hero.add_deaths(1)
+    assert not team.has_living()
+    team.restore(start)
+    assert team.snapshot() == start
+    assert len(team.living) == 2 and team.health == 250
+    assert team.death_stats.total == 0
+
+
+def test_roster_run_trials_matches_heroes():
+    hero_counts = simulation.run_trials(build_team("One"), build_team("Two"),
+                                        0, 200, seed=3)
+    team_one = roster.Roster.from_team(build_team("One")).team()
+    team_two = roster.Roster.from_team(build_team("Two")).team()
+    counts = simulation.run_trials(team_one, team_two, 0, 200, seed=3)
+    assert sum(counts) == 200
+    # Identical teams: every outcome turns up, not one side every time.
+    assert min(counts[1], counts[2]) > 50
+    assert abs(counts[1] - hero_counts[1]) < 50
+    for hero in team_one.heroes + team_two.heroes:
+        assert hero.current_health == hero.starting_health
+        assert hero.kills == 0 and hero.deaths == 0
+
+
+def test_roster_file_round_trip(tmp_path):
+    path = str(tmp_path / "one.roster")
+    original = roster.Roster.from_team(build_team("One"))
+    original.save(path)
+    loaded = roster.Roster.load(path)
+    assert loaded.name == "One"
+    assert len(loaded) == 2
+    for name, _ in roster.COLUMNS:
+        assert list(getattr(loaded, name)) == list(getattr(original, name))
+    assert loaded.hero(0).name == "Athena"
+    assert [a.name for a in loaded.hero(0).abilities] == ["Science", "Spear"]
+    assert loaded.hero(1).armors == []
+
+
+def test_roster_file_changes_stay_private(tmp_path):
+    path = str(tmp_path / "one.roster")
+    roster.Roster.from_team(build_team("One")).save(path)
+    loaded = roster.Roster.load(path)
+    loaded.hero(0).take_damage(1000)
+    assert not loaded.hero(0).is_alive()
+    assert roster.Roster.load(path).hero(0).current_health == 150
+
+
+def test_roster_file_pickles_by_path(tmp_path):
+    path = str(tmp_path / "one.roster")
+    roster.Roster.from_team(build_team("One")).save(path)
+    team = roster.Roster.load(path).team()
+    data = pickle.dumps(team)
+    assert path.encode() in data
+    copied = pickle.loads(data)
+    assert copied.heroes[0].name == "Athena"
+    copied.heroes[0].take_damage(1000)
+    assert copied.get_living_heroes(copied) == [copied.heroes[1]]
+
+
+def test_roster_file_battle_on_pool(tmp_path):
+    one = str(tmp_path / "one.roster")
+    two = str(tmp_path / "two.roster")
+    roster.Roster.from_team(build_team("One")).save(one)
+    roster.Roster.from_team(build_team("Two")).save(two)
+    estimate = simulation.estimate_team_battle(
+        roster.Roster.load(one).team(), roster.Roster.load(two).team(),
+        40, workers=2, seed=1, chunk_size=10)
+    assert estimate.trials == 40
+
+
+def test_roster_file_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.roster"
+    path.write_bytes(b"not a roster" * 20)
+    with pytest.raises(ValueError):
+        roster.Roster.load(str(path))
@@ -0,0 +1,258 @@
+"""Statistics that update one value at a time.
+
+RunningStats keeps a count, sum, mean, variance, minimum and maximum in
+constant space using Welford's algorithm. Values can also be taken out
+or replaced. Two partial states merge exactly, so workers can each
+summarise their share of a long run and the results can be combined
+afterwards.
+
+TallyStats also counts how often each value occurs, so its min and max
+stay exact when values are taken out or replaced. A Team uses it to
+follow its heroes' kill and death counts as they change: those are
+small whole numbers, so the tally stays short.
+
+BattleStats uses them to summarise many battles between two teams: the
+kills and deaths per battle of every hero and of each team as a whole.
+"""
+from collections import Counter
+from math import sqrt
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of numbers.
+    min and max are None once a value that might have been one of them is
+    removed or replaced, since finding the new extremes needs the values.
+    """
+
+    __slots__ = ("count", "total", "mean", "_m2", "min", "max",
+                 "_extremes")
+
+    def __init__(self, values=()):
+        """values: numbers to start with"""
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self._extremes = True
+        values = list(values)
+        if values:
+            # Whole lists are summarised with builtins in two passes,
+            # which is faster than add and rounds no worse.
+            self.count = len(values)
+            self.total = sum(values)
+            mean = self.mean = self.total / self.count
+            self._m2 = float(sum([(value - mean) ** 2 for value in values]))
+            self.min = min(values)
+            self.max = max(values)
+
+    def add(self, value):
+        """Include value"""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if self._extremes:
+            self._extend(value)
+
+    def _extend(self, value):
+        """Widen min and max to cover value"""
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _forget(self, value):
+        """Drop min and max if value may have been one of them"""
+        if self._extremes and not self.min < value < self.max:
+            self._extremes = False
+            self.min = self.max = None
+
+    def remove(self, value):
+        """Take out a value that was added before"""
+        if self.count <= 1:
+            self.count = 0
+            self.total = 0
+            self.mean = 0.0
+            self._m2 = 0.0
+            self.min = self.max = None
+            self._extremes = True
+            return
+        self._forget(value)
+        self.count -= 1
+        self.total -= value
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(0.0, self._m2 - delta * (value - self.mean))
+
+    def replace(self, old, new):
+        """Change a value that was added before from old to new.
+        Does nothing when no values have been added.
+        """
+        if self.count == 0 or old == new:
+            return
+        self._forget(old)
+        change = new - old
+        mean = self.mean + change / self.count
+        self._m2 = max(0.0, self._m2 + change * (new + old - self.mean - mean))
+        self.mean = mean
+        self.total += change
+        if self._extremes:
+            self._extend(new)
+
+    def merge(self, other):
+        """Include everything other has seen"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.total, self.mean = \
+                other.count, other.total, other.mean
+            self._m2, self.min, self.max = other._m2, other.min, other.max
+            self._extremes = other._extremes
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count \
+            / count
+        self.count = count
+        self.total += other.total
+        if self._extremes and other._extremes:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+        else:
+            self._extremes = False
+            self.min = self.max = None
+        return self
+
+    @property
+    def variance(self):
+        """Population variance"""
+        return self._m2 / self.count if self.count else 0.0
+
+    @property
+    def sample_variance(self):
+        """Variance with Bessel's correction"""
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self):
+        """Population standard deviation"""
+        return sqrt(self.variance)
+
+    def average(self):
+        """Mean as statistics.mean gives it: exact for whole numbers"""
+        if self.count == 0:
+            return 0
+        if isinstance(self.total, int) and self.total % self.count == 0:
+            return self.total // self.count
+        return self.total / self.count
+
+    def to_dict(self):
+        return {"count": self.count, "mean": self.mean,
+                "variance": self.variance, "min": self.min,
+                "max": self.max}
+
+
+class TallyStats(RunningStats):
+    """RunningStats whose min and max stay exact through remove and
+    replace, for values that repeat a lot
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, values=()):
+        """values: numbers to start with
+        counts: Counter of how many times each value is held
+        """
+        values = list(values)
+        self.counts = Counter(values)
+        super().__init__(values)
+
+    def add(self, value):
+        """Include value"""
+        self.counts[value] += 1
+        super().add(value)
+
+    def remove(self, value):
+        """Take out a value that was added before"""
+        if self.count <= 1:
+            self.counts.clear()
+        super().remove(value)
+
+    def replace(self, old, new):
+        """Change a value that was added before from old to new"""
+        if self.count and old != new:
+            self.counts[new] += 1
+        super().replace(old, new)
+
+    def _forget(self, value):
+        """Count value out and find new extremes if it was the last one"""
+        counts = self.counts
+        left = counts[value] - 1
+        if left:
+            counts[value] = left
+            return
+        del counts[value]
+        if value == self.min:
+            self.min = min(counts)
+        if value == self.max:
+            self.max = max(counts)
+
+    def merge(self, other):
+        """Include everything other has seen"""
+        self.counts.update(other.counts)
+        return super().merge(other)
+
+
+class BattleStats:
+    """Kills and deaths per battle for every hero and both teams"""
+
+    def __init__(self, team_one, team_two):
+        """team_one, team_two: the teams that will be recorded; heroes
+        are matched up by their place in each team
+        """
+        self.names = [team_one.name, team_two.name]
+        self.heroes = [[(hero.name, RunningStats(), RunningStats())
+                        for hero in team.heroes]
+                       for team in (team_one, team_two)]
+        self.teams = [(RunningStats(), RunningStats()) for _ in range(2)]
+
+    def record(self, team_one, team_two):
+        """Add the kills and deaths the teams have now as one battle"""
+        for side, team in enumerate((team_one, team_two)):
+            team_kills, team_deaths = self.teams[side]
+            team_kills.add(team.kill_stats.total)
+            team_deaths.add(team.death_stats.total)
+            for (_, kills, deaths), hero in zip(self.heroes[side],
+                                                team.heroes):
+                kills.add(hero.kills)
+                deaths.add(hero.deaths)
+
+    def merge(self, other):
+        """Include the battles other recorded"""
+        for mine, theirs in zip(self.teams, other.teams):
+            mine[0].merge(theirs[0])
+            mine[1].merge(theirs[1])
+        for side in (0, 1):
+            for mine, theirs in zip(self.heroes[side], other.heroes[side]):
+                mine[1].merge(theirs[1])
+                mine[2].merge(theirs[2])
+        return self
+
+    def summary(self):
+        """Return everything as plain dictionaries"""
+        teams = []
+        for side in (0, 1):
+            kills, deaths = self.teams[side]
+            teams.append({
+                "name": self.names[side],
+                "kills": kills.to_dict(),
+                "deaths": deaths.to_dict(),
+                "heroes": [{"name": name, "kills": hero_kills.to_dict(),
+                            "deaths": hero_deaths.to_dict()}
+                           for name, hero_kills, hero_deaths
+                           in self.heroes[side]]})
+        return teams
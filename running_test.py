@@ -0,0 +1,159 @@
+import pickle
+import random
+import statistics
+import pytest
+import superheroes
+import simulation
+from running import BattleStats, RunningStats, TallyStats
+from team_test import build_squad
+
+
+def test_running_stats_match_statistics():
+    values = [random.randint(0, 50) for _ in range(200)]
+    stats = RunningStats(values)
+    assert stats.count == 200
+    assert stats.total == sum(values)
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.pvariance(values))
+    assert stats.sample_variance == pytest.approx(statistics.variance(values))
+    assert (stats.min, stats.max) == (min(values), max(values))
+
+
+def test_values_match_adding_one_at_a_time():
+    values = [random.randint(0, 50) for _ in range(100)]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    whole = RunningStats(iter(values))
+    assert (whole.count, whole.total, whole.min, whole.max) == \
+        (stats.count, stats.total, stats.min, stats.max)
+    assert whole.mean == pytest.approx(stats.mean)
+    assert whole.variance == pytest.approx(stats.variance)
+
+
+def test_remove_and_replace():
+    stats = RunningStats([4, 8, 15, 16, 23, 42])
+    stats.remove(42)
+    stats.replace(4, 10)
+    values = [10, 8, 15, 16, 23]
+    assert stats.mean == pytest.approx(statistics.mean(values))
+    assert stats.variance == pytest.approx(statistics.pvariance(values))
+    assert stats.total == sum(values)
+    # 42 is gone and 4 was the minimum, so neither extreme is known
+    assert stats.min is None and stats.max is None
+    stats.add(50)
+    assert stats.max is None
+    stats = RunningStats([3])
+    stats.remove(3)
+    assert stats.count == 0 and stats.variance == 0.0
+    stats.add(7)
+    assert (stats.min, stats.max) == (7, 7)
+
+
+def test_extremes_kept_when_inner_values_change():
+    stats = RunningStats([1, 5, 9])
+    stats.replace(5, 6)
+    stats.remove(6)
+    stats.add(12)
+    assert (stats.min, stats.max) == (1, 12)
+    assert RunningStats([4, 4]).merge(RunningStats([8])).max == 8
+    changed = RunningStats([1, 2])
+    changed.remove(1)
+    assert RunningStats([3]).merge(changed).min is None
+
+
+def test_replace_on_empty_stats():
+    stats = RunningStats()
+    stats.replace(0, 3)
+    assert stats.count == 0 and stats.total == 0 and stats.mean == 0.0
+
+
+def test_tally_stats_keep_exact_extremes():
+    rng = random.Random(6)
+    values = [rng.randint(0, 5) for _ in range(50)]
+    stats = TallyStats(values[:10])
+    for value in values[10:]:
+        stats.add(value)
+    for _ in range(200):
+        index = rng.randrange(len(values))
+        new = rng.randint(0, 8)
+        stats.replace(values[index], new)
+        values[index] = new
+        if rng.random() < 0.1 and len(values) > 1:
+            stats.remove(values.pop())
+        assert (stats.min, stats.max) == (min(values), max(values))
+        assert stats.total == sum(values)
+    merged = TallyStats([20]).merge(stats)
+    assert (merged.min, merged.max) == (min(values), 20)
+
+
+def test_merge_matches_one_pass():
+    values = [random.random() * 100 for _ in range(300)]
+    left = RunningStats(values[:120])
+    right = pickle.loads(pickle.dumps(RunningStats(values[120:])))
+    merged = left.merge(right)
+    whole = RunningStats(values)
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean)
+    assert merged.variance == pytest.approx(whole.variance)
+    assert (merged.min, merged.max) == (whole.min, whole.max)
+    assert RunningStats().merge(whole).mean == whole.mean
+
+
+def test_average_like_statistics_mean():
+    assert RunningStats([2, 2]).average() == 2
+    assert isinstance(RunningStats([2, 2]).average(), int)
+    assert RunningStats([1, 2]).average() == 1.5
+    assert RunningStats().average() == 0
+
+
+def build_team(name):
+    return build_squad(name, health=60, science=30, socks=None)
+
+
+def test_team_stats_follow_kills_and_deaths():
+    team = build_team("One")
+    athena, gamora, okoye = team.heroes
+    athena.add_kill(3)
+    gamora.add_deaths(1)
+    assert team.kill_stats.total == 3
+    assert team.kill_stats.mean == pytest.approx(1)
+    assert team.death_stats.total == 1
+    team.remove_hero("Athena")
+    assert team.kill_stats.count == 2 and team.kill_stats.total == 0
+    # Athena's 3 kills left with her, so the maximum goes back to 0
+    assert (team.kill_stats.min, team.kill_stats.max) == (0, 0)
+    okoye.add_kill(2)
+    start = team.snapshot()
+    gamora.add_kill(5)
+    team.restore(start)
+    assert team.kill_stats.total == 2
+
+
+def test_team_stats_min_and_max_after_kills():
+    team = build_team("One")
+    team.heroes[0].add_kill(3)
+    assert (team.kill_stats.min, team.kill_stats.max) == (0, 3)
+    team.heroes[0].add_kill(1)
+    team.heroes[1].add_kill(1)
+    assert (team.kill_stats.min, team.kill_stats.max) == (0, 4)
+    team.heroes[2].add_kill(2)
+    assert (team.kill_stats.min, team.kill_stats.max) == (1, 4)
+
+
+def test_battle_stats_merge_across_workers():
+    team_one = build_team("One")
+    team_two = build_team("Two")
+    serial = simulation.estimate_team_battle(
+        team_one, team_two, 60, workers=1, seed=2, chunk_size=20,
+        hero_stats=True)
+    pooled = simulation.estimate_team_battle(
+        team_one, team_two, 60, workers=2, seed=2, chunk_size=20,
+        hero_stats=True)
+    assert isinstance(pooled.stats, BattleStats)
+    assert serial.stats.summary() == pooled.stats.summary()
+    one, two = pooled.stats.summary()
+    assert one["kills"]["count"] == 60
+    assert one["kills"]["mean"] * 60 == pytest.approx(
+        sum(hero["kills"]["mean"] * 60 for hero in one["heroes"]))
+    assert one["kills"]["mean"] == pytest.approx(two["deaths"]["mean"])
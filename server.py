@@ -0,0 +1,415 @@
+"""Serve matchup simulations over a local socket.
+
+Clients send one JSON object per line and get one JSON object back per
+request, tagged with the id they sent. Heroes use the JSON Lines layout
+from loader.py:
+
+    {"id": 1, "type": "duel", "hero": {...}, "opponent": {...},
+     "trials": 100, "seed": 7}
+    {"id": 2, "type": "battle", "team_one": [{...}, ...],
+     "team_two": [{...}, ...], "trials": 20}
+    {"id": 3, "type": "report"}
+
+Answers hold the wins, losses and draws of the hero or team_one, or an
+"error". Requests wait in a bounded queue and are collected into batches
+that run on a process pool, so the event loop never runs a battle
+itself. When the queue is full the server stops reading from clients
+until it drains, and a request that waits longer than its timeout is
+answered with an error.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from loader import hero_from_record
+from simulation import run_trials
+from streams import RandomStream
+from superheroes import Team
+
+
+def build_team(name, records, items):
+    """Return a Team of heroes made from JSON Lines records"""
+    if not isinstance(records, list) or not records:
+        raise ValueError(f"{name}: expected a list of heroes")
+    team = Team(name)
+    for number, record in enumerate(records, 1):
+        team.add_hero(hero_from_record(record, f"{name}:{number}", items))
+    return team
+
+
+def simulate(payload):
+    """Run one duel or battle request.
+    return: Dictionary of wins, losses, draws and trials
+    """
+    items = {}
+    if payload["type"] == "duel":
+        team_one = build_team("hero", [payload.get("hero")], items)
+        team_two = build_team("opponent", [payload.get("opponent")], items)
+    else:
+        team_one = build_team("team_one", payload.get("team_one"), items)
+        team_two = build_team("team_two", payload.get("team_two"), items)
+    trials = payload["trials"]
+    seed = RandomStream(payload.get("seed")).entropy
+    draws, wins, losses = run_trials(team_one, team_two, 0, trials, seed)
+    return {"wins": wins, "losses": losses, "draws": draws,
+            "trials": trials}
+
+
+def run_batch(payloads):
+    """Run a batch of requests in one go.
+    return: List of (True, result) or (False, error message)
+    """
+    answers = []
+    for payload in payloads:
+        try:
+            answers.append((True, simulate(payload)))
+        except ValueError as error:
+            answers.append((False, str(error)))
+    return answers
+
+
+def percentile(ordered, fraction):
+    """Value below which fraction of the sorted values fall"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class ServerStats:
+    """Throughput and latency of the requests a server has answered"""
+
+    def __init__(self, keep=10000):
+        """keep: how many recent latencies to use for percentiles"""
+        self.started = time.perf_counter()
+        self.received = 0
+        self.completed = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.batches = 0
+        self.batched = 0
+        self.latencies = deque(maxlen=keep)
+
+    def report(self):
+        """Return the numbers so far as a dictionary"""
+        elapsed = time.perf_counter() - self.started
+        ordered = sorted(self.latencies)
+        return {"received": self.received,
+                "completed": self.completed,
+                "errors": self.errors,
+                "timeouts": self.timeouts,
+                "seconds": elapsed,
+                "requests_per_second": self.completed / elapsed
+                if elapsed else 0.0,
+                "mean_batch": self.batched / self.batches
+                if self.batches else 0.0,
+                "latency_ms": {
+                    "p50": percentile(ordered, 0.50) * 1000,
+                    "p95": percentile(ordered, 0.95) * 1000,
+                    "p99": percentile(ordered, 0.99) * 1000,
+                    "max": (ordered[-1] if ordered else 0.0) * 1000}}
+
+
+class BattleServer:
+    """Answers duel and battle requests from JSON lines clients"""
+
+    def __init__(self, workers=None, batch_size=32, batch_delay=0.002,
+                 queue_size=256, timeout=30.0, max_trials=10000):
+        """workers: processes to run battles on, the CPU count when None,
+        1 to use a thread of this process
+        batch_size: most requests sent to a worker at once
+        batch_delay: seconds to wait for a batch to fill
+        queue_size: requests that may wait before reading pauses
+        timeout: seconds a request may take before it fails
+        max_trials: most trials one request may ask for
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.max_trials = max_trials
+        self.stats = ServerStats()
+        self.pool = None
+        self.server = None
+        self.queue = None
+        self.batcher = None
+        self.address = None
+        self.connections = set()
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """Listen on host and port, or on a Unix socket at path.
+        Port 0 picks a free port; the address used is in self.address.
+        """
+        if self.workers != 1:
+            # Forked workers would inherit client sockets and keep them
+            # open after the server closes them.
+            context = multiprocessing.get_context("spawn")
+            self.pool = ProcessPoolExecutor(self.workers, context)
+        self.queue = asyncio.Queue(self.queue_size)
+        self.batcher = asyncio.create_task(self.run_batches())
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle, path)
+            self.address = path
+        else:
+            self.server = await asyncio.start_server(self.handle, host, port)
+            self.address = self.server.sockets[0].getsockname()[:2]
+        self.stats = ServerStats()
+        return self
+
+    async def close(self):
+        """Stop listening, let open connections finish their requests
+        for up to timeout seconds, then shut the pool down
+        """
+        self.server.close()
+        if self.connections:
+            await asyncio.wait(self.connections, timeout=self.timeout)
+        for connection in self.connections:
+            connection.cancel()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def handle(self, reader, writer):
+        """Answer every request on one connection"""
+        lock = asyncio.Lock()
+        tasks = set()
+        connection = asyncio.current_task()
+        self.connections.add(connection)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                self.stats.received += 1
+                answer = await self.accept(line)
+                if isinstance(answer, dict):
+                    await self.send(writer, lock, answer)
+                else:
+                    task = asyncio.create_task(
+                        self.answer(answer, writer, lock))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+            self.connections.discard(connection)
+
+    async def accept(self, line):
+        """Check a request and queue it.
+        Waits while the queue is full, which stops this connection being
+        read.
+        return: an answer to send now, or (id, start time, future)
+        """
+        started = time.perf_counter()
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            self.stats.errors += 1
+            return {"id": None, "error": "invalid JSON"}
+        if not isinstance(payload, dict):
+            self.stats.errors += 1
+            return {"id": None, "error": "expected an object"}
+
+        request_id = payload.get("id")
+        kind = payload.get("type")
+        if kind == "report":
+            return {"id": request_id, "report": self.stats.report()}
+        if kind not in ("duel", "battle"):
+            self.stats.errors += 1
+            return {"id": request_id, "error": f"unknown type {kind!r}"}
+        trials = payload.get("trials", 1)
+        if isinstance(trials, bool) or not isinstance(trials, int) \
+                or not 0 < trials <= self.max_trials:
+            self.stats.errors += 1
+            return {"id": request_id,
+                    "error": f"trials must be 1 to {self.max_trials}"}
+        payload["trials"] = trials
+
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((payload, future))
+        return request_id, started, future
+
+    async def answer(self, request, writer, lock):
+        """Wait for a queued request and send its answer"""
+        request_id, started, future = request
+        try:
+            ok, result = await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            answer = {"id": request_id, "error": "timed out"}
+        else:
+            if ok:
+                self.stats.completed += 1
+                self.stats.latencies.append(time.perf_counter() - started)
+                answer = {"id": request_id, **result}
+            else:
+                self.stats.errors += 1
+                answer = {"id": request_id, "error": result}
+        await self.send(writer, lock, answer)
+
+    async def send(self, writer, lock, answer):
+        """Write one answer line"""
+        async with lock:
+            writer.write(json.dumps(answer).encode() + b"\n")
+            await writer.drain()
+
+    async def run_batches(self):
+        """Collect queued requests into batches and run them.
+        At most one batch per worker runs at a time, so when the workers
+        are busy the queue fills up and clients are slowed down.
+        """
+        running = asyncio.Semaphore(self.workers)
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_delay
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(),
+                                                        remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Requests that already timed out are not worth running.
+            batch = [(payload, future) for payload, future in batch
+                     if not future.done()]
+            if not batch:
+                continue
+            await running.acquire()
+            task = asyncio.create_task(self.run_batch(batch))
+            task.add_done_callback(lambda _: running.release())
+
+    async def run_batch(self, batch):
+        """Run one batch on the pool and hand out the answers"""
+        self.stats.batches += 1
+        self.stats.batched += len(batch)
+        payloads = [payload for payload, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            answers = await loop.run_in_executor(self.pool, run_batch,
+                                                 payloads)
+        except Exception as error:
+            answers = [(False, f"battle failed: {error}")] * len(batch)
+        for (_, future), answer in zip(batch, answers):
+            if not future.done():
+                future.set_result(answer)
+
+
+async def load_test(address, payloads, connections=4):
+    """Send payloads to a server and time the answers.
+    address: (host, port), or the path of a Unix socket
+    connections: payloads are shared out over this many connections
+    return: Dictionary of requests, errors, throughput and latency
+    """
+    latencies = []
+    errors = 0
+
+    async def client(share):
+        nonlocal errors
+        if isinstance(address, str):
+            reader, writer = await asyncio.open_unix_connection(address)
+        else:
+            reader, writer = await asyncio.open_connection(*address)
+        sent = {}
+        for number, payload in share:
+            sent[number] = time.perf_counter()
+            request = dict(payload, id=number)
+            writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        for _ in share:
+            answer = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent[answer["id"]])
+            if "error" in answer:
+                errors += 1
+        writer.close()
+        await writer.wait_closed()
+
+    numbered = list(enumerate(payloads))
+    started = time.perf_counter()
+    await asyncio.gather(*(client(numbered[index::connections])
+                           for index in range(connections)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {"requests": len(payloads), "errors": errors,
+            "seconds": elapsed,
+            "requests_per_second": len(payloads) / elapsed,
+            "latency_ms": {"p50": percentile(latencies, 0.50) * 1000,
+                           "p95": percentile(latencies, 0.95) * 1000,
+                           "p99": percentile(latencies, 0.99) * 1000}}
+
+
+def sample_duel(trials=10):
+    """A small duel request for load testing"""
+    hero = {"name": "Athena", "health": 100,
+            "abilities": [{"name": "Science", "max_damage": 40}],
+            "armors": [{"name": "Shield", "max_block": 10}]}
+    opponent = {"name": "Gamora", "health": 120,
+                "weapons": [{"name": "Sword", "max_damage": 30}]}
+    return {"type": "duel", "hero": hero, "opponent": opponent,
+            "trials": trials}
+
+
+async def serve(args):
+    server = BattleServer(args.workers, args.batch_size,
+                          queue_size=args.queue_size, timeout=args.timeout)
+    async with await server.start(args.host, args.port, args.unix):
+        print(f"Listening on {server.address}")
+        if args.load:
+            payloads = [sample_duel() for _ in range(args.load)]
+            report = await load_test(server.address, payloads,
+                                     args.connections)
+            print(json.dumps({"client": report,
+                              "server": server.stats.report()}, indent=2))
+        else:
+            await server.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve battle simulations")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--queue-size", type=int, default=256)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--load", type=int, default=0,
+                        help="send this many duels from a local client, "
+                        "print the report and stop")
+    parser.add_argument("--connections", type=int, default=4)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import server
+
+
+def hero(name, damage=40):
+    return {"name": name, "health": 100,
+            "abilities": [{"name": "Science", "max_damage": damage}],
+            "armors": [{"name": "Shield", "max_block": 10}]}
+
+
+async def ask(address, requests):
+    reader, writer = await asyncio.open_connection(*address)
+    for request in requests:
+        writer.write(json.dumps(request).encode() + b"\n")
+    await writer.drain()
+    answers = {}
+    for _ in requests:
+        answer = json.loads(await reader.readline())
+        answers[answer["id"]] = answer
+    writer.close()
+    return answers
+
+
+def run_with_server(body, **options):
+    async def main():
+        battle_server = server.BattleServer(**options)
+        async with await battle_server.start():
+            return await body(battle_server)
+    return asyncio.run(main())
+
+
+def test_simulate_is_seeded():
+    payload = {"type": "battle", "team_one": [hero("Athena")],
+               "team_two": [hero("Gamora"), hero("Okoye", 20)],
+               "trials": 30, "seed": 4}
+    result = server.simulate(payload)
+    assert result["wins"] + result["losses"] + result["draws"] == 30
+    assert server.simulate(payload) == result
+
+
+def test_duels_and_battles():
+    async def body(battle_server):
+        return await ask(battle_server.address, [
+            {"id": 1, "type": "duel", "hero": hero("Athena"),
+             "opponent": hero("Gamora", 0), "trials": 20, "seed": 1},
+            {"id": 2, "type": "battle", "team_one": [hero("Athena")],
+             "team_two": [hero("Gamora")], "trials": 10},
+            {"id": 3, "type": "report"},
+        ])
+    answers = run_with_server(body, workers=2)
+    assert answers[1]["wins"] == 20
+    assert answers[2]["trials"] == 10
+    assert answers[3]["report"]["received"] == 3
+
+
+def test_bad_requests_get_errors():
+    async def body(battle_server):
+        return await ask(battle_server.address, [
+            {"id": 1, "type": "dance"},
+            {"id": 2, "type": "duel", "hero": hero("Athena"),
+             "opponent": hero("Bad Name"), "trials": 1},
+            {"id": 3, "type": "duel", "hero": hero("Athena"),
+             "opponent": hero("Gamora"), "trials": 0},
+        ])
+    answers = run_with_server(body, workers=1)
+    assert "unknown type" in answers[1]["error"]
+    assert "invalid name" in answers[2]["error"]
+    assert "trials" in answers[3]["error"]
+
+
+def test_timeout():
+    async def body(battle_server):
+        return await ask(battle_server.address, [
+            {"id": 1, "type": "battle", "trials": 200,
+             "team_one": [hero("Athena")] * 20,
+             "team_two": [hero("Gamora")] * 20}])
+    answers = run_with_server(body, workers=1, timeout=0.01)
+    assert answers[1]["error"] == "timed out"
+
+
+def test_load_test_batches():
+    async def body(battle_server):
+        payloads = [server.sample_duel(5) for _ in range(60)]
+        client = await server.load_test(battle_server.address, payloads, 3)
+        return client, battle_server.stats.report()
+    client, report = run_with_server(body, workers=2, queue_size=8)
+    assert client["requests"] == 60 and client["errors"] == 0
+    assert report["completed"] == 60
+    assert report["mean_batch"] > 1
+    assert client["latency_ms"]["p95"] >= client["latency_ms"]["p50"]
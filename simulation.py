@@ -0,0 +1,179 @@
+"""Estimate the odds of Arena.team_battle by simulating many battles.
+
+Trials are split into chunks and spread over a process pool. Trial i
+always draws from child stream i of one master RandomStream, so a run
+gives the same counts however it is sharded, and the teams are restored
+from a snapshot before each trial so health, kills and deaths never leak
+from one battle into the next.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, repeat
+from statistics import NormalDist
+
+from running import BattleStats
+from streams import RandomStream
+from superheroes import Arena, NULL_SINK
+
+DRAW = 0
+TEAM_ONE_WINS = 1
+TEAM_TWO_WINS = 2
+
+
+def outcome(team_one, team_two):
+    """Return which team has heroes left standing"""
+    one_alive = team_one.has_living()
+    two_alive = team_two.has_living()
+    if one_alive and not two_alive:
+        return TEAM_ONE_WINS
+    if two_alive and not one_alive:
+        return TEAM_TWO_WINS
+    return DRAW
+
+
+def run_trials(team_one, team_two, first, trials, seed, stats=None):
+    """Battle the teams in trials first .. first + trials - 1 and count
+    each outcome. Both teams are left as they were found.
+    seed: master seed that trial streams are spawned from
+    stats: optional BattleStats to record every trial in
+    return: [draws, team one wins, team two wins]
+    """
+    root = RandomStream(seed)
+    arena = Arena(NULL_SINK)
+    arena.team_one = team_one
+    arena.team_two = team_two
+    start_one = team_one.snapshot()
+    start_two = team_two.snapshot()
+    sources = [(owner, owner.rng) for team in (team_one, team_two)
+               for owner in [team] + team.heroes]
+    counts = [0, 0, 0]
+
+    for trial in range(first, first + trials):
+        team_one.restore(start_one)
+        team_two.restore(start_two)
+        arena.set_rng(root.child(trial))
+        arena.team_battle()
+        counts[outcome(team_one, team_two)] += 1
+        if stats is not None:
+            stats.record(team_one, team_two)
+
+    team_one.restore(start_one)
+    team_two.restore(start_two)
+    for owner, rng in sources:
+        owner.rng = rng
+    return counts
+
+
+def run_trials_with_stats(team_one, team_two, first, trials, seed):
+    """run_trials that also records kills and deaths.
+    return: (counts, BattleStats)
+    """
+    stats = BattleStats(team_one, team_two)
+    counts = run_trials(team_one, team_two, first, trials, seed, stats)
+    return counts, stats
+
+
+def wilson_interval(successes, trials, confidence=0.95):
+    """Return the Wilson score interval for a binomial proportion"""
+    if trials == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / trials
+    denominator = 1 + z * z / trials
+    centre = (p + z * z / (2 * trials)) / denominator
+    spread = z * ((p * (1 - p) + z * z / (4 * trials)) / trials) ** 0.5
+    spread /= denominator
+    return max(0.0, centre - spread), min(1.0, centre + spread)
+
+
+class BattleEstimate:
+    """Win, loss and draw counts from a batch of simulated battles"""
+
+    def __init__(self, wins, losses, draws):
+        """wins: battles won by team one
+        losses: battles won by team two
+        draws: battles that neither team won: nobody survived, or both
+        teams were left standing after a stalemate or a timeout
+        stats: BattleStats of the battles, when they were recorded
+        """
+        self.wins = wins
+        self.losses = losses
+        self.draws = draws
+        self.trials = wins + losses + draws
+        self.stats = None
+
+    def _fraction(self, count):
+        """count as a share of the trials, 0.0 when there were none"""
+        return count / self.trials if self.trials else 0.0
+
+    @property
+    def win_probability(self):
+        """Estimated chance that team one wins"""
+        return self._fraction(self.wins)
+
+    @property
+    def loss_probability(self):
+        """Estimated chance that team two wins"""
+        return self._fraction(self.losses)
+
+    @property
+    def draw_probability(self):
+        """Estimated chance that neither team wins"""
+        return self._fraction(self.draws)
+
+    def win_interval(self, confidence=0.95):
+        """Confidence interval for win_probability"""
+        return wilson_interval(self.wins, self.trials, confidence)
+
+    def loss_interval(self, confidence=0.95):
+        """Confidence interval for loss_probability"""
+        return wilson_interval(self.losses, self.trials, confidence)
+
+    def draw_interval(self, confidence=0.95):
+        """Confidence interval for draw_probability"""
+        return wilson_interval(self.draws, self.trials, confidence)
+
+
+def split(trials, chunks):
+    """Divide trials into chunks sizes that differ by at most one"""
+    size, extra = divmod(trials, chunks)
+    return [size + 1 if i < extra else size for i in range(chunks)]
+
+
+def estimate_team_battle(team_one, team_two, trials, workers=None,
+                         seed=None, chunk_size=250, hero_stats=False):
+    """Estimate the outcome odds of team_one against team_two.
+    workers: number of processes, defaults to the number of CPUs.
+    With workers=1 the trials run in this process.
+    chunk_size: trials per task
+    hero_stats: also record kills and deaths per battle in the
+    estimate's stats, merged from every chunk
+    The same seed gives the same counts whatever the pool or chunk size.
+    return: BattleEstimate
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = max(1, -(-trials // chunk_size))
+    sizes = split(trials, chunks)
+    firsts = [0, *accumulate(sizes)][:-1]
+    seed = RandomStream(seed).entropy
+
+    task = run_trials_with_stats if hero_stats else run_trials
+    if workers == 1:
+        results = list(map(task, repeat(team_one), repeat(team_two),
+                           firsts, sizes, repeat(seed)))
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(task, repeat(team_one),
+                                    repeat(team_two), firsts, sizes,
+                                    repeat(seed)))
+
+    stats = None
+    if hero_stats:
+        stats = BattleStats(team_one, team_two)
+        for _, part in results:
+            stats.merge(part)
+        results = [counts for counts, _ in results]
+    draws, wins, losses = [sum(counts) for counts in zip(*results)]
+    estimate = BattleEstimate(wins, losses, draws)
+    estimate.stats = stats
+    return estimate
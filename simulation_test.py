@@ -0,0 +1,87 @@
+import pytest
+import superheroes
+import simulation
+from team_test import build_squad
+
+
+def build_team(name, damage, health=100):
+    return build_squad(name, health=health, science=damage)
+
+
+def test_split():
+    assert simulation.split(10, 3) == [4, 3, 3]
+    assert sum(simulation.split(1001, 16)) == 1001
+
+
+def test_wilson_interval():
+    low, high = simulation.wilson_interval(50, 100)
+    assert low < 0.5 < high
+    assert 0.39 < low and high < 0.61
+    low, high = simulation.wilson_interval(0, 100)
+    assert low == 0.0 and high > 0.0
+
+
+def test_empty_estimate():
+    estimate = simulation.BattleEstimate(0, 0, 0)
+    assert estimate.win_probability == 0.0
+    assert estimate.loss_probability == 0.0
+    assert estimate.draw_probability == 0.0
+    assert estimate.win_interval() == (0.0, 1.0)
+
+
+def test_run_trials_restores_teams():
+    team_one = build_team("One", 60)
+    team_two = build_team("Two", 40)
+    counts = simulation.run_trials(team_one, team_two, 0, 20, seed=1)
+    assert sum(counts) == 20
+    for hero in team_one.heroes + team_two.heroes:
+        assert hero.current_health == 100
+        assert hero.kills == 0 and hero.deaths == 0
+
+
+def test_estimate_is_repeatable():
+    team_one = build_team("One", 60)
+    team_two = build_team("Two", 40)
+    first = simulation.estimate_team_battle(team_one, team_two, 200,
+                                            workers=1, seed=7)
+    second = simulation.estimate_team_battle(team_one, team_two, 200,
+                                             workers=1, seed=7)
+    assert first.trials == 200
+    assert (first.wins, first.losses, first.draws) == \
+        (second.wins, second.losses, second.draws)
+
+
+def test_estimate_favours_stronger_team():
+    strong = build_team("Strong", 10000)
+    weak = build_team("Weak", 1)
+    estimate = simulation.estimate_team_battle(strong, weak, 100,
+                                               workers=1, seed=3)
+    assert estimate.win_probability > 0.9
+    low, high = estimate.win_interval()
+    assert low <= estimate.win_probability <= high
+
+
+def test_estimate_with_process_pool():
+    team_one = build_team("One", 50)
+    team_two = build_team("Two", 50)
+    pooled = simulation.estimate_team_battle(team_one, team_two, 200,
+                                             workers=2, seed=11,
+                                             chunk_size=50)
+    serial = simulation.estimate_team_battle(team_one, team_two, 200,
+                                             workers=1, seed=11,
+                                             chunk_size=50)
+    assert pooled.trials == 200
+    assert (pooled.wins, pooled.losses, pooled.draws) == \
+        (serial.wins, serial.losses, serial.draws)
+
+
+def test_estimate_independent_of_chunking():
+    team_one = build_team("One", 50)
+    team_two = build_team("Two", 50)
+    counts = set()
+    for chunk_size in [1, 7, 300]:
+        estimate = simulation.estimate_team_battle(
+            team_one, team_two, 300, workers=1, seed=5,
+            chunk_size=chunk_size)
+        counts.add((estimate.wins, estimate.losses, estimate.draws))
+    assert len(counts) == 1
@@ -0,0 +1,114 @@
+import pytest
+import copy
+import pickle
+import random
+import superheroes
+import streams
+from team_test import build_squad
+
+
+def test_stream_is_repeatable():
+    first = streams.RandomStream(42)
+    second = streams.RandomStream(42)
+    assert [first.random() for _ in range(5)] == \
+        [second.random() for _ in range(5)]
+    assert streams.RandomStream(43).random() != \
+        streams.RandomStream(42).random()
+
+
+def test_children_are_addressable():
+    root = streams.RandomStream(7)
+    spawned = root.spawn(3)
+    assert [child.key for child in spawned] == [(0,), (1,), (2,)]
+    assert root.spawn(1)[0].key == (3,)
+    # Child 2 is the same stream however it is reached
+    assert spawned[2].random() == streams.RandomStream(7).child(2).random()
+    assert spawned[0].random() != spawned[1].random()
+
+
+def test_stream_pickles_with_state():
+    stream = streams.RandomStream(9).child(4)
+    stream.random()
+    stream.spawn(2)
+    copied = pickle.loads(pickle.dumps(stream))
+    assert copied.key == (4,)
+    assert copied.children == 2
+    assert copied.random() == stream.random()
+
+
+def test_make_rng():
+    assert streams.make_rng(None) is streams.SHARED_RANDOM
+    assert streams.make_rng(random) is streams.SHARED_RANDOM
+    stream = streams.RandomStream(1)
+    assert streams.make_rng(stream) is stream
+    assert streams.make_rng(5).random() == streams.RandomStream(5).random()
+
+
+def test_shared_random_survives_copy():
+    assert copy.deepcopy(streams.SHARED_RANDOM) is streams.SHARED_RANDOM
+    assert pickle.loads(pickle.dumps(streams.SHARED_RANDOM)) is \
+        streams.SHARED_RANDOM
+
+
+def build_team(name):
+    return build_squad(name, spear=30)
+
+
+def play(seed):
+    arena = superheroes.Arena(superheroes.NULL_SINK)
+    arena.team_one = build_team("One")
+    arena.team_two = build_team("Two")
+    arena.set_rng(seed)
+    arena.team_battle()
+    return [hero.current_health for hero in
+            arena.team_one.heroes + arena.team_two.heroes]
+
+
+def test_seeded_battle_is_repeatable():
+    assert play(123) == play(123)
+    assert play(123) != play(124)
+
+
+def test_hero_seed():
+    hero = superheroes.Hero("Athena", rng=3)
+    hero.add_ability(superheroes.Ability("Science", 1000))
+    again = superheroes.Hero("Athena", rng=3)
+    again.add_ability(superheroes.Ability("Science", 1000))
+    assert [hero.attack() for _ in range(10)] == \
+        [again.attack() for _ in range(10)]
+
+
+def test_randint_is_uniform():
+    stream = streams.RandomStream(11)
+    counts = [0] * 7
+    for _ in range(70000):
+        counts[stream.randint(3, 9) - 3] += 1
+    assert all(abs(count / 70000 - 1 / 7) < 0.01 for count in counts)
+    assert stream.randint(5, 5) == 5
+    assert 0 <= stream.randint(0, 1 << 40) <= 1 << 40
+    assert stream.choice("abc") in "abc"
+    with pytest.raises(IndexError):
+        stream.choice([])
+
+
+def test_single_item_attack_distribution():
+    hero = superheroes.Hero("Athena", rng=streams.RandomStream(2))
+    hero.add_weapon(superheroes.Weapon("Spear", 9))
+    draws = [hero.attack() for _ in range(30000)]
+    # Weapons hit for half to all of their damage
+    for total in range(4, 10):
+        assert abs(draws.count(total) / 30000 - 1 / 6) < 0.01
+    assert set(draws) == set(range(4, 10))
+
+
+def test_buffer_is_cleared_by_seed_and_kept_by_pickle():
+    stream = streams.RandomStream(4)
+    for _ in range(100):
+        stream.randint(0, 9)
+    assert stream.words and stream.word_fill > streams.FIRST_FILL
+    copied = pickle.loads(pickle.dumps(stream))
+    assert copied.word_fill == stream.word_fill
+    assert [copied.randint(0, 9) for _ in range(500)] == \
+        [stream.randint(0, 9) for _ in range(500)]
+    stream.seed(1)
+    assert stream.words == [] and stream.word_fill == streams.FIRST_FILL
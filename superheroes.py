@@ -1,10 +1,170 @@
-from random import randint, choice
-from statistics import mean
+import random
+import sys
+from time import perf_counter
+
+from distributions import sum_table
+from running import TallyStats
+from streams import make_rng
+
+# Text for every event that the sinks below know how to write out.
+# Events missing from here, such as "battle", "duel", "round" and
+# "fight", carry data for recorders and are skipped by the text sinks.
+EVENT_FORMATS = {
+    "health": "{} has {} health!",
+    "win": "{} wins!",
+    "draw": "Draw",
+    "timeout": "{} and {} are still standing after {} rounds. Time's up!",
+    "stats_header": "Name | Kills / Deaths",
+    "hero_stats": "{} | {} / {}",
+    "match_win": "\n{} wins the match!",
+    "survivors": "Survivors:",
+    "survivor": "{}",
+    "match_draw": "It's a draw",
+    "team": "\n{}:",
+    "average": "Average | {} / {}",
+    "melee_win": "\n{} is the last team standing!",
+    "melee_draw": "It's a draw with {} teams standing",
+}
+
+
+# Outcomes of Hero.fight
+DRAW = 0
+HERO_WINS = 1
+OPPONENT_WINS = 2
+TIMEOUT = 3
+
+# Rounds a fight may last before it is called off, unless told otherwise
+MAX_ROUNDS = 100000
+
+
+class NullSink:
+    """Event sink that throws every event away.
+    Callers check active before building an event, so a silent
+    battle does no formatting at all.
+    """
+
+    active = False
+
+    def emit(self, event, *args):
+        """Receive one event"""
+
+    def flush(self):
+        """Write out anything held back"""
+
+
+class NullProbe:
+    """Instrumentation that records nothing.
+    Fight, Team.attack and Arena.team_battle check active once per call,
+    so with this probe installed the hooks cost a lookup and a branch.
+    """
+
+    active = False
+
+    def count(self, counter, amount=1):
+        """Add amount to counter"""
+
+    def timing(self, phase, seconds):
+        """Add one call of phase that took seconds"""
+
+    def watch_battle(self, arena, sink):
+        """Prepare to watch a team battle.
+        return: the sink the battle should report to
+        """
+        return sink
+
+    def end_battle(self, arena):
+        """Undo whatever watch_battle changed"""
+
+
+NULL_PROBE = NullProbe()
+_probe = NULL_PROBE
+
+
+def set_probe(probe=None):
+    """Install probe for the combat code, or turn instrumentation off.
+    return: the probe that was installed before
+    """
+    global _probe
+    previous = _probe
+    _probe = probe if probe is not None else NULL_PROBE
+    return previous
+
+
+class PrintSink(NullSink):
+    """Event sink that prints every event as it happens"""
+
+    active = True
+
+    def emit(self, event, *args):
+        """Print the text for event"""
+        text = EVENT_FORMATS.get(event)
+        if text is not None:
+            print(text.format(*args))
+
+
+class BufferedSink(NullSink):
+    """Event sink that collects text and writes it in large chunks"""
+
+    active = True
+
+    def __init__(self, stream=None, buffer_size=65536):
+        """stream: file to write to, sys.stdout when None
+        buffer_size: characters to hold before writing
+        """
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self.lines = []
+        self.size = 0
+
+    def emit(self, event, *args):
+        """Format event and write the buffer once it is full"""
+        text = EVENT_FORMATS.get(event)
+        if text is None:
+            return
+        line = text.format(*args) + "\n"
+        self.lines.append(line)
+        self.size += len(line)
+        if self.size >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered line"""
+        if self.lines:
+            stream = self.stream or sys.stdout
+            stream.write("".join(self.lines))
+            self.lines.clear()
+            self.size = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+class CollectorSink(NullSink):
+    """Event sink that keeps events as (event, *args) tuples"""
+
+    active = True
+
+    def __init__(self):
+        """events: List"""
+        self.events = []
+
+    def emit(self, event, *args):
+        """Store the event"""
+        self.events.append((event,) + args)
+
+
+NULL_SINK = NullSink()
+PRINT_SINK = PrintSink()
 
 
 class Ability:
     """Defines ability names and damage"""
 
+    __slots__ = ("name", "max_damage")
+
     def __init__(self, name, max_damage):
         """Create instance variables:
         name: String
@@ -13,14 +173,20 @@ class Ability:
         self.name = name
         self.max_damage = max_damage
 
-    def attack(self):
+    def attack(self, rng=random):
         """Return a value between 0 and the value set by max_damage"""
-        return randint(0, self.max_damage)
+        return rng.randint(0, self.max_damage)
+
+    def damage_range(self):
+        """Return the lowest and highest values attack can give"""
+        return 0, self.max_damage
 
 
 class Armor:
     """Defines armor"""
 
+    __slots__ = ("name", "max_block")
+
     def __init__(self, name, max_block):
         """Instantiate instance properties.
         name: String
@@ -29,67 +195,129 @@ class Armor:
         self.name = name
         self.max_block = max_block
 
-    def block(self):
+    def block(self, rng=random):
         """Return a random value between 0 and the value set by max_block"""
-        return randint(0, self.max_block)
+        return rng.randint(0, self.max_block)
+
+    def block_range(self):
+        """Return the lowest and highest values block can give"""
+        return 0, self.max_block
 
 
 class Weapon(Ability):
     """Defines weapons used for attacks"""
 
-    def attack(self):
+    __slots__ = ()
+
+    def attack(self, rng=random):
         """This method returns a random value
         between one half to the full attack power of the weapon.
         """
-        return randint(self.max_damage // 2, self.max_damage)
+        return rng.randint(self.max_damage // 2, self.max_damage)
+
+    def damage_range(self):
+        """Return the lowest and highest values attack can give"""
+        return self.max_damage // 2, self.max_damage
 
 
 class Hero:
     """Defines properties of heroes to do battle"""
 
-    def __init__(self, name, starting_health=100):
+    __slots__ = ("name", "abilities", "armors", "starting_health",
+                 "_current_health", "kills", "deaths", "team",
+                 "_attack_table", "_block_table", "rng", "speed")
+
+    def __init__(self, name, starting_health=100, rng=None, speed=1):
         """Instance properties:
         abilities: List
         armors: List
         name: String
         starting_health: Integer
         current_health: Integer
+        team: Team the hero was last added to
+        rng: random source, a seed, or None for the random module
+        speed: actions per unit of time in a free-for-all, see melee.py
         """
         self.name = name
         self.abilities = []
         self.armors = []
         self.starting_health = starting_health
-        self.current_health = starting_health
+        self._current_health = starting_health
         self.kills = 0
         self.deaths = 0
+        self.team = None
+        self._attack_table = None
+        self._block_table = None
+        self.rng = make_rng(rng)
+        self.speed = speed
+
+    @property
+    def current_health(self):
+        return self._current_health
+
+    @current_health.setter
+    def current_health(self, value):
+        """Set health and keep the team's health total and living heroes
+        up to date
+        """
+        old = self._current_health
+        self._current_health = value
+        if self.team is not None:
+            self.team.health_changed(self, old, value)
+
+    def store_health(self, value):
+        """Set health without updating the team, for callers that rebuild
+        the team's totals themselves
+        """
+        self._current_health = value
 
     def add_kill(self, num_kills):
         """Update kills with num_kills"""
+        old = self.kills
         self.kills += num_kills
+        if self.team is not None:
+            self.team.kill_stats.replace(old, self.kills)
 
     def add_deaths(self, num_deaths):
         """Update deaths with num_deaths"""
+        old = self.deaths
         self.deaths += num_deaths
+        if self.team is not None:
+            self.team.death_stats.replace(old, self.deaths)
 
     def add_ability(self, ability):
         """Add ability to abilities list"""
         self.abilities.append(ability)
+        self._attack_table = None
 
     def add_armor(self, armor):
         """Add armor to self.armors"""
         self.armors.append(armor)
+        self._block_table = None
 
     def add_weapon(self, weapon):
         """Add weapon to self.abilities"""
         self.abilities.append(weapon)
+        self._attack_table = None
 
     def attack(self):
         """Calculate total attack from all abilities
         return: total:int
         """
+        table = self._attack_table
+        if table is None:
+            try:
+                ranges = [ability.damage_range()
+                          for ability in self.abilities]
+            except AttributeError:
+                ranges = []
+            table = self._attack_table = sum_table(ranges) or False
+        if table is not False:
+            return table.sample(self.rng.random)
+
         total = 0
         for ability in self.abilities:
-            total += ability.attack()
+            total += ability.attack(self.rng)
 
         return total
 
@@ -97,68 +325,280 @@ class Hero:
         """Runs block method on all armors.
         Returns sum of all blocks.
         """
+        table = self._block_table
+        if table is None:
+            try:
+                ranges = [armor.block_range() for armor in self.armors]
+            except AttributeError:
+                ranges = []
+            table = self._block_table = sum_table(ranges) or False
+        if table is not False:
+            return table.sample(self.rng.random)
+
         total = 0
         for armor in self.armors:
-            total += armor.block()
+            total += armor.block(self.rng)
 
         return total
 
     def take_damage(self, damage):
-        """Updates current health to reflect the damage minus the defense"""
+        """Updates current health to reflect the damage minus the defense.
+        return: damage actually taken
+        """
         damage -= self.defend()
         if damage < 0:
             damage = 0
         self.current_health -= damage
+        return damage
 
     def is_alive(self):
         """Returns true or false depending on if the hero has health or not"""
         return self.current_health > 0
 
-    def fight(self, opponent):
+    def damage_range(self):
+        """Return the lowest and highest total attack can give"""
+        low = high = 0
+        for ability in self.abilities:
+            try:
+                least, most = ability.damage_range()
+            except AttributeError:
+                least, most = 0, float("inf")
+            low += least
+            high += most
+        return low, high
+
+    def block_range(self):
+        """Return the lowest and highest total defend can give"""
+        low = high = 0
+        for armor in self.armors:
+            try:
+                least, most = armor.block_range()
+            except AttributeError:
+                least, most = 0, float("inf")
+            low += least
+            high += most
+        return low, high
+
+    def can_hurt(self, opponent):
+        """True if some attack could get through opponent's best block"""
+        return self.damage_range()[1] > opponent.block_range()[0]
+
+    def fight(self, opponent, sink=None, max_rounds=MAX_ROUNDS,
+              max_seconds=None):
         """Current hero will take turns fighting the opponent hero that is
-        passed in
+        passed in. Events go to sink, which prints them when None.
+        max_rounds: rounds before the fight is called off, None for no limit
+        max_seconds: time before the fight is called off, checked every
+        64 rounds, None for no limit
+        return: HERO_WINS, OPPONENT_WINS, DRAW when neither hero can ever
+        hurt the other, or TIMEOUT when the fight was called off
         """
-        if self.abilities != [] or opponent.abilities != []:
+        if sink is None:
+            sink = PRINT_SINK
+        report = sink.active
+        watch = _probe.active
+        if watch:
+            started = perf_counter()
+        rounds = 0
+
+        if self.can_hurt(opponent) or opponent.can_hurt(self):
+            if max_seconds is not None:
+                deadline = perf_counter() + max_seconds
+            result = None
             while self.is_alive() and opponent.is_alive():
-                opponent.take_damage(self.attack())
-                print(f"{opponent.name} has {opponent.current_health} health!")
-                self.take_damage(opponent.attack())
-                print(f"{self.name} has {self.current_health} health!")
-
-            if self.is_alive():
-                print(f"{self.name} wins!")
+                if rounds == max_rounds or (max_seconds is not None
+                                            and rounds % 64 == 0
+                                            and perf_counter() > deadline):
+                    result = TIMEOUT
+                    break
+                rounds += 1
+                dealt = opponent.take_damage(self.attack())
+                if report:
+                    sink.emit("health", opponent.name,
+                              opponent.current_health)
+                taken = self.take_damage(opponent.attack())
+                if report:
+                    sink.emit("health", self.name, self.current_health)
+                    sink.emit("round", dealt, taken)
+
+            if result == TIMEOUT:
+                if report:
+                    sink.emit("timeout", self.name, opponent.name, rounds)
+            elif self.is_alive():
+                if report:
+                    sink.emit("win", self.name)
                 self.add_kill(1)
                 opponent.add_deaths(1)
+                result = HERO_WINS
             else:
-                print(f"{opponent.name} wins!")
+                if report:
+                    sink.emit("win", opponent.name)
                 self.add_deaths(1)
                 opponent.add_kill(1)
+                result = OPPONENT_WINS
         else:
-            print("Draw")
+            if report:
+                sink.emit("draw")
+            result = DRAW
+
+        if report:
+            sink.emit("fight", self, opponent, result)
+        if watch:
+            _probe.count("duels")
+            _probe.count("rounds", rounds)
+            _probe.timing("fight", perf_counter() - started)
+        return result
+
+
+class HeroPool:
+    """Heroes kept in a list with O(1) add, remove and random choice.
+    Removing a hero moves the last hero into its place.
+    """
+
+    __slots__ = ("heroes", "positions")
+
+    def __init__(self, heroes=()):
+        """heroes: List
+        positions: Dictionary of hero to index in heroes
+        """
+        self.heroes = []
+        self.positions = {}
+        for hero in heroes:
+            self.add(hero)
+
+    def __len__(self):
+        return len(self.heroes)
+
+    def __contains__(self, hero):
+        return hero in self.positions
+
+    def __iter__(self):
+        return iter(self.heroes)
+
+    def add(self, hero):
+        """Add hero if it isn't already in the pool"""
+        if hero not in self.positions:
+            self.positions[hero] = len(self.heroes)
+            self.heroes.append(hero)
+
+    def discard(self, hero):
+        """Remove hero if it is in the pool"""
+        index = self.positions.pop(hero, None)
+        if index is None:
+            return
+        last = self.heroes.pop()
+        if last is not hero:
+            self.heroes[index] = last
+            self.positions[last] = index
+
+    def choice(self, rng=random):
+        """Return a random hero"""
+        return rng.choice(self.heroes)
+
+    def clear(self):
+        """Remove every hero"""
+        self.heroes.clear()
+        self.positions.clear()
+
+
+def _any_can_hurt(heroes, opponents):
+    """True if some hero of heroes and some of opponents could hurt each
+    other in either direction, in O(len(heroes) + len(opponents))
+    """
+    for attackers, defenders in ((heroes, opponents), (opponents, heroes)):
+        most = max(hero.damage_range()[1] for hero in attackers)
+        if most > min(hero.block_range()[0] for hero in defenders):
+            return True
+    return False
 
 
 class Team():
     """Defines team of heroes"""
 
-    def __init__(self, name):
-        """Initialize team with name (string)"""
+    def __init__(self, name, rng=None):
+        """Initialize team with name (string)
+        members: HeroPool of every hero
+        heroes: List of every hero, shared with members
+        by_name: Dictionary of name to heroes with that name
+        living: HeroPool of heroes with health left
+        kill_stats, death_stats: TallyStats of the heroes' kills and
+        deaths, kept up to date as they change
+        health: current health of the living heroes added together
+        rng: random source for picking fighters, a seed, or None
+        """
         self.name = name
-        self.heroes = []
+        self.members = HeroPool()
+        self.heroes = self.members.heroes
+        self.by_name = {}
+        self.living = HeroPool()
+        self.kill_stats = TallyStats()
+        self.death_stats = TallyStats()
+        self.health = 0
+        self.rng = make_rng(rng)
 
     def add_hero(self, hero):
-        """Add a hero to the heroes list"""
-        self.heroes.append(hero)
+        """Add a hero to the heroes list.
+        A hero belongs to one team at a time, so a hero already on
+        another team is moved off it first.
+        """
+        if hero in self.members:
+            return
+        old_team = hero.team
+        if old_team is not None and hero in old_team.members:
+            old_team._drop(hero)
+        self.members.add(hero)
+        self.by_name.setdefault(hero.name, []).append(hero)
+        self.kill_stats.add(hero.kills)
+        self.death_stats.add(hero.deaths)
+        hero.team = self
+        if hero.is_alive():
+            self.living.add(hero)
+            self.health += hero.current_health
 
     def remove_hero(self, name):
         """Remove hero from heroes list.
         If Hero isn't found return 0.
         """
-        for hero in self.heroes:
-            if hero.name == name:
-                self.heroes.remove(hero)
-                return
-
-        return 0
+        named = self.by_name.get(name)
+        if not named:
+            return 0
+
+        self._drop(named[0])
+
+    def _drop(self, hero):
+        """Take hero out of the team and its totals"""
+        named = self.by_name[hero.name]
+        named.remove(hero)
+        if not named:
+            del self.by_name[hero.name]
+        self.members.discard(hero)
+        if hero in self.living:
+            self.living.discard(hero)
+            self.health -= hero.current_health
+        self.kill_stats.remove(hero.kills)
+        self.death_stats.remove(hero.deaths)
+        if hero.team is self:
+            hero.team = None
+
+    def health_changed(self, hero, old, new):
+        """Update living heroes and the health total after hero's health
+        went from old to new
+        """
+        was_alive = old > 0
+        if was_alive != (new > 0):
+            self.update_living(hero)
+            self.health += new if not was_alive else -old
+        elif was_alive:
+            self.health += new - old
+
+    def update_living(self, hero):
+        """Move hero in or out of the living heroes"""
+        if _probe.active:
+            _probe.count("living_updates")
+        if hero.is_alive() and hero in self.members:
+            self.living.add(hero)
+        else:
+            self.living.discard(hero)
 
     def view_all_heroes(self):
         """Print a list of all the heroes' names"""
@@ -167,54 +607,154 @@ class Team():
 
     def get_living_heroes(self, team):
         """Returns a list of living heroes"""
-        hero_list = []
-        for hero in team.heroes:
-            if hero.is_alive():
-                hero_list.append(hero)
-
-        return hero_list
-
-    def attack(self, other_team):
-        """Battle each team against each other."""
-        fighting = True
-        team_one = []
-        team_two = []
-
-        while fighting:
-            team_one.clear()
-            team_two.clear()
-            team_one = self.get_living_heroes(self)
-            team_two = self.get_living_heroes(other_team)
-
-            if len(team_one) <= 0 or len(team_two) <= 0:
-                fighting = False
-            else:
-                hero_one = choice(team_one)
-                hero_two = choice(team_two)
-                hero_one.fight(hero_two)
+        if _probe.active:
+            _probe.count("living_scans")
+        return list(team.living)
+
+    def attack(self, other_team, sink=None, max_rounds=MAX_ROUNDS,
+               max_seconds=None):
+        """Battle each team against each other.
+        Fight events go to sink, which prints them when None.
+        max_rounds, max_seconds: budget for each fight, see Hero.fight
+        A pair whose fight is a draw is not matched again, and the battle
+        ends once no pair left can hurt each other either way. Heroes
+        whose fight times out sit out the rest of the battle.
+        """
+        if sink is None:
+            sink = PRINT_SINK
+        report = sink.active
+        if report:
+            sink.emit("battle", self, other_team)
+        watch = _probe.active
+        if watch:
+            started = perf_counter()
+
+        fighters = HeroPool(self.living)
+        opponents = HeroPool(other_team.living)
+        stalled = set()
+        # Pool sizes when some pair was last known to be able to fight;
+        # the pools only shrink, so the answer holds while they match.
+        checked = None
+        while fighters and opponents:
+            hero_one = fighters.choice(self.rng)
+            hero_two = opponents.choice(self.rng)
+            if (hero_one, hero_two) in stalled:
+                sizes = (len(fighters), len(opponents))
+                if sizes != checked:
+                    if not _any_can_hurt(fighters, opponents):
+                        break
+                    checked = sizes
+                continue
+            if report:
+                sink.emit("duel", self.members.positions[hero_one],
+                          other_team.members.positions[hero_two])
+            result = hero_one.fight(hero_two, sink, max_rounds, max_seconds)
+            if result == DRAW:
+                stalled.add((hero_one, hero_two))
+                continue
+            timeout = result == TIMEOUT
+            if timeout or not hero_one.is_alive():
+                fighters.discard(hero_one)
+            if timeout or not hero_two.is_alive():
+                opponents.discard(hero_two)
+
+        if watch:
+            _probe.timing("team_attack", perf_counter() - started)
+
+    def set_rng(self, rng):
+        """Use rng, or a stream seeded by it, for the team and its heroes"""
+        self.rng = make_rng(rng)
+        for hero in self.heroes:
+            hero.rng = self.rng
+
+    def snapshot(self):
+        """Return the health, kills and deaths of every hero"""
+        return [(hero.current_health, hero.kills, hero.deaths)
+                for hero in self.heroes]
+
+    def restore(self, snapshot):
+        """Put every hero back to the state saved by snapshot"""
+        # Health skips the property: living and health are rebuilt below.
+        for hero, (current, kills, deaths) in zip(self.heroes, snapshot):
+            hero.store_health(current)
+            hero.kills, hero.deaths = kills, deaths
+        # Rebuild the living heroes in roster order, so the next battle
+        # picks fighters the same way whatever battles came before.
+        self.living.clear()
+        health = 0
+        for hero in self.heroes:
+            current = hero.current_health
+            if current > 0:
+                self.living.add(hero)
+                health += current
+        self.health = health
+        self.kill_stats = TallyStats(hero.kills for hero in self.heroes)
+        self.death_stats = TallyStats(hero.deaths for hero in self.heroes)
 
     def revive_heroes(self):
         """Reset all heroes health to starting_health"""
         for hero in self.heroes:
-            hero.health = hero.starting_health
+            hero.current_health = hero.starting_health
 
-    def stats(self):
-        """Print team statistics"""
-        print(f"Name | Kills / Deaths")
+    def has_living(self):
+        """True while any hero has health left"""
+        return len(self.living) > 0
+
+    def summary(self):
+        """Return the team's totals as a dictionary, without looking at
+        each hero
+        """
+        return {"name": self.name, "heroes": len(self.members),
+                "living": len(self.living), "health": self.health,
+                "kills": self.kill_stats.total,
+                "deaths": self.death_stats.total}
+
+    def stats(self, sink=None):
+        """Print team statistics, or send them to sink"""
+        if sink is None:
+            sink = PRINT_SINK
+        if not sink.active:
+            return
+
+        sink.emit("stats_header")
         for hero in self.heroes:
-            print(f"{hero.name} | {hero.kills} / {hero.deaths}")
+            sink.emit("hero_stats", hero.name, hero.kills, hero.deaths)
+
+
+def valid_name(name):
+    """Names are accepted when they are made of letters only"""
+    return name.isalpha()
+
+
+def valid_number(value):
+    """Damage, block and health are accepted when they are all digits"""
+    return value.isnumeric()
 
 
 class Arena:
     """Defines the arena in which battles take place"""
 
-    def __init__(self):
+    def __init__(self, sink=None, rng=None):
         """Instantiate properties
         team_one: None
         team_two: None
+        sink: where battle and stats events go, printed when None
+        rng: random source for who attacks first, a seed, or None
+        max_rounds, max_seconds: budget for each fight, see Hero.fight
         """
         self.team_one = None
         self.team_two = None
+        self.sink = sink
+        self.rng = make_rng(rng)
+        self.max_rounds = MAX_ROUNDS
+        self.max_seconds = None
+
+    def set_rng(self, rng):
+        """Drive the arena, both teams and every hero from one stream"""
+        self.rng = make_rng(rng)
+        for team in (self.team_one, self.team_two):
+            if team is not None:
+                team.set_rng(self.rng)
 
     def create_ability(self):
         """Prompt for Ability information.
@@ -222,10 +762,10 @@ class Arena:
         """
         name = ""
         damage = ""
-        while not name.isalpha():
+        while not valid_name(name):
             name = input("Please input an ability name: ")
 
-        while not damage.isnumeric():
+        while not valid_number(damage):
             damage = input(f"What is the maximum damage of {name}? ")
 
         ability = Ability(name, int(damage))
@@ -237,10 +777,10 @@ class Arena:
         """
         name = ""
         damage = ""
-        while not name.isalpha():
+        while not valid_name(name):
             name = input("Please input a weapon name: ")
 
-        while not damage.isnumeric():
+        while not valid_number(damage):
             damage = input(f"What is the maximum damage of {name}? ")
 
         weapon = Weapon(name, int(damage))
@@ -252,10 +792,10 @@ class Arena:
         """
         name = ""
         defense = ""
-        while not name.isalpha():
+        while not valid_name(name):
             name = input("Please input an armor name: ")
 
-        while not defense.isnumeric():
+        while not valid_number(defense):
             defense = input(f"What is the maximum damage {name} can block? ")
 
         armor = Armor(name, int(defense))
@@ -267,10 +807,10 @@ class Arena:
         """
         name = ""
         health = ""
-        while not name.isalpha():
+        while not valid_name(name):
             name = input("Please input a hero name: ")
 
-        while not health.isnumeric():
+        while not valid_number(health):
             health = input(f"What is the starting health of {name}? ")
 
         hero = Hero(name, int(health))
@@ -343,50 +883,69 @@ class Arena:
         # TODO: This method should battle the teams together.
         # Call the attack method that exists in your team objects
         # for that battle functionality.
-        first = randint(1, 2)
-        if first == 1:
-            self.team_one.attack(self.team_two)
-        else:
-            self.team_two.attack(self.team_one)
+        sink = self.sink
+        watch = _probe.active
+        if watch:
+            started = perf_counter()
+            sink = _probe.watch_battle(self, sink)
+
+        try:
+            first = self.rng.randint(1, 2)
+            if first == 1:
+                self.team_one.attack(self.team_two, sink, self.max_rounds,
+                                     self.max_seconds)
+            else:
+                self.team_two.attack(self.team_one, sink, self.max_rounds,
+                                     self.max_seconds)
+        finally:
+            if watch:
+                _probe.end_battle(self)
+                _probe.count("battles")
+                _probe.timing("team_battle", perf_counter() - started)
 
     def show_stats(self):
-        """Prints team statistics to terminal."""
+        """Prints team statistics to terminal, or sends them to self.sink"""
+        sink = self.sink
+        if sink is None:
+            sink = PRINT_SINK
+        if not sink.active:
+            return
+
         # Show both teams average kill/death ratio.
-        team_one_heroes = self.team_one.get_living_heroes(self.team_one)
-        team_two_heroes = self.team_two.get_living_heroes(self.team_two)
-        if team_one_heroes != []:
-            print(f"\n{self.team_one.name} wins the match!")
-            print("Survivors:")
-            for hero in team_one_heroes:
-                print(hero.name)
-        elif team_two_heroes != []:
-            print(f"\n{self.team_two.name} wins the match!")
-            print("Survivors:")
-            for hero in team_two_heroes:
-                print(hero.name)
+        if self.team_one.has_living():
+            sink.emit("match_win", self.team_one.name)
+            sink.emit("survivors")
+            for hero in self.team_one.living:
+                sink.emit("survivor", hero.name)
+        elif self.team_two.has_living():
+            sink.emit("match_win", self.team_two.name)
+            sink.emit("survivors")
+            for hero in self.team_two.living:
+                sink.emit("survivor", hero.name)
         else:
-            print("It's a draw")
+            sink.emit("match_draw")
 
         def average_kd(team):
-            k_num_list = []
-            d_num_list = []
-            for hero in team.heroes:
-                k_num_list.append(hero.kills)
-                d_num_list.append(hero.deaths)
-            return mean(k_num_list), mean(d_num_list)
-
-        print(f"\n{self.team_one.name}:")
-        self.team_one.stats()
+            return team.kill_stats.average(), team.death_stats.average()
+
+        sink.emit("team", self.team_one.name)
+        self.team_one.stats(sink)
         k, d = average_kd(self.team_one)
-        print(f"Average | {k} / {d}")
+        sink.emit("average", k, d)
 
-        print(f"\n{self.team_two.name}:")
-        self.team_two.stats()
+        sink.emit("team", self.team_two.name)
+        self.team_two.stats(sink)
         k, d = average_kd(self.team_two)
-        print(f"Average | {k} / {d}")
+        sink.emit("average", k, d)
+        sink.flush()
+
 
+if __name__ == "__main__" and len(sys.argv) > 1:
+    # With roster files on the command line, play headless matches.
+    from cli import main
+    sys.exit(main(sys.argv[1:]))
 
-if __name__ == "__main__":
+elif __name__ == "__main__":
     # If you run this file from the terminal
     # this block of code is executed.
 
@@ -204,6 +204,25 @@ def create_team(heroes=[]):
     return team
 
 
+def build_squad(name, heroes=("Athena", "Gamora", "Okoye"), health=100,
+                science=40, spear=None, socks=10, speed=1):
+    """Build team name with one hero per name in heroes, all alike: a
+    Science ability, a Spear weapon and Socks armor of the given powers,
+    leaving out any of them that is None
+    """
+    team = superheroes.Team(name)
+    for hero_name in heroes:
+        hero = superheroes.Hero(hero_name, health, speed=speed)
+        if science is not None:
+            hero.add_ability(superheroes.Ability("Science", science))
+        if spear is not None:
+            hero.add_weapon(superheroes.Weapon("Spear", spear))
+        if socks is not None:
+            hero.add_armor(superheroes.Armor("Socks", socks))
+        team.add_hero(hero)
+    return team
+
+
 def create_set():
     armor_pieces = random.randint(1, 300)
     weapon_pieces = random.randint(1, 300)
@@ -400,3 +419,172 @@ def test_revive_heroes():
 
     for hero in team_one.heroes:
         assert hero.current_health == 100
+
+
+def test_team_snapshot_restore():
+    team = superheroes.Team("One")
+    jodie = superheroes.Hero("Jodie Foster")
+    team.add_hero(jodie)
+    saved = team.snapshot()
+    jodie.take_damage(40)
+    jodie.add_kill(2)
+    jodie.add_deaths(1)
+    team.restore(saved)
+    assert [jodie.current_health, jodie.kills, jodie.deaths] == [100, 0, 0]
+
+
+def test_team_stats_sink():
+    team = superheroes.Team("One")
+    jodie = superheroes.Hero("Jodie Foster")
+    jodie.add_kill(3)
+    team.add_hero(jodie)
+    sink = superheroes.CollectorSink()
+    team.stats(sink)
+    assert sink.events == [("stats_header",),
+                           ("hero_stats", "Jodie Foster", 3, 0)]
+    output_string = capture_console_output(team.stats)
+    assert "Jodie Foster | 3 / 0" in output_string
+
+
+def test_team_living_set_follows_health():
+    team = superheroes.Team("One")
+    jodie = superheroes.Hero("Jodie Foster")
+    athena = superheroes.Hero("Athena")
+    team.add_hero(jodie)
+    team.add_hero(athena)
+    assert len(team.living) == 2
+    jodie.take_damage(500)
+    assert team.get_living_heroes(team) == [athena]
+    team.revive_heroes()
+    assert len(team.get_living_heroes(team)) == 2
+
+
+def test_team_dead_hero_not_living():
+    team = superheroes.Team("One")
+    team.add_hero(superheroes.Hero("Vlaad", 0))
+    assert team.get_living_heroes(team) == []
+
+
+def test_team_remove_hero_by_name():
+    team = superheroes.Team("One")
+    first = superheroes.Hero("Athena")
+    second = superheroes.Hero("Athena")
+    jodie = superheroes.Hero("Jodie Foster")
+    for hero in [first, second, jodie]:
+        team.add_hero(hero)
+    team.remove_hero("Athena")
+    assert first not in team.heroes
+    assert first not in team.living
+    assert len(team.heroes) == 2
+    # A removed hero no longer updates the team
+    first.take_damage(500)
+    second.take_damage(500)
+    assert team.get_living_heroes(team) == [jodie]
+
+
+def test_hero_moves_to_the_team_it_joins_last():
+    first = superheroes.Team("One")
+    second = superheroes.Team("Two")
+    athena = superheroes.Hero("Athena")
+    other = superheroes.Hero("Athena")
+    first.add_hero(athena)
+    first.add_hero(other)
+    second.add_hero(athena)
+    assert first.heroes == [other] and second.heroes == [athena]
+    assert first.by_name["Athena"] == [other]
+    athena.take_damage(500)
+    assert first.get_living_heroes(first) == [other]
+    assert not second.has_living()
+    assert first.summary()["health"] == 100
+    assert first.summary()["heroes"] == 1
+
+
+def test_team_running_totals():
+    team = superheroes.Team("One")
+    jodie = superheroes.Hero("Jodie Foster", 80)
+    athena = superheroes.Hero("Athena", 120)
+    team.add_hero(jodie)
+    team.add_hero(athena)
+    assert team.health == 200
+    jodie.take_damage(30)
+    athena.add_kill(2)
+    jodie.add_deaths(1)
+    assert team.summary() == {"name": "One", "heroes": 2, "living": 2,
+                              "health": 170, "kills": 2, "deaths": 1}
+    # Dead heroes count as no health, however far below zero they fall
+    jodie.take_damage(500)
+    assert team.health == 120 and not jodie.is_alive()
+    assert team.has_living()
+    team.remove_hero("Athena")
+    assert team.summary() == {"name": "One", "heroes": 1, "living": 0,
+                              "health": 0, "kills": 0, "deaths": 1}
+    assert not team.has_living()
+    team.revive_heroes()
+    assert team.health == 80
+
+
+def test_team_totals_after_restore():
+    team = create_team([build_hero(2, 2, 2) for _ in range(20)])
+    other = create_team([build_hero(2, 2, 2) for _ in range(20)])
+    start = team.snapshot()
+    team.attack(other, superheroes.NULL_SINK)
+    assert team.health == sum(max(hero.current_health, 0)
+                              for hero in team.heroes)
+    assert team.kill_stats.total == sum(hero.kills for hero in team.heroes)
+    team.restore(start)
+    assert team.health == sum(hero.starting_health for hero in team.heroes)
+
+
+def test_hero_pool_swap_remove():
+    heroes = [superheroes.Hero(name) for name in ["A", "B", "C"]]
+    pool = superheroes.HeroPool(heroes)
+    pool.discard(heroes[0])
+    assert pool.heroes == [heroes[2], heroes[1]]
+    assert pool.positions[heroes[2]] == 0
+    pool.discard(heroes[0])
+    assert len(pool) == 2
+    assert pool.choice() in heroes[1:]
+
+
+def test_team_restore_resets_living_order():
+    team = superheroes.Team("One")
+    heroes = [superheroes.Hero(name) for name in ["Athena", "Gamora", "Okoye"]]
+    for hero in heroes:
+        team.add_hero(hero)
+    start = team.snapshot()
+    heroes[0].take_damage(1000)
+    heroes[0].current_health = 5
+    assert list(team.living) != heroes
+    team.restore(start)
+    assert list(team.living) == heroes
+
+
+def test_team_attack_ends_when_nobody_can_be_hurt():
+    team_one = superheroes.Team("One")
+    team_two = superheroes.Team("Two")
+    for name in ["Athena", "Gamora"]:
+        team_one.add_hero(superheroes.Hero(name))
+        team_two.add_hero(superheroes.Hero(name))
+    team_two.heroes[0].add_weapon(superheroes.Weapon("Spear", 1000))
+    team_one.attack(team_two, superheroes.NULL_SINK)
+    # Unarmed pairs draw, but the spear still fights everyone they drew
+    # with, and then nobody left can hurt anybody
+    assert len(team_two.living) == 2
+    assert not team_one.has_living()
+    assert team_two.heroes[0].kills == 2
+    assert team_two.heroes[1].kills == 0
+
+
+def test_team_attack_draw_only_rules_out_the_pair():
+    for seed in range(20):
+        team_one = superheroes.Team("One")
+        team_one.add_hero(superheroes.Hero("Athena"))
+        team_two = superheroes.Team("Two")
+        team_two.add_hero(superheroes.Hero("Gamora"))
+        okoye = superheroes.Hero("Okoye")
+        okoye.add_weapon(superheroes.Weapon("Spear", 1000))
+        team_two.add_hero(okoye)
+        team_one.set_rng(seed)
+        team_one.attack(team_two, superheroes.NULL_SINK)
+        assert not team_one.has_living()
+        assert okoye.kills == 1
@@ -0,0 +1,257 @@
+"""Play leagues of many teams on a process pool.
+
+A Tournament schedules every match for a round-robin, Swiss or single
+elimination competition and runs each one as an Arena.team_battle on a
+worker. The teams are sent to each worker once, and every match restores
+them from a snapshot afterwards, so matches never see each other's damage.
+Match k of round r always uses the same random stream, so results do not
+depend on how many workers there are or which one finishes first.
+"""
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import ceil, log2
+
+from simulation import TEAM_ONE_WINS, TEAM_TWO_WINS, outcome
+from streams import RandomStream
+from superheroes import Arena, NULL_SINK
+
+ROUND_ROBIN = "round_robin"
+SWISS = "swiss"
+ELIMINATION = "elimination"
+
+# Teams held by this process, set once per worker.
+_teams = []
+
+
+def _load_teams(teams):
+    """Pool initializer: keep the tournament's teams in this process"""
+    global _teams
+    _teams = teams
+
+
+def play_match(home, away, seed, key):
+    """Battle team home against team away and return the outcome.
+    Both teams are put back the way they were afterwards.
+    """
+    team_one = _teams[home]
+    team_two = _teams[away]
+    start_one = team_one.snapshot()
+    start_two = team_two.snapshot()
+    sources = [(owner, owner.rng) for team in (team_one, team_two)
+               for owner in [team] + team.heroes]
+    arena = Arena(NULL_SINK)
+    arena.team_one = team_one
+    arena.team_two = team_two
+    arena.set_rng(RandomStream(seed, key))
+    arena.team_battle()
+    result = outcome(team_one, team_two)
+    team_one.restore(start_one)
+    team_two.restore(start_two)
+    for owner, rng in sources:
+        owner.rng = rng
+    return result
+
+
+class Standing:
+    """One team's record in a tournament"""
+
+    def __init__(self, index, name):
+        """index: position of the team in Tournament.teams
+        name: String
+        """
+        self.index = index
+        self.name = name
+        self.wins = 0
+        self.losses = 0
+        self.draws = 0
+
+    @property
+    def played(self):
+        return self.wins + self.losses + self.draws
+
+    @property
+    def points(self):
+        """Three points for a win and one for a draw"""
+        return 3 * self.wins + self.draws
+
+
+class MatchResult:
+    """Who played whom, and what happened"""
+
+    def __init__(self, round_number, home, away, result):
+        """round_number: round the match was played in
+        home, away: team indexes, home attacked as team one
+        result: DRAW, TEAM_ONE_WINS or TEAM_TWO_WINS
+        """
+        self.round_number = round_number
+        self.home = home
+        self.away = away
+        self.result = result
+
+    @property
+    def winner(self):
+        """Index of the winning team, or None for a draw"""
+        if self.result == TEAM_ONE_WINS:
+            return self.home
+        if self.result == TEAM_TWO_WINS:
+            return self.away
+        return None
+
+
+class Tournament:
+    """Schedules and plays a competition between many teams"""
+
+    def __init__(self, teams, format=ROUND_ROBIN, workers=None, seed=None,
+                 rounds=None):
+        """teams: List of Team
+        format: ROUND_ROBIN, SWISS or ELIMINATION
+        workers: processes to use, the CPU count when None, 1 to stay
+        in this process
+        seed: master seed for every match
+        rounds: Swiss rounds, log2 of the team count when None
+        """
+        if format not in (ROUND_ROBIN, SWISS, ELIMINATION):
+            raise ValueError(f"unknown tournament format {format!r}")
+        self.teams = teams
+        self.format = format
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = RandomStream(seed).entropy
+        self.rounds = rounds or max(1, ceil(log2(max(2, len(teams)))))
+        self.standings = [Standing(index, team.name)
+                          for index, team in enumerate(teams)]
+        self.results = []
+        self.elapsed = 0.0
+
+    def table(self):
+        """Standings sorted by points, then wins"""
+        return sorted(self.standings,
+                      key=lambda standing: (-standing.points,
+                                            -standing.wins, standing.index))
+
+    def matches_per_second(self):
+        """Throughput of the matches played so far"""
+        if self.elapsed == 0:
+            return 0.0
+        return len(self.results) / self.elapsed
+
+    def record(self, match):
+        """Add a finished match to the standings"""
+        self.results.append(match)
+        home = self.standings[match.home]
+        away = self.standings[match.away]
+        if match.result == TEAM_ONE_WINS:
+            home.wins += 1
+            away.losses += 1
+        elif match.result == TEAM_TWO_WINS:
+            away.wins += 1
+            home.losses += 1
+        else:
+            home.draws += 1
+            away.draws += 1
+
+    def round_robin_pairings(self):
+        """Every team plays every other team once"""
+        count = len(self.teams)
+        return [(home, away) for home in range(count)
+                for away in range(home + 1, count)]
+
+    def swiss_pairings(self):
+        """Pair teams with similar points who have not met yet.
+        With an odd number of teams the lowest unpaired team sits out.
+        """
+        met = {(match.home, match.away) for match in self.results}
+        met |= {(away, home) for home, away in met}
+        waiting = [standing.index for standing in self.table()]
+        pairings = []
+        while len(waiting) > 1:
+            home = waiting.pop(0)
+            away = next((team for team in waiting
+                         if (home, team) not in met), waiting[0])
+            waiting.remove(away)
+            pairings.append((home, away))
+        return pairings
+
+    def run(self):
+        """Play the whole tournament.
+        Yields each MatchResult as soon as it finishes, with the
+        standings already updated.
+        """
+        start = time.perf_counter()
+        if self.workers == 1:
+            _load_teams(self.teams)
+            play = self._play_here
+        else:
+            pool = ProcessPoolExecutor(self.workers, initializer=_load_teams,
+                                       initargs=(self.teams,))
+            play = self._play_on(pool)
+
+        try:
+            if self.format == ROUND_ROBIN:
+                yield from play(0, self.round_robin_pairings())
+            elif self.format == SWISS:
+                for round_number in range(self.rounds):
+                    yield from play(round_number, self.swiss_pairings())
+            else:
+                yield from self._elimination(play)
+        finally:
+            if self.workers != 1:
+                pool.shutdown()
+            self.elapsed += time.perf_counter() - start
+
+    def _elimination(self, play):
+        """Play knockout rounds until one team is left.
+        Drawn matches are replayed, and the home team goes through if
+        they keep drawing.
+        """
+        alive = list(range(len(self.teams)))
+        round_number = 0
+        while len(alive) > 1:
+            pairings = list(zip(alive[0::2], alive[1::2]))
+            advancing = {}
+            replays = 0
+            while pairings:
+                drawn = []
+                for match in play(round_number, pairings, replays):
+                    if match.winner is None and replays < 3:
+                        drawn.append((match.home, match.away))
+                    else:
+                        advancing[match.home] = (match.home
+                                                 if match.winner is None
+                                                 else match.winner)
+                    yield match
+                pairings = drawn
+                replays += 1
+            survivors = [advancing[home] for home in alive[0::2]
+                         if home in advancing]
+            if len(alive) % 2:
+                survivors.append(alive[-1])
+            alive = survivors
+            round_number += 1
+
+    def _play_here(self, round_number, pairings, replay=0):
+        """Play pairings one after another in this process"""
+        for home, away in pairings:
+            result = play_match(home, away, self.seed,
+                                (round_number, replay, home, away))
+            match = MatchResult(round_number, home, away, result)
+            self.record(match)
+            yield match
+
+    def _play_on(self, pool):
+        """Return a play function that runs pairings on pool"""
+        def play(round_number, pairings, replay=0):
+            pending = {}
+            for home, away in pairings:
+                future = pool.submit(play_match, home, away, self.seed,
+                                     (round_number, replay, home, away))
+                pending[future] = (home, away)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    home, away = pending.pop(future)
+                    match = MatchResult(round_number, home, away,
+                                        future.result())
+                    self.record(match)
+                    yield match
+        return play
@@ -0,0 +1,78 @@
+import pytest
+import superheroes
+import tournament
+from team_test import build_squad
+
+
+def build_teams(count):
+    return [build_squad(f"Team{number}", ["Athena", "Gamora"], health=50,
+                        science=20 + 10 * number, socks=5)
+            for number in range(count)]
+
+
+def test_round_robin_plays_every_pairing():
+    teams = build_teams(5)
+    league = tournament.Tournament(teams, workers=1, seed=1)
+    matches = list(league.run())
+    assert len(matches) == 10
+    assert {(m.home, m.away) for m in matches} == \
+        set(league.round_robin_pairings())
+    assert all(standing.played == 4 for standing in league.standings)
+    assert league.matches_per_second() > 0
+
+
+def test_round_robin_leaves_teams_untouched():
+    teams = build_teams(3)
+    sources = [team.rng for team in teams] + \
+        [hero.rng for team in teams for hero in team.heroes]
+    list(tournament.Tournament(teams, workers=1, seed=2).run())
+    assert [team.rng for team in teams] + \
+        [hero.rng for team in teams for hero in team.heroes] == sources
+    for team in teams:
+        for hero in team.heroes:
+            assert hero.current_health == 50
+            assert hero.kills == 0 and hero.deaths == 0
+
+
+def test_table_order():
+    teams = build_teams(4)
+    league = tournament.Tournament(teams, workers=1, seed=3)
+    list(league.run())
+    points = [standing.points for standing in league.table()]
+    assert points == sorted(points, reverse=True)
+
+
+def test_pool_matches_serial():
+    teams = build_teams(4)
+    serial = tournament.Tournament(teams, workers=1, seed=4)
+    pooled = tournament.Tournament(teams, workers=2, seed=4)
+    first = {(m.home, m.away): m.result for m in serial.run()}
+    second = {(m.home, m.away): m.result for m in pooled.run()}
+    assert first == second
+
+
+def test_swiss_rounds():
+    teams = build_teams(6)
+    league = tournament.Tournament(teams, tournament.SWISS, workers=1,
+                                   seed=5, rounds=3)
+    matches = list(league.run())
+    assert len(matches) == 9
+    assert len({(m.home, m.away) for m in matches}) == 9
+    assert [m.round_number for m in matches].count(2) == 3
+
+
+def test_elimination_has_one_champion():
+    teams = build_teams(5)
+    league = tournament.Tournament(teams, tournament.ELIMINATION, workers=1,
+                                   seed=6)
+    matches = list(league.run())
+    final = matches[-1]
+    assert final.round_number == max(m.round_number for m in matches)
+    losers = {m.home if m.winner == m.away else m.away
+              for m in matches if m.winner is not None}
+    assert len(set(range(5)) - losers) == 1
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        tournament.Tournament(build_teams(2), "ladder")